@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the firstname_to_nationality package.
+
+Each measurement runs in a fresh interpreter so nothing is cached in
+sys.modules. The package import is compared with importing the heavy
+libraries it used to load eagerly (numpy, scikit-learn, joblib).
+
+Usage:
+    python benchmarks/import_time.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("numpy", "scipy", "sklearn", "joblib", "pandas", "asyncio")
+
+SCENARIOS = {
+    "package import": "import firstname_to_nationality",
+    "preprocessor only": (
+        "from firstname_to_nationality import NamePreprocessor\n"
+        "NamePreprocessor().preprocess_name('Giuseppe Rossi')"
+    ),
+    "heavy libraries (previous eager imports)": (
+        "import numpy, joblib\n"
+        "import sklearn.feature_extraction.text, sklearn.linear_model\n"
+        "import sklearn.pipeline, sklearn.preprocessing"
+    ),
+}
+
+
+def time_snippet(snippet: str) -> tuple:
+    """
+    Time a snippet in a fresh interpreter.
+
+    Returns:
+        Tuple of (seconds, heavy modules left in sys.modules)
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{snippet}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(loaded))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+
+    return float(output[0]), output[1] if len(output) > 1 else "-"
+
+
+def main():
+    """Run every scenario and print median import times."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="runs per scenario")
+    args = parser.parse_args()
+
+    print(f"{'scenario':45} {'median':>10} {'best':>10}  heavy modules loaded")
+    for label, snippet in SCENARIOS.items():
+        timings = []
+        loaded = "-"
+        for _ in range(args.runs):
+            elapsed, loaded = time_snippet(snippet)
+            timings.append(elapsed)
+
+        print(
+            f"{label:45} {statistics.median(timings) * 1000:8.1f}ms "
+            f"{min(timings) * 1000:8.1f}ms  {loaded}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Multi-process prediction benchmark.
+
+Trains a synthetic model, then times batch prediction with n_jobs = 1, 2,
+4, ... up to the number of CPUs and reports throughput and speedup over
+in-process scoring. Every run is checked against the in-process result.
+
+Usage:
+    python benchmarks/parallel.py [--names N] [--distinct N] [--runs N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from firstname_to_nationality import FirstnameToNationality  # noqa: E402
+
+SYLLABLES = ["ka", "to", "ri", "ma", "el", "an", "jo", "se", "lu", "gi", "ha", "ns"]
+
+
+def synthetic_names(rng: random.Random, count: int):
+    """Random pronounceable names."""
+    return [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(count)
+    ]
+
+
+def main():
+    """Time each n_jobs setting and print the speedups."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=500_000, help="batch size")
+    parser.add_argument("--distinct", type=int, default=200_000, help="distinct names")
+    parser.add_argument("--runs", type=int, default=2, help="runs per setting")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    training_names = synthetic_names(rng, 5_000)
+    training_labels = [f"Nationality{rng.randrange(20)}" for _ in training_names]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        predictor = FirstnameToNationality(
+            model_path=str(Path(temp_dir) / "model.pt"),
+            dictionary_path=str(Path(temp_dir) / "dict.pkl"),
+        )
+        predictor.train(training_names, training_labels, save_model=False)
+
+    pool = synthetic_names(rng, args.distinct)
+    names = [rng.choice(pool) for _ in range(args.names)]
+    expected = predictor.predict_encoded(names, top_n=3).decode()
+
+    settings = [1]
+    while settings[-1] * 2 <= (os.cpu_count() or 1):
+        settings.append(settings[-1] * 2)
+
+    print(f"{len(names):,} names ({len(set(names)):,} distinct), {os.cpu_count()} CPUs")
+    baseline = None
+    for n_jobs in settings:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = predictor.predict_encoded(names, top_n=3, n_jobs=n_jobs)
+            timings.append(time.perf_counter() - start)
+        if result.decode() != expected:
+            raise SystemExit(f"n_jobs={n_jobs} output differs from in-process scoring")
+
+        elapsed = min(timings)
+        baseline = baseline or elapsed
+        print(
+            f"n_jobs={n_jobs:<3} {elapsed:8.3f}s  {len(names) / elapsed:12,.0f} names/s  "
+            f"{baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Name preprocessing microbenchmark.
+
+Compares the previous per-name implementation of
+NamePreprocessor.preprocess_name with the current preprocess_name and the
+batch preprocess_many API on a synthetic list of names, and checks that all
+three give identical output.
+
+Usage:
+    python benchmarks/preprocess.py [--names N] [--runs N]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from firstname_to_nationality import NamePreprocessor  # noqa: E402
+
+SAMPLE_NAMES = [
+    "John",
+    "Giuseppe Rossi",
+    "Jean-Paul",
+    "  MARÍA josé ",
+    "O'Brien",
+    "Zoë",
+    "Hiroshi",
+    "Anne-Marie\tDupont",
+    "Łukasz",
+    "Mohammed Al-Rashid",
+]
+
+
+def legacy_preprocess_name(name: str) -> str:
+    """The per-name implementation preprocess_many replaces."""
+    name = name.strip().lower()
+    name = re.sub(r"[^\w\s-]", "", name)
+    name = name.replace(" ", "▁")
+    return " ".join(char for char in name if char.strip())
+
+
+def best_time(function, names, runs: int) -> float:
+    """Best wall-clock time of several runs, in seconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(names)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Time each implementation and print the speedups."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=1_000_000, help="list size")
+    parser.add_argument("--runs", type=int, default=3, help="runs per variant")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    names = [rng.choice(SAMPLE_NAMES) for _ in range(args.names)]
+    preprocessor = NamePreprocessor()
+
+    variants = {
+        "previous preprocess_name": lambda batch: [
+            legacy_preprocess_name(name) for name in batch
+        ],
+        "preprocess_name": lambda batch: [
+            preprocessor.preprocess_name(name) for name in batch
+        ],
+        "preprocess_many": preprocessor.preprocess_many,
+    }
+
+    expected = variants["previous preprocess_name"](names)
+    for label, function in variants.items():
+        if function(names) != expected:
+            raise SystemExit(f"{label} output differs from the previous version")
+
+    baseline = None
+    print(f"{len(names):,} names, best of {args.runs} runs")
+    for label, function in variants.items():
+        elapsed = best_time(function, names, args.runs)
+        baseline = baseline or elapsed
+        print(
+            f"{label:28} {elapsed:8.3f}s  {len(names) / elapsed:12,.0f} names/s  "
+            f"{baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Multi-threaded prediction benchmark.
+
+Trains a synthetic model, then times two ways of using threads with one
+shared predictor: a single batch scored with n_threads = 1, 2, 4, ... and
+the same number of client threads each predicting its own share of the
+batch. Every run is checked against the single-threaded result. Scaling is
+only expected on free-threaded builds (python3.13t) or where the model
+releases the GIL.
+
+Usage:
+    python benchmarks/threads.py [--names N] [--distinct N] [--runs N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from firstname_to_nationality import FirstnameToNationality  # noqa: E402
+
+SYLLABLES = ["ka", "to", "ri", "ma", "el", "an", "jo", "se", "lu", "gi", "ha", "ns"]
+
+
+def synthetic_names(rng: random.Random, count: int):
+    """Random pronounceable names."""
+    return [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(count)
+    ]
+
+
+def best_of(runs: int, function):
+    """Smallest wall time of several runs, and the last result."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    """Time each thread count and print the speedups."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--names", type=int, default=200_000, help="batch size")
+    parser.add_argument("--distinct", type=int, default=100_000, help="distinct names")
+    parser.add_argument("--runs", type=int, default=2, help="runs per setting")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    training_names = synthetic_names(rng, 5_000)
+    training_labels = [f"Nationality{rng.randrange(20)}" for _ in training_names]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        predictor = FirstnameToNationality(
+            model_path=str(Path(temp_dir) / "model.pt"),
+            dictionary_path=str(Path(temp_dir) / "dict.pkl"),
+        )
+        predictor.train(training_names, training_labels, save_model=False)
+
+    pool = synthetic_names(rng, args.distinct)
+    names = [rng.choice(pool) for _ in range(args.names)]
+    expected = predictor(names, top_n=3)
+
+    settings = [1]
+    while settings[-1] * 2 <= (os.cpu_count() or 1):
+        settings.append(settings[-1] * 2)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(
+        f"{len(names):,} names ({len(set(names)):,} distinct), "
+        f"{os.cpu_count()} CPUs, GIL {'enabled' if gil else 'disabled'}"
+    )
+
+    baseline = None
+    for n_threads in settings:
+        elapsed, result = best_of(
+            args.runs, lambda: predictor(names, top_n=3, n_threads=n_threads)
+        )
+        if result != expected:
+            raise SystemExit(f"n_threads={n_threads} output differs")
+        baseline = baseline or elapsed
+        print(
+            f"n_threads={n_threads:<3} {elapsed:8.3f}s  "
+            f"{len(names) / elapsed:12,.0f} names/s  {baseline / elapsed:5.2f}x"
+        )
+
+    baseline = None
+    for n_clients in settings:
+        step = -(-len(names) // n_clients)
+        shares = [names[start : start + step] for start in range(0, len(names), step)]
+
+        def run_clients():
+            with ThreadPoolExecutor(n_clients) as executor:
+                parts = executor.map(lambda share: predictor(share, top_n=3), shares)
+                return [row for part in parts for row in part]
+
+        elapsed, result = best_of(args.runs, run_clients)
+        if result != expected:
+            raise SystemExit(f"{n_clients} client threads output differs")
+        baseline = baseline or elapsed
+        print(
+            f"clients={n_clients:<3}   {elapsed:8.3f}s  "
+            f"{len(names) / elapsed:12,.0f} names/s  {baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
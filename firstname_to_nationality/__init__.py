@@ -1,18 +1,48 @@
 # -*- coding: utf-8 -*-
 r"""firstname_to_nationality"""
+
 from __future__ import absolute_import
 
+import importlib
+
 from .firstname_to_nationality import (
+    EncodedPredictions,
     FirstnameToNationality,
     NamePreprocessor,
     PredictionResult,
 )
 from .firstname_to_country import FirstnameToCountry, CountryPrediction
+from .prediction_cache import CacheStats, PredictionCache
+
+# Exports whose modules import numpy/scipy or asyncio at load time are
+# resolved on first access, so "import firstname_to_nationality" stays cheap
+_LAZY_EXPORTS = {
+    "AsyncFirstnameToCountry": ".async_predictor",
+    "AsyncFirstnameToNationality": ".async_predictor",
+    "CompiledModel": ".compiled_model",
+    "CountryAggregator": ".country_aggregator",
+    "FeatureCache": ".feature_cache",
+}
 
 __all__ = [
     "FirstnameToNationality",
     "FirstnameToCountry",
+    "AsyncFirstnameToNationality",
+    "AsyncFirstnameToCountry",
     "NamePreprocessor",
     "PredictionResult",
+    "EncodedPredictions",
     "CountryPrediction",
+    "PredictionCache",
+    "CacheStats",
+    "CompiledModel",
+    "CountryAggregator",
+    "FeatureCache",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
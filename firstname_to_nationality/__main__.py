@@ -0,0 +1,7 @@
+"""Allow ``python -m firstname_to_nationality``."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Asyncio front-ends that coalesce concurrent requests into micro-batches.
+
+Coroutines that each ``await predict(name)`` are collected for at most
+``max_wait`` seconds, or until ``max_batch_size`` requests are waiting, and
+answered together by one vectorized prediction run in an executor. The event
+loop never blocks on the model, and single-name traffic gets the throughput
+of batch scoring.
+
+Predictors created from keyword arguments are lazy: constructing one does
+not touch the disk, so it is safe inside a running event loop. Await
+``warmup()`` once at startup to load the model in the executor before the
+first request.
+
+Usage:
+    predictor = AsyncFirstnameToNationality(max_batch_size=256, max_wait=0.002)
+    await predictor.warmup()
+    predictions = await predictor.predict("Giuseppe", top_n=3)
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from .firstname_to_country import FirstnameToCountry
+from .firstname_to_nationality import FirstnameToNationality
+
+T = TypeVar("T")
+
+
+class _CoalescingPredictor(abc.ABC, Generic[T]):
+    """Collects single-name requests and answers them in micro-batches."""
+
+    def __init__(
+        self,
+        predictor: Any,
+        max_batch_size: int,
+        max_wait: float,
+        executor: Optional[Executor],
+    ):
+        """
+        Initialize the request queue.
+
+        Args:
+            predictor: Synchronous predictor that scores the micro-batches
+            max_batch_size: Number of waiting requests that triggers a batch
+            max_wait: Longest time in seconds a request waits for others
+            executor: Executor running the predictions (None for the event
+                loop's default thread pool)
+
+        Raises:
+            ValueError: If max_batch_size is not positive or max_wait is
+                negative
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+        if max_wait < 0:
+            raise ValueError("max_wait must not be negative")
+
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+
+        self._pending: List[Tuple[str, int, bool, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @abc.abstractmethod
+    def _predict_batch(self, names: List[str], top_n: int, use_dict: bool) -> List[T]:
+        """Predict a micro-batch synchronously, one result per name."""
+
+    async def predict(self, name: str, top_n: int = 1, use_dict: bool = True) -> T:
+        """
+        Predict a single name, batched with concurrent requests.
+
+        Args:
+            name: Input name
+            top_n: Number of top predictions to return
+            use_dict: Whether to use dictionary lookup first
+
+        Returns:
+            The same predictions as the synchronous ``predict_single``
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((name, top_n, use_dict, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    async def predict_batch(
+        self, names: Iterable[str], top_n: int = 1, use_dict: bool = True
+    ) -> List[T]:
+        """
+        Predict a list of names in the executor, without waiting for others.
+
+        Args:
+            names: Input names
+            top_n: Number of top predictions per name
+            use_dict: Whether to use dictionary lookup
+
+        Returns:
+            One prediction list per name, in input order
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self._predict_batch, list(names), top_n, use_dict
+        )
+
+    async def warmup(self) -> None:
+        """Load the model and lookup tables in the executor."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.predictor.warmup)
+
+    async def aclose(self) -> None:
+        """Answer the waiting requests and wait for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def __aenter__(self):
+        """Use the predictor as an async context manager."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        """Answer the waiting requests on exit."""
+        await self.aclose()
+
+    def _flush(self) -> None:
+        """Start a micro-batch with every waiting request."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            # Keep a reference until done so the task is not garbage collected
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, int, bool, asyncio.Future]]):
+        """Score a micro-batch and resolve the futures of its requests."""
+        loop = asyncio.get_running_loop()
+
+        # Requests with different settings are scored as separate groups;
+        # requests cancelled while waiting are skipped
+        groups: Dict[Tuple[int, bool], List[Tuple[str, asyncio.Future]]] = {}
+        for name, top_n, use_dict, future in batch:
+            if not future.done():
+                groups.setdefault((top_n, use_dict), []).append((name, future))
+
+        for (top_n, use_dict), requests in groups.items():
+            names = [name for name, _ in requests]
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self._predict_batch, names, top_n, use_dict
+                )
+            except Exception as e:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(requests, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class AsyncFirstnameToNationality(_CoalescingPredictor[List[Tuple[str, float]]]):
+    """Asyncio nationality predictor that coalesces requests into micro-batches."""
+
+    def __init__(
+        self,
+        predictor: Optional[FirstnameToNationality] = None,
+        max_batch_size: int = 256,
+        max_wait: float = 0.002,
+        executor: Optional[Executor] = None,
+        **predictor_kwargs,
+    ):
+        """
+        Initialize the async predictor.
+
+        Args:
+            predictor: Nationality predictor to share (created from
+                predictor_kwargs when not given)
+            max_batch_size: Number of waiting requests that triggers a batch
+            max_wait: Longest time in seconds a request waits for others,
+                bounding the latency added by batching
+            executor: Executor running the predictions (None for the event
+                loop's default thread pool)
+            **predictor_kwargs: Arguments for FirstnameToNationality (lazy by
+                default, so nothing is loaded until ``warmup()`` or the first
+                request, which both run in the executor)
+        """
+        if predictor is None:
+            predictor_kwargs.setdefault("lazy", True)
+            predictor = FirstnameToNationality(**predictor_kwargs)
+        super().__init__(predictor, max_batch_size, max_wait, executor)
+
+    def _predict_batch(
+        self, names: List[str], top_n: int, use_dict: bool
+    ) -> List[List[Tuple[str, float]]]:
+        """Predict a micro-batch of nationalities."""
+        return [
+            predictions
+            for _, predictions in self.predictor(names, top_n=top_n, use_dict=use_dict)
+        ]
+
+
+class AsyncFirstnameToCountry(_CoalescingPredictor[List[Dict[str, Any]]]):
+    """Asyncio country predictor that coalesces requests into micro-batches."""
+
+    def __init__(
+        self,
+        predictor: Optional[FirstnameToCountry] = None,
+        max_batch_size: int = 256,
+        max_wait: float = 0.002,
+        executor: Optional[Executor] = None,
+        **predictor_kwargs,
+    ):
+        """
+        Initialize the async predictor.
+
+        Args:
+            predictor: Country predictor to share (created from
+                predictor_kwargs when not given)
+            max_batch_size: Number of waiting requests that triggers a batch
+            max_wait: Longest time in seconds a request waits for others,
+                bounding the latency added by batching
+            executor: Executor running the predictions (None for the event
+                loop's default thread pool)
+            **predictor_kwargs: Arguments for FirstnameToCountry (lazy by
+                default, so nothing is loaded until ``warmup()`` or the first
+                request, which both run in the executor)
+        """
+        if predictor is None:
+            predictor_kwargs.setdefault("lazy", True)
+            predictor = FirstnameToCountry(**predictor_kwargs)
+        super().__init__(predictor, max_batch_size, max_wait, executor)
+
+    def _predict_batch(
+        self, names: List[str], top_n: int, use_dict: bool
+    ) -> List[List[Dict[str, Any]]]:
+        """Predict a micro-batch of countries."""
+        results = self.predictor.predict_batch(
+            names, top_n=top_n, use_dict=use_dict, aggregate=False
+        )
+        return [result["predictions"] for result in results]
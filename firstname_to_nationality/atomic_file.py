@@ -0,0 +1,72 @@
+"""
+Atomic file replacement for models and dictionaries.
+
+Files are written to a temporary file next to their destination and renamed
+into place, so concurrent readers see either the old or the new contents,
+never a half-written file. The new file gets the permissions an ordinary
+``open()`` would give it (those of the file it replaces, otherwise 0o666
+minus the umask) instead of the owner-only mode of a temporary file.
+
+Windows cannot replace a file that is memory-mapped, including by the
+writing process itself. Writers that may have mapped the destination pass
+a ``release`` callback that drops their own mapping before the rename is
+retried.
+"""
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Union
+
+
+def _umask_file_mode() -> int:
+    """Mode of a newly created file under the process umask."""
+    # The umask can only be read by setting it, so this runs once at import
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+_NEW_FILE_MODE = _umask_file_mode()
+
+
+def write_atomically(
+    path: Union[str, Path],
+    write: Callable[[BinaryIO], None],
+    release: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    Write a file through a temporary file and rename it into place.
+
+    Args:
+        path: Destination file path
+        write: Writes the contents to the binary file it is given
+        release: Drops this process's memory mappings of the destination;
+            called only if replacing the destination is refused (Windows)
+
+    Raises:
+        PermissionError: If the destination cannot be replaced, for example
+            because another process still maps it on Windows
+    """
+    path = Path(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = _NEW_FILE_MODE
+
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.chmod(temp_path, mode)
+        try:
+            os.replace(temp_path, path)
+        except PermissionError:
+            if release is None:
+                raise
+            release()
+            os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
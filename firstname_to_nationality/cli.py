@@ -0,0 +1,282 @@
+"""
+Command line interface for bulk scoring.
+
+Usage:
+    python -m firstname_to_nationality score names.csv scored.parquet \\
+        --column first_name --top-n 3 --country --workers 4
+
+Names are read from a CSV or Parquet column in chunks, predicted batch by
+batch and appended to a CSV or Parquet output (inferred from the file
+extensions), so files far larger than memory can be scored.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from .firstname_to_nationality import EncodedPredictions
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+def _is_parquet(path: Path) -> bool:
+    """Whether a path names a Parquet file."""
+    return path.suffix.lower() in PARQUET_SUFFIXES
+
+
+def _create_predictor(args: argparse.Namespace):
+    """Build the nationality or country predictor selected on the command line."""
+    from .firstname_to_country import FirstnameToCountry
+    from .firstname_to_nationality import FirstnameToNationality
+
+    # Either path may be given alone; the other keeps its default
+    kwargs = {}
+    if args.model_path:
+        kwargs["model_path"] = args.model_path
+    if args.dictionary_path:
+        kwargs["dictionary_path"] = args.dictionary_path
+
+    if args.country:
+        if args.country_csv_path:
+            kwargs["country_csv_path"] = args.country_csv_path
+        return FirstnameToCountry(**kwargs)
+    return FirstnameToNationality(**kwargs)
+
+
+def _score_chunk(
+    predictor, names: List[str], top_n: int, use_dict: bool, n_jobs: int = 1
+) -> EncodedPredictions:
+    """
+    Predict one chunk as columnar output with exactly top_n ranks.
+
+    Every chunk gets the same columns, so chunks can be appended to one file
+    even when a chunk has fewer predictions per name than requested.
+    """
+    import numpy as np
+
+    if hasattr(predictor, "predict_columnar"):
+        encoded = predictor.predict_columnar(
+            names, top_n=top_n, use_dict=use_dict, n_jobs=n_jobs
+        )
+    else:
+        encoded = predictor.predict_encoded(
+            names, top_n=top_n, use_dict=use_dict, n_jobs=n_jobs
+        )
+
+    missing = top_n - encoded.indices.shape[1]
+    if missing > 0:
+        padding = ((0, 0), (0, missing))
+        encoded.indices = np.pad(encoded.indices, padding, constant_values=-1)
+        encoded.confidences = np.pad(encoded.confidences, padding)
+    return encoded
+
+
+def read_name_chunks(path: Path, column: str, chunk_size: int) -> Iterator[List[str]]:
+    """
+    Read a name column in chunks.
+
+    Args:
+        path: CSV or Parquet input file
+        column: Name of the column holding the names
+        chunk_size: Number of rows per chunk
+
+    Yields:
+        Lists of at most chunk_size names (missing values become "")
+    """
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        if column not in parquet_file.schema_arrow.names:
+            raise ValueError(f"Column '{column}' not found in {path}")
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=[column]):
+            yield [
+                "" if name is None else str(name)
+                for name in batch.column(0).to_pylist()
+            ]
+    else:
+        import pandas as pd
+
+        reader = pd.read_csv(
+            path,
+            usecols=[column],
+            dtype=str,
+            keep_default_na=False,
+            chunksize=chunk_size,
+        )
+        for chunk in reader:
+            yield chunk[column].tolist()
+
+
+class ChunkWriter:
+    """Appends columnar prediction chunks to a CSV or Parquet file."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize the writer.
+
+        Args:
+            path: Output file, overwritten on the first chunk
+        """
+        self.path = path
+        self.rows = 0
+        self._parquet_writer = None
+        self._csv_file = None
+
+    def write(self, encoded: EncodedPredictions) -> None:
+        """
+        Append one chunk of predictions.
+
+        Args:
+            encoded: Columnar predictions of the chunk
+        """
+        if _is_parquet(self.path):
+            import pyarrow.parquet as pq
+
+            table = encoded.to_arrow()
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            header = self._csv_file is None
+            if header:
+                self._csv_file = open(self.path, "w", newline="", encoding="utf-8")
+            encoded.to_pandas().to_csv(self._csv_file, header=header, index=False)
+
+        self.rows += len(encoded)
+
+    def close(self) -> None:
+        """Flush and close the output file."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._csv_file is not None:
+            self._csv_file.close()
+
+
+def score(args: argparse.Namespace) -> int:
+    """
+    Run the ``score`` command.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        Process exit code
+    """
+    input_path = Path(args.input)
+    output_path = Path(args.output)
+    use_dict = not args.no_dict
+
+    if not input_path.exists():
+        print(f"❌ Input file not found: {input_path}")
+        return 1
+
+    start = time.perf_counter()
+    chunks = read_name_chunks(input_path, args.column, args.batch_size)
+    writer = ChunkWriter(output_path)
+
+    predictor = None
+    try:
+        # One predictor for the whole run; with --workers > 1 its worker
+        # pool is started once and shares the loaded model across chunks
+        predictor = _create_predictor(args)
+        nationality_predictor = getattr(predictor, "nationality_predictor", predictor)
+        if not nationality_predictor.is_trained:
+            print(
+                "❌ No trained model could be loaded from "
+                f"{nationality_predictor.model_file_path}"
+            )
+            return 1
+
+        for names in chunks:
+            writer.write(
+                _score_chunk(predictor, names, args.top_n, use_dict, args.workers)
+            )
+
+        if writer.rows == 0:
+            # Still write the header/schema for an empty input
+            writer.write(_score_chunk(predictor, [], args.top_n, use_dict))
+    except (ValueError, KeyError) as e:
+        print(f"❌ Scoring failed: {e}")
+        return 1
+    finally:
+        writer.close()
+        if predictor is not None:
+            predictor.close()
+
+    elapsed = time.perf_counter() - start
+    rate = writer.rows / elapsed if elapsed > 0 else 0.0
+    print(f"✅ Scored {writer.rows:,} names in {elapsed:.2f}s ({rate:,.0f} names/s)")
+    print(f"📁 Results written to: {output_path}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="python -m firstname_to_nationality",
+        description="Firstname to nationality prediction tools",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    score_parser = subparsers.add_parser(
+        "score", help="Score a name column of a CSV or Parquet file"
+    )
+    score_parser.add_argument("input", help="input .csv or .parquet file")
+    score_parser.add_argument("output", help="output .csv or .parquet file")
+    score_parser.add_argument(
+        "--column", default="name", help="column holding the names (default: name)"
+    )
+    score_parser.add_argument(
+        "--top-n", type=int, default=1, help="predictions per name (default: 1)"
+    )
+    score_parser.add_argument(
+        "--no-dict", action="store_true", help="skip the name dictionary lookup"
+    )
+    score_parser.add_argument(
+        "--country", action="store_true", help="add country codes to the output"
+    )
+    score_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100_000,
+        help="rows read, scored and written at a time (default: 100000)",
+    )
+    score_parser.add_argument(
+        "--workers", type=int, default=1, help="worker processes (default: 1)"
+    )
+    score_parser.add_argument("--model-path", help="model checkpoint to load")
+    score_parser.add_argument("--dictionary-path", help="name dictionary to load")
+    score_parser.add_argument(
+        "--country-csv-path", help="nationality-to-country CSV (with --country)"
+    )
+    score_parser.set_defaults(handler=score)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of ``python -m firstname_to_nationality``.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if getattr(args, "top_n", 1) < 1:
+        parser.error("--top-n must be a positive integer")
+    if getattr(args, "batch_size", 1) < 1:
+        parser.error("--batch-size must be a positive integer")
+    if getattr(args, "workers", 1) < 1:
+        parser.error("--workers must be a positive integer")
+
+    return args.handler(args)
@@ -0,0 +1,418 @@
+"""
+Compiled inference engine for Firstname to Nationality models.
+
+A trained TF-IDF + LogisticRegression pipeline is frozen into plain NumPy
+arrays (n-gram vocabulary, IDF weights, coefficients, intercepts and class
+names) so that scoring runs on NumPy/SciPy sparse operations only.
+"""
+
+import json
+import re
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from .atomic_file import write_atomically
+
+# Same whitespace normalization as scikit-learn's char analyzer
+_WHITE_SPACES = re.compile(r"\s\s+")
+
+# On-disk layout: magic, little-endian uint64 header size, JSON header, then
+# raw arrays aligned so that every array can be mapped in place
+COMPILED_MODEL_MAGIC = b"F2NMODEL"
+COMPILED_MODEL_VERSION = 1
+_ARRAY_ALIGNMENT = 64
+_ARRAY_FIELDS = ("vocabulary", "columns", "idf", "weights", "intercept", "class_names")
+
+
+@dataclass
+class CompiledModel:
+    """
+    Frozen, scikit-learn free nationality scoring engine.
+
+    The vocabulary is kept as a sorted fixed-width string array so n-gram
+    lookups are a single ``np.searchsorted`` over the whole batch.
+    """
+
+    vocabulary: np.ndarray
+    columns: np.ndarray
+    idf: np.ndarray
+    weights: np.ndarray
+    intercept: np.ndarray
+    class_names: np.ndarray
+    ngram_range: Tuple[int, int] = (1, 3)
+    lowercase: bool = True
+    binary: bool = False
+    sublinear_tf: bool = False
+    norm: Optional[str] = "l2"
+    link: str = "softmax"
+
+    @property
+    def n_features(self) -> int:
+        """Number of TF-IDF feature columns."""
+        return self.weights.shape[0]
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Any, label_encoder: Any) -> "CompiledModel":
+        """
+        Build a compiled engine from a fitted TF-IDF + LogisticRegression pipeline.
+
+        Args:
+            pipeline: Fitted pipeline whose first step is a char TfidfVectorizer
+                and whose last step is a linear classifier
+            label_encoder: Fitted LabelEncoder used to encode the training labels
+
+        Returns:
+            Compiled model producing the same probabilities as the pipeline
+
+        Raises:
+            ValueError: If the pipeline is not fitted or uses unsupported settings
+        """
+        steps = getattr(pipeline, "steps", None)
+        if not steps or len(steps) != 2:
+            raise ValueError("Expected a two-step vectorizer + classifier pipeline")
+
+        vectorizer = steps[0][1]
+        classifier = steps[-1][1]
+
+        if not hasattr(vectorizer, "vocabulary_") or not hasattr(classifier, "coef_"):
+            raise ValueError("Pipeline must be fitted before it can be compiled")
+        if getattr(label_encoder, "classes_", None) is None:
+            raise ValueError("Label encoder must be fitted before it can be compiled")
+
+        _check_vectorizer(vectorizer)
+
+        min_n, max_n = vectorizer.ngram_range
+        terms = sorted(vectorizer.vocabulary_)
+        width = max([max_n] + [len(term) for term in terms])
+
+        n_features = len(vectorizer.vocabulary_)
+        if vectorizer.use_idf:
+            idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+        else:
+            idf = np.ones(n_features, dtype=np.float64)
+
+        weights, intercept, link = _linear_parameters(classifier)
+        class_names = np.asarray(label_encoder.classes_)[classifier.classes_]
+
+        return cls(
+            vocabulary=np.array(terms, dtype=f"<U{width}"),
+            columns=np.array(
+                [vectorizer.vocabulary_[term] for term in terms], dtype=np.int32
+            ),
+            idf=idf,
+            weights=np.ascontiguousarray(weights.T, dtype=np.float64),
+            intercept=np.ascontiguousarray(intercept, dtype=np.float64),
+            class_names=np.asarray(class_names, dtype=str),
+            ngram_range=(int(min_n), int(max_n)),
+            lowercase=bool(vectorizer.lowercase),
+            binary=bool(vectorizer.binary),
+            sublinear_tf=bool(vectorizer.sublinear_tf),
+            norm=vectorizer.norm,
+            link=link,
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Save the engine in the memory-mappable compiled model format.
+
+        The file is written next to its destination and renamed into place,
+        so processes that already mapped the old file keep a consistent view.
+        Saving over the file this engine is mapped from is supported: where
+        the rename is refused (Windows), the arrays are first read into
+        memory to release the mapping.
+
+        Args:
+            path: Destination file path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        arrays = {
+            name: np.ascontiguousarray(getattr(self, name)) for name in _ARRAY_FIELDS
+        }
+        config = {
+            field.name: getattr(self, field.name)
+            for field in fields(self)
+            if field.name not in _ARRAY_FIELDS
+        }
+
+        # Offsets are relative to the start of the data section
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            offset = _align(offset)
+            layout[name] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset,
+            }
+            offset += array.nbytes
+
+        header = json.dumps(
+            {"version": COMPILED_MODEL_VERSION, "config": config, "arrays": layout}
+        ).encode("utf-8")
+        data_start = _align(len(COMPILED_MODEL_MAGIC) + 8 + len(header))
+
+        def write(f) -> None:
+            f.write(COMPILED_MODEL_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, array in arrays.items():
+                f.write(b"\0" * (data_start + layout[name]["offset"] - f.tell()))
+                f.write(array.tobytes())
+
+        # The local copies above may be views of the mapping as well
+        def release() -> None:
+            arrays.clear()
+            self._release_mapping()
+
+        write_atomically(path, write, release)
+
+    def _release_mapping(self) -> None:
+        """
+        Read memory-mapped arrays into memory so their file can be replaced.
+
+        The engine is updated in place, so every holder of it lets go of the
+        mapping; it is closed once no other array views it.
+        """
+        for name in _ARRAY_FIELDS:
+            array = getattr(self, name)
+            if not array.flags.owndata:
+                setattr(self, name, np.array(array))
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "CompiledModel":
+        """
+        Load an engine saved with :meth:`save`.
+
+        With ``mmap=True`` every array is a read-only view of one shared file
+        mapping, so worker processes share the same physical pages and load
+        time does not depend on model size.
+
+        Args:
+            path: Compiled model file path
+            mmap: Whether to memory-map the arrays instead of reading them
+
+        Returns:
+            Loaded compiled model
+
+        Raises:
+            ValueError: If the file is not a compiled model
+        """
+        path = Path(path)
+        with open(path, "rb") as f:
+            if f.read(len(COMPILED_MODEL_MAGIC)) != COMPILED_MODEL_MAGIC:
+                raise ValueError(f"{path} is not a compiled model file")
+            header_size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_size).decode("utf-8"))
+
+        if header.get("version") != COMPILED_MODEL_VERSION:
+            raise ValueError(
+                f"Unsupported compiled model version: {header.get('version')}"
+            )
+
+        data_start = _align(len(COMPILED_MODEL_MAGIC) + 8 + header_size)
+        if mmap:
+            buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            buffer = np.fromfile(path, dtype=np.uint8)
+
+        arrays = {}
+        for name, spec in header["arrays"].items():
+            arrays[name] = np.ndarray(
+                tuple(spec["shape"]),
+                dtype=np.dtype(spec["dtype"]),
+                buffer=buffer,
+                offset=data_start + spec["offset"],
+            )
+
+        config = header["config"]
+        config["ngram_range"] = tuple(config["ngram_range"])
+
+        return cls(**arrays, **config)
+
+    @staticmethod
+    def is_compiled_model_file(path: Union[str, Path]) -> bool:
+        """
+        Check whether a file is in the compiled model format.
+
+        Args:
+            path: File path to check
+
+        Returns:
+            True if the file starts with the compiled model magic bytes
+        """
+        try:
+            with open(path, "rb") as f:
+                return f.read(len(COMPILED_MODEL_MAGIC)) == COMPILED_MODEL_MAGIC
+        except OSError:
+            return False
+
+    def _char_ngrams(self, documents: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Extract character n-grams for a batch of documents.
+
+        Args:
+            documents: Preprocessed names
+
+        Returns:
+            Tuple of (flat n-gram list, row pointer array into that list)
+        """
+        min_n, max_n = self.ngram_range
+        ngrams: List[str] = []
+        indptr = np.zeros(len(documents) + 1, dtype=np.int64)
+
+        for row, document in enumerate(documents):
+            if self.lowercase:
+                document = document.lower()
+            document = _WHITE_SPACES.sub(" ", document)
+
+            length = len(document)
+            for n in range(min_n, min(max_n, length) + 1):
+                ngrams.extend(document[i : i + n] for i in range(length - n + 1))
+            indptr[row + 1] = len(ngrams)
+
+        return ngrams, indptr
+
+    def transform(self, documents: Sequence[str]) -> sparse.csr_matrix:
+        """
+        Compute the TF-IDF feature matrix for a batch of preprocessed names.
+
+        Args:
+            documents: Preprocessed names
+
+        Returns:
+            Sparse matrix of shape (n_documents, n_features)
+        """
+        ngrams, indptr = self._char_ngrams(documents)
+
+        keys = np.asarray(ngrams, dtype=self.vocabulary.dtype)
+        if len(self.vocabulary):
+            positions = np.searchsorted(self.vocabulary, keys)
+            positions[positions == len(self.vocabulary)] = 0
+            found = self.vocabulary[positions] == keys
+        else:
+            positions = np.zeros(len(keys), dtype=np.intp)
+            found = np.zeros(len(keys), dtype=bool)
+
+        rows = np.repeat(np.arange(len(documents)), np.diff(indptr))[found]
+        columns = self.columns[positions[found]]
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, columns)),
+            shape=(len(documents), self.n_features),
+        )
+        matrix.sum_duplicates()
+
+        if self.binary:
+            matrix.data[:] = 1.0
+        elif self.sublinear_tf:
+            np.log(matrix.data, out=matrix.data)
+            matrix.data += 1.0
+
+        matrix.data *= self.idf[matrix.indices]
+
+        if self.norm is not None:
+            if self.norm == "l2":
+                row_norms = np.sqrt(_row_sums(matrix.data**2, matrix.indptr))
+            else:
+                row_norms = _row_sums(np.abs(matrix.data), matrix.indptr)
+            row_norms[row_norms == 0.0] = 1.0
+            matrix.data /= np.repeat(row_norms, np.diff(matrix.indptr))
+
+        return matrix
+
+    def predict_proba(self, documents: Sequence[str]) -> np.ndarray:
+        """
+        Predict class probabilities for a batch of preprocessed names.
+
+        Args:
+            documents: Preprocessed names
+
+        Returns:
+            Probability matrix of shape (n_documents, n_classes), with columns
+            ordered like ``class_names``
+        """
+        scores = self.transform(documents) @ self.weights
+        scores += self.intercept
+
+        if self.link == "softmax":
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+        else:
+            # One-vs-rest: independent logistic outputs, normalized per row
+            np.negative(scores, out=scores)
+            np.exp(scores, out=scores)
+            scores += 1.0
+            np.reciprocal(scores, out=scores)
+
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the array alignment."""
+    return -(-offset // _ARRAY_ALIGNMENT) * _ARRAY_ALIGNMENT
+
+
+def _row_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    """Sum CSR data values per row."""
+    sums = np.zeros(len(indptr) - 1, dtype=np.float64)
+    non_empty = np.diff(indptr) > 0
+    if values.size:
+        sums[non_empty] = np.add.reduceat(values, indptr[:-1][non_empty])
+    return sums
+
+
+def _check_vectorizer(vectorizer: Any) -> None:
+    """Reject vectorizer settings the compiled engine cannot reproduce."""
+    if getattr(vectorizer, "analyzer", None) != "char":
+        raise ValueError("Only char-level vectorizers can be compiled")
+    if not hasattr(vectorizer, "idf_") and getattr(vectorizer, "use_idf", False):
+        raise ValueError("Only fitted TfidfVectorizer pipelines can be compiled")
+    if vectorizer.preprocessor is not None or vectorizer.strip_accents is not None:
+        raise ValueError("Custom preprocessing is not supported by compiled models")
+    if vectorizer.norm not in ("l1", "l2", None):
+        raise ValueError(f"Unsupported vectorizer norm: {vectorizer.norm}")
+
+
+def _linear_parameters(classifier: Any) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Convert a linear classifier into per-class weights and a link function.
+
+    Binary models are expanded to two rows so the same softmax applies.
+
+    Returns:
+        Tuple of (coefficients (n_classes, n_features), intercepts, link)
+    """
+    coef = np.asarray(classifier.coef_, dtype=np.float64)
+    intercept = np.broadcast_to(
+        np.asarray(classifier.intercept_, dtype=np.float64), (coef.shape[0],)
+    )
+    multi_class = getattr(classifier, "multi_class", "auto")
+
+    if coef.shape[0] == 1:
+        if multi_class == "multinomial":
+            # Legacy binary multinomial models apply softmax to [-d, d]
+            return (
+                np.vstack([-coef, coef]),
+                np.hstack([-intercept, intercept]),
+                "softmax",
+            )
+        # Binary logistic: expit(d) == softmax([0, d])[1]
+        return (
+            np.vstack([np.zeros_like(coef), coef]),
+            np.hstack([np.zeros_like(intercept), intercept]),
+            "softmax",
+        )
+
+    solver = getattr(classifier, "solver", None)
+    legacy_auto = multi_class in ("auto", "warn", "deprecated")
+    if multi_class == "ovr" or (legacy_auto and solver == "liblinear"):
+        return coef, intercept, "ovr"
+
+    return coef, intercept, "softmax"
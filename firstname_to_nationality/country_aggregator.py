@@ -0,0 +1,216 @@
+"""
+Mergeable streaming aggregation of country statistics.
+
+A CountryAggregator consumes names chunk by chunk and keeps only integer
+count arrays indexed by label code, so arbitrarily long streams can be
+aggregated in bounded memory. Aggregators built in other processes or on
+other machines can be merged before producing the final report.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .firstname_to_nationality import EncodedPredictions
+
+if TYPE_CHECKING:
+    from .firstname_to_country import FirstnameToCountry
+
+# first_seen value of labels that have not been counted yet
+_UNSEEN = np.iinfo(np.int64).max
+
+
+class CountryAggregator:
+    """
+    Incremental nationality counts for a stream of names.
+
+    ``report()`` returns exactly what ``FirstnameToCountry.predict_batch``
+    with ``aggregate=True`` returns for all names seen so far, including
+    the order of nationalities with equal counts (first appearance wins).
+    """
+
+    def __init__(
+        self,
+        predictor: Optional[FirstnameToCountry] = None,
+        top_n: int = 1,
+        use_dict: bool = True,
+    ):
+        """
+        Initialize an empty aggregator.
+
+        Args:
+            predictor: Country predictor used to score names and resolve
+                countries (optional for aggregators that are only merged)
+            top_n: Number of top predictions counted per name
+            use_dict: Whether to use dictionary lookup
+
+        Raises:
+            ValueError: If top_n is not a positive integer
+        """
+        if top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+
+        self.predictor = predictor
+        self.top_n = top_n
+        self.use_dict = use_dict
+
+        self.labels: List[str] = []
+        self.n_classes = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.first_seen = np.zeros(0, dtype=np.int64)
+        self.total_names = 0
+        self._label_codes: Dict[str, int] = {}
+        # Number of predictions counted so far; orders first appearances
+        self._seen = 0
+
+    def _codes_for(self, labels: List[str]) -> np.ndarray:
+        """Map a label table onto this aggregator's codes, adding new labels."""
+        codes = []
+        for label in labels:
+            code = self._label_codes.get(label)
+            if code is None:
+                code = self._label_codes[label] = len(self.labels)
+                self.labels.append(label)
+            codes.append(code)
+
+        grow = len(self.labels) - len(self.counts)
+        if grow > 0:
+            self.counts = np.concatenate([self.counts, np.zeros(grow, np.int64)])
+            self.first_seen = np.concatenate(
+                [self.first_seen, np.full(grow, _UNSEEN, np.int64)]
+            )
+
+        return np.asarray(codes, dtype=np.intp)
+
+    def add_encoded(self, encoded: EncodedPredictions) -> "CountryAggregator":
+        """
+        Count a batch of label-coded predictions.
+
+        Args:
+            encoded: Batch predictions from ``predict_encoded``
+
+        Returns:
+            This aggregator
+        """
+        if not self.labels:
+            self.n_classes = encoded.n_classes
+
+        remap = self._codes_for(encoded.labels)
+        codes = encoded.indices.ravel()
+        codes = remap[codes[codes >= 0]]
+
+        self.counts += np.bincount(codes, minlength=len(self.labels))
+        present, first = np.unique(codes, return_index=True)
+        unseen = self.first_seen[present] == _UNSEEN
+        self.first_seen[present[unseen]] = self._seen + first[unseen]
+
+        self._seen += len(codes)
+        self.total_names += len(encoded)
+        return self
+
+    def update(
+        self, names: Iterable[str], batch_size: int = 100_000
+    ) -> "CountryAggregator":
+        """
+        Predict and count a chunk (or a whole stream) of names.
+
+        Names are pulled from the iterable ``batch_size`` at a time, so a
+        generator over a huge file is aggregated in bounded memory.
+
+        Args:
+            names: Iterable of names
+            batch_size: Number of names predicted at once
+
+        Returns:
+            This aggregator
+
+        Raises:
+            ValueError: If the aggregator has no predictor or batch_size < 1
+        """
+        if self.predictor is None:
+            raise ValueError("A predictor is required to aggregate new names")
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        names = iter(names)
+        while True:
+            batch = list(islice(names, batch_size))
+            if not batch:
+                return self
+            self.add_encoded(
+                self.predictor.nationality_predictor.predict_encoded(
+                    batch, top_n=self.top_n, use_dict=self.use_dict
+                )
+            )
+
+    def merge(self, other: "CountryAggregator") -> "CountryAggregator":
+        """
+        Add the counts of another aggregator to this one.
+
+        The other aggregator's names are treated as coming after the names
+        already counted here.
+
+        Args:
+            other: Aggregator with the same top_n and use_dict settings
+
+        Returns:
+            This aggregator
+
+        Raises:
+            ValueError: If the aggregators were built with different settings
+        """
+        if (other.top_n, other.use_dict) != (self.top_n, self.use_dict):
+            raise ValueError(
+                "Cannot merge aggregators with different top_n/use_dict settings"
+            )
+
+        if not self.labels:
+            self.n_classes = other.n_classes
+
+        remap = self._codes_for(other.labels)
+        self.counts[remap] += other.counts
+
+        seen = other.first_seen != _UNSEEN
+        targets = remap[seen]
+        unseen = self.first_seen[targets] == _UNSEEN
+        self.first_seen[targets[unseen]] = self._seen + other.first_seen[seen][unseen]
+
+        self._seen += other._seen
+        self.total_names += other.total_names
+        return self
+
+    def report(self) -> Dict[str, any]:
+        """
+        Build the aggregated report for every name counted so far.
+
+        Returns:
+            Dictionary with aggregated nationality counts and country codes,
+            in the format of ``FirstnameToCountry.predict_batch``
+
+        Raises:
+            ValueError: If there is no predictor to resolve countries with
+        """
+        if self.predictor is None:
+            raise ValueError("A predictor is required to resolve countries")
+        if self.total_names == 0:
+            return {"total_names": 0, "nationalities": []}
+
+        present = np.flatnonzero(self.counts)
+        order = present[np.lexsort((self.first_seen[present], -self.counts[present]))]
+
+        return self.predictor._aggregation_report(
+            self.labels,
+            self.predictor._label_countries(self.labels, self.n_classes),
+            order.tolist(),
+            self.counts[order].tolist(),
+            self.total_names,
+        )
+
+    def __getstate__(self):
+        # The predictor stays behind when aggregators are sent between processes
+        state = self.__dict__.copy()
+        state["predictor"] = None
+        return state
@@ -0,0 +1,350 @@
+"""
+On-disk cache of training corpora and feature matrices.
+
+Training spends most of its time preprocessing names and fitting the
+vectorizer, even when only classifier settings change between runs. The
+cache keeps two kinds of entries:
+
+- corpus entries, keyed by a content hash of the training data and the
+  preprocessing settings, hold the deduplicated preprocessed names, their
+  labels and pair counts;
+- feature entries, keyed by the corpus key and the vectorizer settings,
+  hold the fitted vectorizer and its sparse feature matrix.
+
+Arrays are stored as ``.npy`` files and memory-mapped on load, so a cached
+matrix is paged in by the classifier instead of being read up front. Keys
+change whenever the data or settings change, so stale entries are never
+read. The two kinds are pruned separately, least recently used first:
+corpus entries beyond ``max_entries``, and feature entries once together
+they take more than ``max_bytes`` on disk. Many small feature entries, such
+as the fold matrices of a tuning run, therefore do not push out the corpora
+or each other.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+# Bumped whenever the entry layout changes, so old entries miss
+FEATURE_CACHE_VERSION = 1
+
+# Rows hashed per update of the content hash
+_HASH_CHUNK = 100_000
+
+# Name prefixes of the entry kinds, and of entries still being written
+_CORPUS_PREFIX = "corpus-"
+_FEATURES_PREFIX = "features-"
+_TEMP_PREFIX = ".tmp-"
+
+
+def _hash_strings(digest: "hashlib._Hash", values: Sequence[str]) -> None:
+    """Feed a sequence of strings into a hash, unambiguously separated."""
+    for start in range(0, len(values), _HASH_CHUNK):
+        chunk = values[start : start + _HASH_CHUNK]
+        digest.update("\0".join(chunk).encode("utf-8", "surrogatepass"))
+        digest.update(b"\1")
+    digest.update(str(len(values)).encode())
+
+
+def _settings_json(settings: Any) -> str:
+    """Stable JSON form of estimator settings (types and objects by repr)."""
+    return json.dumps(settings, sort_keys=True, default=repr)
+
+
+class FeatureCache:
+    """Persistent cache of preprocessed corpora and fitted feature matrices."""
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_entries: int = 8,
+        max_bytes: Optional[int] = 4 * 1024**3,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Cache directory (created on first write)
+            max_entries: Number of corpus entries kept before the least
+                recently used ones are deleted
+            max_bytes: Disk space of the feature entries above which the
+                least recently used ones are deleted; the most recent entry
+                is always kept (None for no limit)
+
+        Raises:
+            ValueError: If max_entries or max_bytes is not positive
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("max_bytes must be a positive integer")
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def corpus_key(
+        names: Sequence[str], nationalities: Sequence[str], preprocessing: Any
+    ) -> str:
+        """
+        Content hash of a training set.
+
+        Args:
+            names: Training names
+            nationalities: Corresponding nationalities
+            preprocessing: Settings of the name preprocessing
+
+        Returns:
+            Hex digest identifying the data and how it is preprocessed
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"v{FEATURE_CACHE_VERSION}".encode())
+        digest.update(_settings_json(preprocessing).encode())
+        _hash_strings(digest, names)
+        _hash_strings(digest, nationalities)
+        return digest.hexdigest()
+
+    @staticmethod
+    def features_key(corpus_key: str, vectorizer: Any) -> str:
+        """
+        Key of a feature matrix built from a corpus.
+
+        Args:
+            corpus_key: Key of the corpus the features are built from
+            vectorizer: Unfitted vectorizer (its class and parameters count)
+
+        Returns:
+            Hex digest identifying the corpus and vectorizer settings
+        """
+        import sklearn
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(corpus_key.encode())
+        digest.update(type(vectorizer).__qualname__.encode())
+        digest.update(sklearn.__version__.encode())
+        digest.update(_settings_json(vectorizer.get_params()).encode())
+        return digest.hexdigest()
+
+    def load_corpus(
+        self, key: str
+    ) -> Optional[Tuple[List[str], List[str], np.ndarray]]:
+        """
+        Load a cached corpus.
+
+        Args:
+            key: Corpus key
+
+        Returns:
+            Tuple of (distinct preprocessed names, nationalities, pair
+            counts), or None if the corpus is not cached
+        """
+        entry = self._open(f"{_CORPUS_PREFIX}{key}")
+        if entry is None:
+            return None
+        arrays, meta = entry
+
+        blob = arrays["documents"].tobytes().decode("utf-8")
+        offsets = arrays["document_offsets"]
+        documents = [
+            blob[start:end]
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+        ]
+        labels = meta["labels"]
+        nationalities = [labels[code] for code in arrays["label_codes"].tolist()]
+        return documents, nationalities, np.asarray(arrays["weights"])
+
+    def save_corpus(
+        self,
+        key: str,
+        documents: Sequence[str],
+        nationalities: Sequence[str],
+        weights: Sequence[int],
+    ) -> None:
+        """
+        Cache a deduplicated, preprocessed corpus.
+
+        Args:
+            key: Corpus key
+            documents: Distinct preprocessed names
+            nationalities: Nationality of each row
+            weights: Number of occurrences of each row
+        """
+        # Offsets count characters, so documents are sliced from the
+        # decoded blob without decoding each name separately
+        lengths = np.fromiter(map(len, documents), dtype=np.int64, count=len(documents))
+        offsets = np.zeros(len(documents) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        labels = sorted(set(nationalities))
+        label_index = {label: code for code, label in enumerate(labels)}
+        arrays = {
+            "documents": np.frombuffer(
+                "".join(documents).encode("utf-8"), dtype=np.uint8
+            ),
+            "document_offsets": offsets,
+            "label_codes": np.array(
+                [label_index[nationality] for nationality in nationalities],
+                dtype=np.int32,
+            ),
+            "weights": np.asarray(weights, dtype=np.float64),
+        }
+        self._write(f"{_CORPUS_PREFIX}{key}", arrays, {"labels": labels})
+
+    def load_features(self, key: str) -> Optional[Tuple[Any, sparse.csr_matrix]]:
+        """
+        Load a cached vectorizer and feature matrix.
+
+        Args:
+            key: Features key
+
+        Returns:
+            Tuple of (fitted vectorizer, memory-mapped CSR matrix), or None
+            if the features are not cached
+        """
+        import joblib
+
+        entry = self._open(f"{_FEATURES_PREFIX}{key}")
+        if entry is None:
+            return None
+        arrays, meta = entry
+
+        vectorizer = joblib.load(
+            self.directory / f"{_FEATURES_PREFIX}{key}" / "vectorizer.joblib"
+        )
+        features = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(meta["shape"]),
+            copy=False,
+        )
+        return vectorizer, features
+
+    def save_features(
+        self, key: str, vectorizer: Any, features: sparse.csr_matrix
+    ) -> None:
+        """
+        Cache a fitted vectorizer and its feature matrix.
+
+        Args:
+            key: Features key
+            vectorizer: Fitted vectorizer
+            features: Feature matrix of the corpus
+        """
+        import joblib
+
+        features = sparse.csr_matrix(features)
+        arrays = {
+            "data": features.data,
+            "indices": features.indices,
+            "indptr": features.indptr,
+        }
+
+        def write_vectorizer(directory: Path) -> None:
+            joblib.dump(vectorizer, directory / "vectorizer.joblib")
+
+        self._write(
+            f"{_FEATURES_PREFIX}{key}",
+            arrays,
+            {"shape": list(features.shape)},
+            write_vectorizer,
+        )
+
+    def clear(self) -> None:
+        """Delete every cache entry, leaving other files in the directory."""
+        if not self.directory.is_dir():
+            return
+        for path in self.directory.iterdir():
+            if path.name.startswith((_CORPUS_PREFIX, _FEATURES_PREFIX, _TEMP_PREFIX)):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _open(
+        self, name: str
+    ) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+        """Memory-map the arrays of an entry, or None if it does not exist."""
+        entry = self.directory / name
+        try:
+            with open(entry / "meta.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            arrays = {
+                array_name: np.load(entry / f"{array_name}.npy", mmap_mode="r")
+                for array_name in meta["arrays"]
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Mark the entry as recently used for pruning
+        os.utime(entry)
+        return arrays, meta
+
+    def _write(
+        self,
+        name: str,
+        arrays: Dict[str, np.ndarray],
+        meta: Dict[str, Any],
+        write_extra=None,
+    ) -> None:
+        """Write an entry to a temporary directory and rename it into place."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_dir = Path(tempfile.mkdtemp(dir=self.directory, prefix=_TEMP_PREFIX))
+        try:
+            for array_name, values in arrays.items():
+                np.save(temp_dir / f"{array_name}.npy", values)
+            if write_extra is not None:
+                write_extra(temp_dir)
+            # meta.json is written last; entries without it are never read
+            with open(temp_dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(dict(meta, arrays=list(arrays)), f)
+
+            target = self.directory / name
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(temp_dir, target)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+        self._prune()
+
+    def _prune(self) -> None:
+        """Delete the least recently used corpus and feature entries."""
+        corpora = self._entries(_CORPUS_PREFIX)
+        for _, path in corpora[self.max_entries :]:
+            shutil.rmtree(path, ignore_errors=True)
+
+        if self.max_bytes is None:
+            return
+        total = 0
+        for index, (_, path) in enumerate(self._entries(_FEATURES_PREFIX)):
+            total += self._entry_bytes(path)
+            if index > 0 and total > self.max_bytes:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _entries(self, prefix: str) -> List[Tuple[float, Path]]:
+        """Entries of one kind with their last use, most recent first."""
+        entries = []
+        for path in self.directory.iterdir():
+            if not path.name.startswith(prefix):
+                continue
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                # Deleted by another process pruning the same directory
+                continue
+        entries.sort(reverse=True)
+        return entries
+
+    @staticmethod
+    def _entry_bytes(path: Path) -> int:
+        """Disk space taken by the files of an entry."""
+        total = 0
+        try:
+            for file_path in path.iterdir():
+                total += file_path.stat().st_size
+        except OSError:
+            pass
+        return total
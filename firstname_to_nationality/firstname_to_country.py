@@ -5,14 +5,34 @@ This module extends the FirstnameToNationality predictor to map names to countri
 using a nationality-to-country mapping CSV file.
 """
 
+from __future__ import annotations
+
 import os
 import csv
+import threading
+from types import MappingProxyType
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Tuple,
+    Optional,
+    Union,
+)
 from dataclasses import dataclass
 
-from .firstname_to_nationality import FirstnameToNationality
+from .firstname_to_nationality import EncodedPredictions, FirstnameToNationality
 
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+
+    from .country_aggregator import CountryAggregator
 
 # Constants
 COUNTRY_NATIONALITY_CSV = (
@@ -43,6 +63,8 @@ class FirstnameToCountry:
         model_path: str = None,
         dictionary_path: str = None,
         country_csv_path: str = COUNTRY_NATIONALITY_CSV,
+        lazy: bool = False,
+        cache_size: int = 0,
     ):
         """
         Initialize the FirstnameToCountry predictor.
@@ -51,26 +73,112 @@ class FirstnameToCountry:
             model_path: Path to the model checkpoint file (optional)
             dictionary_path: Path to the nationality dictionary file (optional)
             country_csv_path: Path to the country-nationality CSV file
+            lazy: Load the model, dictionary and CSV on first use instead of now
+            cache_size: Size of the nationality predictor's LRU prediction cache
         """
         # Initialize the nationality predictor
-        if model_path and dictionary_path:
-            self.nationality_predictor = FirstnameToNationality(
-                model_path, dictionary_path
-            )
-        else:
-            self.nationality_predictor = FirstnameToNationality()
+        # Either path may be given alone; the other keeps its default
+        paths = {}
+        if model_path:
+            paths["model_path"] = model_path
+        if dictionary_path:
+            paths["dictionary_path"] = dictionary_path
+        self.nationality_predictor = FirstnameToNationality(
+            **paths, lazy=lazy, cache_size=cache_size
+        )
 
         # Load country-nationality mapping
         self.country_csv_path = Path(country_csv_path)
-        self.nationality_to_country: Dict[str, Dict[str, str]] = {}
-        self._load_country_mapping()
+        self._nationality_to_country: Dict[str, Dict[str, str]] = {}
+        self._country_mapping_loaded = False
+        # Guards lazy loading and replacing the country mapping
+        self._lock = threading.RLock()
+
+        # Resolved nationality labels, rebuilt when the model or CSV changes.
+        # Each cache is one tuple, so concurrent readers see a consistent pair
+        self._country_mapping_version = 0
+        # (mapping version, label -> country information)
+        self._resolved: Tuple[int, Dict[str, Optional[Dict[str, str]]]] = (0, {})
+        # (class names, mapping version, country information per class)
+        self._class_countries: Tuple[Any, int, List[Optional[Dict[str, str]]]] = (
+            None,
+            -1,
+            [],
+        )
+        # (class country table, (matrix, country information per column))
+        self._country_matrix_data: Tuple[Any, Optional[Tuple[csr_matrix, List]]] = (
+            None,
+            None,
+        )
+
+        if not lazy:
+            self._load_country_mapping()
+            self._class_country_table()
+
+    @property
+    def nationality_to_country(self) -> Mapping[str, Dict[str, str]]:
+        """
+        Nationality-to-country mapping, loaded from the CSV on first access.
+
+        The mapping is a read-only view, because resolved labels are cached
+        per mapping; assign a new mapping to change it.
+        """
+        self._ensure_country_mapping()
+        return MappingProxyType(self._nationality_to_country)
+
+    @nationality_to_country.setter
+    def nationality_to_country(self, mapping: Mapping[str, Dict[str, str]]) -> None:
+        with self._lock:
+            # A private copy, so later edits to the caller's dict cannot
+            # bypass the version bump below
+            self._nationality_to_country = dict(mapping)
+            self._country_mapping_loaded = True
+            self._country_mapping_version += 1
+
+    def __getstate__(self):
+        # Locks cannot be pickled; a copy gets its own
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "FirstnameToCountry":
+        """Use the predictor as a context manager that closes its workers."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Stop the worker processes on exit."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes started by ``n_jobs`` predictions."""
+        self.nationality_predictor.close()
+
+    def warmup(self) -> None:
+        """Load the nationality model, dictionary and country mapping now."""
+        self.nationality_predictor.warmup()
+        self._ensure_country_mapping()
+        self._class_country_table()
+
+    def _ensure_country_mapping(self) -> None:
+        """Load the country mapping once, even when many threads ask at once."""
+        if not self._country_mapping_loaded:
+            with self._lock:
+                if not self._country_mapping_loaded:
+                    self._load_country_mapping()
 
     def _load_country_mapping(self) -> None:
         """Load the nationality-to-country mapping from CSV file."""
         if not self.country_csv_path.exists():
             print(f"Warning: Country CSV file not found at {self.country_csv_path}")
+            self.nationality_to_country = {}
             return
 
+        # Built aside and published at once, so readers never see a partial map
+        mapping: Dict[str, Dict[str, str]] = {}
         try:
             with open(self.country_csv_path, "r", encoding="utf-8") as f:
                 reader = csv.DictReader(f)
@@ -86,15 +194,14 @@ class FirstnameToCountry:
 
                     for nat in nationalities:
                         # Store mapping from nationality to country info
-                        self.nationality_to_country[nat.lower()] = {
+                        mapping[nat.lower()] = {
                             "country_name": row["Country Name"],
                             "alpha2": row["Alpha-2 Code"],
                             "alpha3": row["Alpha-3 Code"],
                         }
 
-            print(
-                f"✅ Loaded {len(self.nationality_to_country)} nationality-to-country mappings"
-            )
+            self.nationality_to_country = mapping
+            print(f"✅ Loaded {len(mapping)} nationality-to-country mappings")
 
         except Exception as e:
             print(
@@ -102,11 +209,121 @@ class FirstnameToCountry:
             )
             self.nationality_to_country = {}
 
+    def _class_country_table(self) -> List[Optional[Dict[str, str]]]:
+        """
+        Get the country information of every model class.
+
+        Every label of the nationality model is resolved once, so mapping a
+        predicted class index to its country is a list lookup. The table is
+        rebuilt when the model's classes or the country mapping change.
+
+        Returns:
+            List indexed like the model's probability columns, holding the
+            country information of each class or None if it has no match
+        """
+        mapping_version = self._country_mapping_version
+        class_names = self.nationality_predictor._get_class_names()
+
+        source, version, class_countries = self._class_countries
+        if class_names is not source or mapping_version != version:
+            if class_names is None:
+                class_countries = []
+            else:
+                class_countries = [
+                    self._map_nationality_to_country(str(label))
+                    for label in class_names
+                ]
+            self._class_countries = (class_names, mapping_version, class_countries)
+
+        return class_countries
+
+    def _country_matrix(self) -> Tuple[csr_matrix, List[Dict[str, str]]]:
+        """
+        Get the sparse class-by-country matrix of the current model.
+
+        Entry (i, j) is 1 when class i resolves to country j, so multiplying
+        a probability matrix by it sums the probabilities of all demonyms of
+        a country. Only countries some class resolves to get a column. The
+        matrix is rebuilt together with the class resolution table.
+
+        Returns:
+            Tuple of (matrix of shape (n_classes, n_countries), country
+            information for each column)
+        """
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        class_countries = self._class_country_table()
+        source, matrix_data = self._country_matrix_data
+        if source is not class_countries:
+            countries: List[Dict[str, str]] = []
+            columns: Dict[Tuple[str, str, str], int] = {}
+            rows = []
+            cols = []
+
+            for class_index, country_info in enumerate(class_countries):
+                if country_info is None:
+                    continue
+                key = (
+                    country_info["country_name"],
+                    country_info["alpha2"],
+                    country_info["alpha3"],
+                )
+                if key not in columns:
+                    columns[key] = len(countries)
+                    countries.append(country_info)
+                rows.append(class_index)
+                cols.append(columns[key])
+
+            matrix = csr_matrix(
+                (np.ones(len(rows)), (rows, cols)),
+                shape=(len(class_countries), len(countries)),
+            )
+            matrix_data = (matrix, countries)
+            self._country_matrix_data = (class_countries, matrix_data)
+
+        return matrix_data
+
     def _map_nationality_to_country(self, nationality: str) -> Optional[Dict[str, str]]:
         """
         Map a nationality to country information.
 
+        Results are remembered per label until the country mapping changes,
+        so the partial-match scan runs at most once for each label.
+
+        Args:
+            nationality: The nationality string
+
+        Returns:
+            Dictionary with country_name, alpha2, alpha3 or None if not found
+        """
+        # Version first: a mapping replaced in between only discards the memo
+        mapping_version = self._country_mapping_version
+        self._ensure_country_mapping()
+        mapping = self._nationality_to_country
+        version, resolved = self._resolved
+        if version != mapping_version:
+            resolved = {}
+            self._resolved = (mapping_version, resolved)
+
+        try:
+            return resolved[nationality]
+        except KeyError:
+            pass
+
+        country_info = self._match_nationality(mapping, nationality)
+        resolved[nationality] = country_info
+        return country_info
+
+    @staticmethod
+    def _match_nationality(
+        mapping: Mapping[str, Dict[str, str]], nationality: str
+    ) -> Optional[Dict[str, str]]:
+        """
+        Find the country of a nationality with the exact and partial rules.
+
         Args:
+            mapping: Nationality-to-country mapping to search
             nationality: The nationality string
 
         Returns:
@@ -114,11 +331,11 @@ class FirstnameToCountry:
         """
         # Try exact match first (case-insensitive)
         nationality_lower = nationality.lower()
-        if nationality_lower in self.nationality_to_country:
-            return self.nationality_to_country[nationality_lower]
+        if nationality_lower in mapping:
+            return mapping[nationality_lower]
 
         # Try partial matches
-        for nat_key, country_info in self.nationality_to_country.items():
+        for nat_key, country_info in mapping.items():
             if nat_key in nationality_lower or nationality_lower in nat_key:
                 return country_info
 
@@ -143,6 +360,20 @@ class FirstnameToCountry:
             name, top_n=top_n, use_dict=use_dict
         )
 
+        return self._to_country_predictions(nationality_predictions)
+
+    def _to_country_predictions(
+        self, nationality_predictions: List[Tuple[str, float]]
+    ) -> List[Dict[str, any]]:
+        """
+        Attach country information to a list of nationality predictions.
+
+        Args:
+            nationality_predictions: List of (nationality, confidence) tuples
+
+        Returns:
+            List of dictionaries with nationality counts and country codes
+        """
         results = []
 
         for nationality, confidence in nationality_predictions:
@@ -174,68 +405,254 @@ class FirstnameToCountry:
         top_n: int = 1,
         use_dict: bool = True,
         aggregate: bool = True,
-    ) -> Dict[str, any]:
+        columnar: bool = False,
+        n_jobs: Optional[int] = None,
+        n_threads: Optional[int] = None,
+    ) -> Dict[str, any] | List[Dict[str, any]] | EncodedPredictions:
         """
         Predict countries for multiple names with aggregation.
 
+        Each distinct normalized name is predicted and mapped to a country
+        once; repeats only add to its count or get a copy of its result.
+        Aggregation counts integer label codes with a CountryAggregator and
+        never builds per-name results.
+
         Args:
             names: List of names
             top_n: Number of top predictions per name
             use_dict: Whether to use dictionary lookup
             aggregate: Whether to aggregate results across all names
+            columnar: With aggregate=False, return an EncodedPredictions with
+                label-code, confidence and country-code columns instead of
+                one dictionary per name
+            n_jobs: Number of worker processes sharing the loaded model
+                (None for in-process scoring, -1 for one per CPU)
+            n_threads: Number of threads scoring mini-batches concurrently
+                (None for one, -1 for one per CPU)
 
         Returns:
             If aggregate=True: Dictionary with aggregated nationality counts and country codes
             If aggregate=False: List of individual predictions per name
+            (or EncodedPredictions when columnar is True)
+
+        Raises:
+            ValueError: If columnar output is requested with aggregate=True,
+                or top_n is not a positive integer
         """
-        all_predictions = []
+        if top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+        if columnar:
+            if aggregate:
+                raise ValueError("columnar output requires aggregate=False")
+            return self.predict_columnar(
+                names,
+                top_n=top_n,
+                use_dict=use_dict,
+                n_jobs=n_jobs,
+                n_threads=n_threads,
+            )
 
-        for name in names:
-            predictions = self.predict_single(name, top_n=top_n, use_dict=use_dict)
-            all_predictions.append({"name": name, "predictions": predictions})
+        if aggregate:
+            if not names:
+                return {"total_names": 0, "nationalities": []}
+            encoded = self.nationality_predictor.predict_encoded(
+                names,
+                top_n=top_n,
+                use_dict=use_dict,
+                n_jobs=n_jobs,
+                n_threads=n_threads,
+            )
+            return self.aggregator(top_n, use_dict).add_encoded(encoded).report()
+
+        # Group input positions by normalized name
+        positions: Dict[str, List[int]] = {}
+        for position, name in enumerate(names):
+            positions.setdefault(name.lower().strip(), []).append(position)
+
+        unique_predictions = []
+        if positions:
+            nationality_results = self.nationality_predictor(
+                list(positions),
+                top_n=top_n,
+                use_dict=use_dict,
+                n_jobs=n_jobs,
+                n_threads=n_threads,
+            )
+            unique_predictions = [
+                self._to_country_predictions(predictions)
+                for _, predictions in nationality_results
+            ]
+
+        all_predictions = [None] * len(names)
+        for name_positions, predictions in zip(positions.values(), unique_predictions):
+            for position in name_positions:
+                all_predictions[position] = {
+                    "name": names[position],
+                    "predictions": [dict(pred) for pred in predictions],
+                }
+        return all_predictions
+
+    def predict_iter(
+        self,
+        names: Iterable[str],
+        top_n: int = 1,
+        use_dict: bool = True,
+        batch_size: int = 10_000,
+        n_jobs: Optional[int] = None,
+        n_threads: Optional[int] = None,
+    ) -> Iterator[Dict[str, any]]:
+        """
+        Lazily predict countries for a stream of names.
 
-        if not aggregate:
-            return all_predictions
+        Names are pulled from the iterable ``batch_size`` at a time, so
+        memory stays bounded by the batch size however long the stream is.
 
-        # Aggregate results
-        nationality_counts: Dict[str, int] = {}
-        country_code_mapping: Dict[str, Dict[str, str]] = {}
+        Args:
+            names: Iterable of names (e.g. a generator over a file)
+            top_n: Number of top predictions per name
+            use_dict: Whether to use dictionary lookup
+            batch_size: Number of names pulled and predicted at once
+            n_jobs: Number of worker processes per batch (see ``predict_batch``)
+            n_threads: Number of scoring threads per batch (see ``predict_batch``)
 
-        for item in all_predictions:
-            for pred in item["predictions"]:
-                nationality = pred["nationality"]
+        Yields:
+            One dictionary per name, in input order, as returned by
+            ``predict_batch`` with aggregate=False
 
-                # Count nationalities
-                if nationality not in nationality_counts:
-                    nationality_counts[nationality] = 0
-                nationality_counts[nationality] += 1
+        Raises:
+            ValueError: If batch_size is not a positive integer
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+
+        names = iter(names)
+        while True:
+            batch = list(islice(names, batch_size))
+            if not batch:
+                return
+            yield from self.predict_batch(
+                batch,
+                top_n,
+                use_dict,
+                aggregate=False,
+                n_jobs=n_jobs,
+                n_threads=n_threads,
+            )
 
-                # Store country code mapping
-                if nationality not in country_code_mapping and pred["country_code"]:
-                    country_code_mapping[nationality] = {
-                        "country_code": pred["country_code"],
-                        "country_name": pred["country_name"],
-                        "alpha3": pred["alpha3"],
-                    }
+    def predict_columnar(
+        self,
+        names: List[str],
+        top_n: int = 1,
+        use_dict: bool = True,
+        n_jobs: Optional[int] = None,
+        n_threads: Optional[int] = None,
+    ) -> EncodedPredictions:
+        """
+        Predict nationalities and countries as columnar arrays.
 
-        # Build aggregated result
-        result = {"total_names": len(names), "nationalities": []}
+        Args:
+            names: List of names
+            top_n: Number of top predictions per name
+            use_dict: Whether to use dictionary lookup
+            n_jobs: Number of worker processes (see ``predict_batch``)
+            n_threads: Number of scoring threads (see ``predict_batch``)
 
-        # Sort by count (descending)
-        sorted_nationalities = sorted(
-            nationality_counts.items(), key=lambda x: x[1], reverse=True
+        Returns:
+            EncodedPredictions whose country_codes give the alpha-2 code of
+            every label, ready for ``to_pandas``/``to_arrow``
+        """
+        encoded = self.nationality_predictor.predict_encoded(
+            names, top_n=top_n, use_dict=use_dict, n_jobs=n_jobs, n_threads=n_threads
         )
+        encoded.country_codes = [
+            country_info["alpha2"] if country_info and country_info["alpha2"] else None
+            for country_info in self._label_countries(encoded.labels, encoded.n_classes)
+        ]
+        return encoded
+
+    def _label_countries(
+        self, labels: List[str], n_classes: int
+    ) -> List[Optional[Dict[str, str]]]:
+        """
+        Get the country information of every entry of a label table.
+
+        Args:
+            labels: Label table whose first n_classes entries are model classes
+            n_classes: Number of model classes at the start of the table
+
+        Returns:
+            List aligned with labels, holding country information or None
+        """
+        class_countries = self._class_country_table()
+        class_names = self.nationality_predictor._get_class_names()
+        if (
+            len(class_countries) != n_classes
+            or class_names is None
+            or list(class_names) != labels[:n_classes]
+        ):
+            class_countries = [
+                self._map_nationality_to_country(label) for label in labels[:n_classes]
+            ]
+
+        return class_countries + [
+            self._map_nationality_to_country(label) for label in labels[n_classes:]
+        ]
+
+    def aggregator(self, top_n: int = 1, use_dict: bool = True) -> CountryAggregator:
+        """
+        Create an incremental, mergeable aggregator bound to this predictor.
+
+        Feed it chunks of names with ``update()``, combine aggregators from
+        other workers with ``merge()`` and call ``report()`` for the same
+        result ``predict_batch(aggregate=True)`` gives for all names at once.
+
+        Args:
+            top_n: Number of top predictions counted per name
+            use_dict: Whether to use dictionary lookup
+
+        Returns:
+            Empty CountryAggregator
+        """
+        from .country_aggregator import CountryAggregator
+
+        return CountryAggregator(self, top_n=top_n, use_dict=use_dict)
+
+    @staticmethod
+    def _aggregation_report(
+        labels: List[str],
+        label_countries: List[Optional[Dict[str, str]]],
+        codes: List[int],
+        counts: List[int],
+        total_names: int,
+    ) -> Dict[str, any]:
+        """
+        Build the aggregated result for already ordered nationality counts.
+
+        Args:
+            labels: Label table
+            label_countries: Country information aligned with labels
+            codes: Label codes in output order
+            counts: Count of each code in codes
+            total_names: Number of names the counts cover
+
+        Returns:
+            Dictionary with total_names and the list of nationality entries
+        """
+        result = {"total_names": total_names, "nationalities": []}
 
-        for nationality, count in sorted_nationalities:
+        for code, count in zip(codes, counts):
             nat_result = {
-                "nationality": nationality,
+                "nationality": labels[code],
                 "count": count,
-                "percentage": round(count / len(names) * 100, 2),
+                "percentage": round(count / total_names * 100, 2),
             }
 
             # Add country information if available
-            if nationality in country_code_mapping:
-                nat_result.update(country_code_mapping[nationality])
+            country_info = label_countries[code]
+            if country_info and country_info["alpha2"]:
+                nat_result["country_code"] = country_info["alpha2"]
+                nat_result["country_name"] = country_info["country_name"]
+                nat_result["alpha3"] = country_info["alpha3"]
             else:
                 nat_result["country_code"] = None
                 nat_result["country_name"] = None
@@ -245,6 +662,75 @@ class FirstnameToCountry:
 
         return result
 
+    def predict_country_distribution(
+        self,
+        names: Union[str, List[str]],
+        top_n: int = 3,
+        mini_batch_size: int = 128,
+    ) -> List[Dict[str, any]]:
+        """
+        Predict per-country probabilities for a batch of names.
+
+        The model's probability matrix for the whole batch is multiplied by
+        the class-by-country matrix, so the confidence of every demonym of a
+        country is summed (e.g. "Argentine" and "Argentinean"). The
+        dictionary is not used. Probability of classes that resolve to no
+        country is left out, so a row can sum to less than 1.
+
+        Args:
+            names: Single name string or list of names
+            top_n: Number of most probable countries per name
+            mini_batch_size: Number of distinct names scored per model call
+
+        Returns:
+            List of dictionaries with the name and its top countries, each
+            with country_code, country_name, alpha3 and probability
+
+        Raises:
+            ValueError: If top_n is not a positive integer or there is no
+                trained model to score with
+        """
+        import numpy as np
+
+        if top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+        if isinstance(names, str):
+            names = [names]
+
+        probabilities = self.nationality_predictor.predict_proba(
+            names, mini_batch_size=mini_batch_size
+        )
+        matrix, countries = self._country_matrix()
+        country_probabilities = np.asarray(probabilities @ matrix)
+
+        top_indices = FirstnameToNationality._top_n_indices(
+            country_probabilities, top_n
+        )
+        top_probabilities = np.take_along_axis(
+            country_probabilities, top_indices, axis=1
+        )
+
+        results = []
+        for name, indices, row_probabilities in zip(
+            names, top_indices.tolist(), top_probabilities.tolist()
+        ):
+            results.append(
+                {
+                    "name": name,
+                    "countries": [
+                        {
+                            "country_code": countries[index]["alpha2"],
+                            "country_name": countries[index]["country_name"],
+                            "alpha3": countries[index]["alpha3"],
+                            "probability": probability,
+                        }
+                        for index, probability in zip(indices, row_probabilities)
+                    ],
+                }
+            )
+
+        return results
+
     def __call__(
         self,
         names: str | List[str],
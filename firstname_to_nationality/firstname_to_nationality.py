@@ -5,19 +5,49 @@ An implementation using machine learning libraries and Python 3.13
 features for predicting nationality from names.
 """
 
+from __future__ import annotations
+
 import os
-import pickle
 import re
+import threading
+from collections import Counter
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple, Union, Optional, Dict, Any
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Union,
+    Optional,
+    Dict,
+    Any,
+)
 from dataclasses import dataclass
 
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import LabelEncoder
-import joblib
+from .atomic_file import write_atomically
+from .name_dictionary import (
+    NameDictionary,
+    load_name_dictionary,
+    write_name_dictionary,
+)
+from .prediction_cache import CacheStats, PredictionCache
+
+# numpy, scikit-learn and joblib are imported on the code paths that use them,
+# so importing the package (or only using the preprocessor or dictionary)
+# stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import LabelEncoder
+
+    from .compiled_model import CompiledModel
+    from .feature_cache import FeatureCache
+    from .parallel import WorkerPool
 
 # Constants - file paths for model and dictionary
 MODEL_PATH = os.path.dirname(os.path.abspath(__file__)) + "/best-model.pt"
@@ -26,6 +56,12 @@ DICTIONARY_PATH = (
 )
 
 
+# Characters dropped by preprocessing: everything except word characters,
+# hyphens and plain spaces. Removing special characters and then any
+# whitespace other than " " in one pass gives the same result as doing both.
+_DROPPED_CHARACTERS = re.compile(r"[^\w -]")
+
+
 @dataclass
 class PredictionResult:
     """Data class for prediction results."""
@@ -34,6 +70,156 @@ class PredictionResult:
     confidence: float
 
 
+@dataclass
+class EncodedPredictions:
+    """
+    Data class for batch predictions stored as integer label codes.
+
+    Row ``i`` holds the predictions for ``names[i]``, best first. Codes index
+    into ``labels``, whose first ``n_classes`` entries are the model classes
+    in probability-column order; labels that only come from the dictionary
+    (or "unknown") follow. Rows with fewer predictions are padded with code
+    -1 and confidence 0.0. Country predictors also fill ``country_codes``,
+    the alpha-2 code (or None) of every label.
+    """
+
+    names: List[str]
+    labels: List[str]
+    indices: np.ndarray
+    confidences: np.ndarray
+    n_classes: int = 0
+    country_codes: Optional[List[Optional[str]]] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def country_code_indices(self) -> Tuple[np.ndarray, List[str]]:
+        """
+        Get the country of every prediction as codes into a country table.
+
+        Returns:
+            Tuple of (array shaped like ``indices`` with -1 where there is no
+            prediction or no country, list of distinct country codes)
+
+        Raises:
+            ValueError: If the predictions carry no country codes
+        """
+        import numpy as np
+
+        if self.country_codes is None:
+            raise ValueError("These predictions have no country codes")
+
+        countries: List[str] = []
+        positions: Dict[str, int] = {}
+        label_countries = np.full(len(self.labels) + 1, -1, dtype=np.intp)
+        for code, country_code in enumerate(self.country_codes):
+            if not country_code:
+                continue
+            if country_code not in positions:
+                positions[country_code] = len(countries)
+                countries.append(country_code)
+            label_countries[code] = positions[country_code]
+
+        # Padding code -1 picks the trailing -1 entry
+        return label_countries[self.indices], countries
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        Convert to a pandas DataFrame with one row per name.
+
+        Columns are ``name`` and, for every rank r starting at 1,
+        ``nationality_r`` (categorical), ``confidence_r`` and, when available,
+        ``country_code_r`` (categorical). Label columns share the label table
+        instead of storing one string per row.
+
+        Returns:
+            DataFrame with one row per input name
+        """
+        import pandas as pd
+
+        columns = {"name": self.names}
+        country_indices, countries = (
+            self.country_code_indices()
+            if self.country_codes is not None
+            else (None, None)
+        )
+
+        for rank in range(self.indices.shape[1]):
+            columns[f"nationality_{rank + 1}"] = pd.Categorical.from_codes(
+                self.indices[:, rank], categories=pd.Index(self.labels, dtype=object)
+            )
+            columns[f"confidence_{rank + 1}"] = self.confidences[:, rank]
+            if country_indices is not None:
+                columns[f"country_code_{rank + 1}"] = pd.Categorical.from_codes(
+                    country_indices[:, rank],
+                    categories=pd.Index(countries, dtype=object),
+                )
+
+        return pd.DataFrame(columns)
+
+    def to_arrow(self) -> pa.Table:
+        """
+        Convert to an Arrow table with the same columns as ``to_pandas``.
+
+        Label columns are dictionary-encoded and missing predictions are
+        null. Requires the optional ``pyarrow`` package.
+
+        Returns:
+            pyarrow.Table with one row per input name
+        """
+        import numpy as np
+        import pyarrow as pa
+
+        def dictionary_column(codes: np.ndarray, table: List[str]) -> pa.Array:
+            return pa.DictionaryArray.from_arrays(
+                pa.array(codes.astype(np.int32), mask=codes < 0),
+                pa.array(table, type=pa.string()),
+            )
+
+        columns = {"name": pa.array(self.names, type=pa.string())}
+        country_indices, countries = (
+            self.country_code_indices()
+            if self.country_codes is not None
+            else (None, None)
+        )
+
+        for rank in range(self.indices.shape[1]):
+            columns[f"nationality_{rank + 1}"] = dictionary_column(
+                self.indices[:, rank], self.labels
+            )
+            columns[f"confidence_{rank + 1}"] = pa.array(
+                np.ascontiguousarray(self.confidences[:, rank])
+            )
+            if country_indices is not None:
+                columns[f"country_code_{rank + 1}"] = dictionary_column(
+                    country_indices[:, rank], countries
+                )
+
+        return pa.table(columns)
+
+    def decode(self) -> List[Tuple[str, List[Tuple[str, float]]]]:
+        """
+        Convert to the (name, [(nationality, confidence), ...]) list format.
+
+        Returns:
+            List of (name, predictions) tuples, in input order
+        """
+        labels = self.labels
+        return [
+            (
+                name,
+                [
+                    (labels[code], confidence)
+                    for code, confidence in zip(codes, confidences)
+                    if code >= 0
+                ],
+            )
+            for name, codes, confidences in zip(
+                self.names, self.indices.tolist(), self.confidences.tolist()
+            )
+        ]
+
+
 class NamePreprocessor:
     """Name preprocessing using Python 3.13 features."""
 
@@ -52,13 +238,35 @@ class NamePreprocessor:
         """
         # Clean and normalize
         name = name.strip().lower()
-        name = re.sub(r"[^\w\s-]", "", name)  # Remove special chars except hyphens
+        name = _DROPPED_CHARACTERS.sub("", name)  # Keep word chars, hyphens, spaces
 
         # Replace spaces with special marker
         name = name.replace(" ", self.char_patterns["space_marker"])
 
-        # Character-level tokenization
-        return " ".join(char for char in name if char.strip())
+        # Character-level tokenization (no whitespace is left at this point)
+        return " ".join(name)
+
+    def preprocess_many(self, names: Iterable[str]) -> List[str]:
+        """
+        Preprocess a batch of names.
+
+        Gives exactly the same output as calling ``preprocess_name`` on each
+        name, with the pattern, marker and join bound once per batch.
+
+        Args:
+            names: Iterable of input name strings
+
+        Returns:
+            List of preprocessed name strings, in input order
+        """
+        drop = _DROPPED_CHARACTERS.sub
+        space_marker = self.char_patterns["space_marker"]
+        join = " ".join
+
+        return [
+            join(drop("", name.strip().lower()).replace(" ", space_marker))
+            for name in names
+        ]
 
     def restore_name(self, processed_name: str) -> str:
         """
@@ -83,7 +291,11 @@ class FirstnameToNationality:
     """
 
     def __init__(
-        self, model_path: str = MODEL_PATH, dictionary_path: str = DICTIONARY_PATH
+        self,
+        model_path: str = MODEL_PATH,
+        dictionary_path: str = DICTIONARY_PATH,
+        lazy: bool = False,
+        cache_size: int = 0,
     ):
         """
         Initialize the FirstnameToNationality predictor.
@@ -91,62 +303,237 @@ class FirstnameToNationality:
         Args:
             model_path: Path to the model checkpoint file
             dictionary_path: Path to the nationality dictionary file
+            lazy: Load the model and dictionary on first use instead of now
+            cache_size: Maximum number of predictions kept in the LRU cache
+                (0 disables caching)
         """
         self.model_file_path = Path(model_path)
         self.dictionary_file_path = Path(dictionary_path)
         self.preprocessor = NamePreprocessor()
+        self.cache = PredictionCache(cache_size)
+
+        # Guards lazy loading and replacing the model or dictionary
+        self._lock = threading.RLock()
 
-        # Model components
-        self.model: Optional[Pipeline] = None
-        self.label_encoder: Optional[LabelEncoder] = None
-        self.nationality_dictionary: Dict[str, List[str]] = {}
+        # Model components, populated by _load_model/_load_dictionary. The
+        # model and its label encoder are replaced together as one tuple, so
+        # a prediction never pairs a new model with an old encoder
+        self._model_state: Tuple[Optional[Pipeline], Optional[LabelEncoder]] = (
+            None,
+            None,
+        )
+        self._nationality_dictionary: Dict[str, List[str]] = {}
+        self._model_loaded = False
+        self._dictionary_loaded = False
+        # (classes the array was built from, object array of class names)
+        self._class_names_cache: Tuple[Any, Optional[np.ndarray]] = (None, None)
+        # Process pool of n_jobs batches, started on first use
+        self._process_pool: Optional[WorkerPool] = None
 
         # Load model and dictionary if they exist
-        self._load_model()
-        self._load_dictionary()
+        if not lazy:
+            self.warmup()
+
+    def __getstate__(self):
+        # Locks and worker processes cannot be pickled; a copy gets its own
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_process_pool"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "FirstnameToNationality":
+        """Use the predictor as a context manager that closes its workers."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Stop the worker processes on exit."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker processes started by ``n_jobs`` predictions.
+
+        The predictor stays usable; a later ``n_jobs`` batch starts a new
+        pool.
+        """
+        with self._lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.close()
+
+    def _worker_pool(self) -> WorkerPool:
+        """The predictor's long-lived process pool, created on first use."""
+        from .parallel import WorkerPool
+
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = WorkerPool(self)
+            return self._process_pool
+
+    @property
+    def model(self) -> Optional[Pipeline]:
+        """Model pipeline (or compiled engine), loaded on first access."""
+        return self._model_snapshot()[0]
+
+    @model.setter
+    def model(self, model: Optional[Pipeline]) -> None:
+        with self._lock:
+            self._set_model_state(model, self._model_state[1])
+
+    @property
+    def label_encoder(self) -> Optional[LabelEncoder]:
+        """Label encoder of the model, loaded together with the model."""
+        return self._model_snapshot()[1]
+
+    @label_encoder.setter
+    def label_encoder(self, label_encoder: Optional[LabelEncoder]) -> None:
+        with self._lock:
+            self._model_state = (self._model_state[0], label_encoder)
+            self.cache.clear()
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether a trained model is loaded (False for the default model)."""
+        return self._get_class_names() is not None
+
+    def _model_snapshot(self) -> Tuple[Optional[Pipeline], Optional[LabelEncoder]]:
+        """
+        Get the model and its label encoder as one consistent pair.
+
+        Predictions take a single snapshot and use it throughout, so a model
+        replaced by another thread mid-batch does not affect them.
+
+        Returns:
+            Tuple of (model, label encoder), loading them on first use
+        """
+        if not self._model_loaded:
+            with self._lock:
+                if not self._model_loaded:
+                    self._load_model()
+        return self._model_state
+
+    def _set_model_state(
+        self, model: Optional[Pipeline], label_encoder: Optional[LabelEncoder]
+    ) -> None:
+        """Replace the model and label encoder in one step."""
+        with self._lock:
+            self._model_state = (model, label_encoder)
+            self._model_loaded = True
+            self.cache.clear()
+
+    @property
+    def nationality_dictionary(self) -> Dict[str, List[str]]:
+        """Name-to-nationality dictionary, loaded on first access."""
+        if not self._dictionary_loaded:
+            with self._lock:
+                if not self._dictionary_loaded:
+                    self._load_dictionary()
+        return self._nationality_dictionary
+
+    @nationality_dictionary.setter
+    def nationality_dictionary(self, name_dict: Dict[str, List[str]]) -> None:
+        with self._lock:
+            self._nationality_dictionary = name_dict
+            self._dictionary_loaded = True
+            self.cache.clear()
+
+    def warmup(self) -> None:
+        """
+        Load every component that has not been loaded yet.
+
+        Long-running servers call this once at startup so the first request
+        does not pay for loading the model and dictionary.
+        """
+        self._model_snapshot()
+        if not self._dictionary_loaded:
+            with self._lock:
+                if not self._dictionary_loaded:
+                    self._load_dictionary()
+
+    def cache_stats(self) -> CacheStats:
+        """
+        Get the prediction cache counters.
+
+        Returns:
+            CacheStats with hits, misses, evictions and current size
+        """
+        return self.cache.stats()
+
+    def clear_cache(self) -> None:
+        """Drop every cached prediction."""
+        self.cache.clear()
 
     def _load_model(self) -> None:
         """Load the trained model from checkpoint."""
+        from .compiled_model import CompiledModel
+
+        model = label_encoder = None
+
         if self.model_file_path.exists():
             try:
+                # Compiled models are memory-mapped instead of unpickled
+                if CompiledModel.is_compiled_model_file(self.model_file_path):
+                    self._set_model_state(
+                        CompiledModel.load(self.model_file_path), None
+                    )
+                    return
+
+                import joblib
+
                 # Try to load as joblib first (new format)
                 model_data = joblib.load(self.model_file_path)
                 if isinstance(model_data, dict):
-                    self.model = model_data.get("model")
-                    self.label_encoder = model_data.get("label_encoder")
+                    model = model_data.get("model")
+                    label_encoder = model_data.get("label_encoder")
 
                     # Validate that model is actually a pipeline
-                    if not hasattr(self.model, "fit") or not hasattr(
-                        self.model, "predict_proba"
-                    ):
+                    if not hasattr(model, "fit") or not hasattr(model, "predict_proba"):
                         print(
                             f"Warning: Loaded model is invalid. Creating default model."
                         )
-                        self._create_default_model()
+                        model = None
                 else:
                     # Fallback for direct model loading
                     if hasattr(model_data, "fit") and hasattr(
                         model_data, "predict_proba"
                     ):
-                        self.model = model_data
-                        self.label_encoder = LabelEncoder()
+                        from sklearn.preprocessing import LabelEncoder
+
+                        model = model_data
+                        label_encoder = LabelEncoder()
                     else:
                         print(
                             f"Warning: Model file contains invalid data. Creating default model."
                         )
-                        self._create_default_model()
             except Exception as e:
                 print(f"Warning: Could not load model from {self.model_file_path}: {e}")
-                self._create_default_model()
+                model = None
         else:
             print(
                 f"Model file not found at {self.model_file_path}. Creating default model."
             )
-            self._create_default_model()
 
-    def _create_default_model(self) -> None:
-        """Create a default model pipeline."""
-        self.model = Pipeline(
+        if model is None:
+            model, label_encoder = self._create_default_model()
+        self._set_model_state(model, label_encoder)
+
+    def _create_default_model(self) -> Tuple[Pipeline, LabelEncoder]:
+        """
+        Create an untrained default model pipeline.
+
+        Returns:
+            Tuple of (pipeline, label encoder)
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import LabelEncoder
+
+        pipeline = Pipeline(
             [
                 (
                     "vectorizer",
@@ -167,14 +554,50 @@ class FirstnameToNationality:
                 ),
             ]
         )
-        self.label_encoder = LabelEncoder()
+        return pipeline, LabelEncoder()
+
+    def _create_streaming_model(self, n_features: int) -> Pipeline:
+        """
+        Create an untrained pipeline for out-of-core training.
+
+        Args:
+            n_features: Number of hashed feature columns
+
+        Returns:
+            Pipeline of a char n-gram HashingVectorizer and an SGDClassifier
+            with logistic loss
+        """
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.pipeline import Pipeline
+
+        return Pipeline(
+            [
+                (
+                    "vectorizer",
+                    HashingVectorizer(
+                        analyzer="char",
+                        ngram_range=(1, 3),
+                        n_features=n_features,
+                        alternate_sign=False,
+                        lowercase=True,
+                    ),
+                ),
+                (
+                    "classifier",
+                    SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42),
+                ),
+            ]
+        )
 
     def _load_dictionary(self) -> None:
         """Load the name-to-nationality dictionary."""
         if self.dictionary_file_path.exists():
             try:
-                with open(self.dictionary_file_path, "rb") as f:
-                    self.nationality_dictionary = pickle.load(f)
+                # Compact files are memory-mapped; legacy pickles still load
+                self.nationality_dictionary = load_name_dictionary(
+                    self.dictionary_file_path
+                )
             except Exception as e:
                 print(
                     f"Warning: Could not load dictionary from {self.dictionary_file_path}: {e}"
@@ -184,8 +607,106 @@ class FirstnameToNationality:
             print(f"Dictionary file not found at {self.dictionary_file_path}.")
             self.nationality_dictionary = {}
 
+    def _get_class_names(
+        self, state: Optional[Tuple[Any, Any]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Get the class-name array aligned with the model probability columns.
+
+        The array is rebuilt only when the label encoder's classes change, so
+        mapping predicted indices to labels is a single fancy-indexing step.
+
+        Args:
+            state: (model, label encoder) snapshot to read the classes of
+                (defaults to the current model)
+
+        Returns:
+            Object array of nationality labels, or None if no classes are known
+        """
+        import numpy as np
+
+        model, label_encoder = state if state is not None else self._model_snapshot()
+
+        # Compiled engines carry their own column-aligned class names
+        classes = getattr(model, "class_names", None)
+        if classes is None:
+            classes = getattr(label_encoder, "classes_", None)
+        if classes is None:
+            return None
+
+        source, class_names = self._class_names_cache
+        if source is not classes:
+            class_names = np.asarray(classes, dtype=object)
+            self._class_names_cache = (classes, class_names)
+
+        return class_names
+
+    @staticmethod
+    def _top_n_indices(probabilities: np.ndarray, top_n: int) -> np.ndarray:
+        """
+        Get the column indices of the top N probabilities of every row.
+
+        Args:
+            probabilities: Probability matrix of shape (n_names, n_classes)
+            top_n: Number of top predictions to return
+
+        Returns:
+            Index matrix of shape (n_names, min(top_n, n_classes)), best first
+        """
+        import numpy as np
+
+        n_classes = probabilities.shape[1]
+        k = max(0, min(top_n, n_classes))
+
+        # Partition out the k best columns, then sort only those
+        if k == 0:
+            return np.empty((probabilities.shape[0], 0), dtype=np.intp)
+        if k < n_classes:
+            candidates = np.argpartition(probabilities, n_classes - k, axis=1)
+            candidates = candidates[:, n_classes - k :]
+        else:
+            candidates = np.broadcast_to(np.arange(n_classes), probabilities.shape)
+
+        candidate_probabilities = np.take_along_axis(probabilities, candidates, axis=1)
+        order = np.argsort(-candidate_probabilities, axis=1, kind="stable")
+
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def _get_top_predictions_batch(
+        self,
+        probabilities: np.ndarray,
+        top_n: int,
+        state: Optional[Tuple[Any, Any]] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Get top N predictions for every row of a probability matrix.
+
+        Args:
+            probabilities: Model prediction probabilities, one row per name
+            top_n: Number of top predictions to return
+            state: (model, label encoder) snapshot that produced the
+                probabilities (defaults to the current model)
+
+        Returns:
+            List of (nationality, confidence) tuple lists, one per row
+        """
+        import numpy as np
+
+        class_names = self._get_class_names(state)
+        if class_names is None:
+            return [[("unknown", 0.0)] for _ in range(len(probabilities))]
+
+        top_indices = self._top_n_indices(probabilities, top_n)
+        nationalities = class_names[top_indices].tolist()
+        confidences = np.take_along_axis(probabilities, top_indices, axis=1).tolist()
+
+        return [list(zip(*row)) for row in zip(nationalities, confidences)]
+
     def _get_top_predictions(
-        self, probabilities: np.ndarray, top_n: int
+        self,
+        probabilities: np.ndarray,
+        top_n: int,
+        state: Optional[Tuple[Any, Any]] = None,
     ) -> List[PredictionResult]:
         """
         Get top N predictions from model probabilities.
@@ -193,23 +714,19 @@ class FirstnameToNationality:
         Args:
             probabilities: Model prediction probabilities
             top_n: Number of top predictions to return
+            state: (model, label encoder) snapshot that produced the
+                probabilities (defaults to the current model)
 
         Returns:
             List of prediction results
         """
-        if self.label_encoder is None:
-            return [PredictionResult("unknown", 0.0)]
-
-        # Get top indices and their probabilities
-        top_indices = np.argsort(probabilities)[-top_n:][::-1]
+        import numpy as np
 
-        results = []
-        for idx in top_indices:
-            nationality = self.label_encoder.inverse_transform([idx])[0]
-            confidence = float(probabilities[idx])
-            results.append(PredictionResult(nationality, confidence))
+        predictions = self._get_top_predictions_batch(
+            np.asarray(probabilities)[np.newaxis, :], top_n, state
+        )[0]
 
-        return results
+        return [PredictionResult(nat, conf) for nat, conf in predictions]
 
     def predict_single(
         self, name: str, top_n: int = 1, use_dict: bool = True
@@ -224,24 +741,43 @@ class FirstnameToNationality:
 
         Returns:
             List of (nationality, confidence) tuples
+
+        Raises:
+            ValueError: If top_n is not a positive integer
         """
+        if top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+
+        cache_key = (name.lower().strip(), top_n, use_dict)
+        generation = self.cache.generation
+        if self.cache.enabled:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         # Check dictionary first if requested
-        if use_dict and name.lower().strip() in self.nationality_dictionary:
-            nationalities = self.nationality_dictionary[name.lower().strip()]
-            return [(nat, 1.0) for nat in nationalities[:top_n]]
+        name_dict = self.nationality_dictionary
+        if use_dict and name.lower().strip() in name_dict:
+            nationalities = name_dict[name.lower().strip()]
+            results = [(nat, 1.0) for nat in nationalities[:top_n]]
+            self.cache.put(cache_key, results, generation)
+            return results
 
         # Use model prediction
-        if self.model is None:
+        state = self._model_snapshot()
+        if state[0] is None:
             return [("unknown", 0.0)]
 
         processed_name = self.preprocessor.preprocess_name(name)
 
         try:
             # Get prediction probabilities
-            probabilities = self.model.predict_proba([processed_name])[0]
-            predictions = self._get_top_predictions(probabilities, top_n)
+            probabilities = state[0].predict_proba([processed_name])[0]
+            predictions = self._get_top_predictions(probabilities, top_n, state)
 
-            return [(pred.nationality, pred.confidence) for pred in predictions]
+            results = [(pred.nationality, pred.confidence) for pred in predictions]
+            self.cache.put(cache_key, results, generation)
+            return results
 
         except Exception as e:
             print(f"Error predicting for name '{name}': {e}")
@@ -253,83 +789,990 @@ class FirstnameToNationality:
         top_n: int = 1,
         use_dict: bool = True,
         mini_batch_size: int = 128,
-    ) -> List[Tuple[str, List[Tuple[str, float]]]]:
+        columnar: bool = False,
+        n_jobs: Optional[int] = None,
+        n_threads: Optional[int] = None,
+    ) -> Union[List[Tuple[str, List[Tuple[str, float]]]], EncodedPredictions]:
         """
         Predict nationalities for one or more names.
 
+        Names are normalized and each distinct name is looked up or scored
+        once, so the cost grows with the number of distinct names rather than
+        the number of rows. Cached names and dictionary hits are answered
+        directly (a batch answered entirely this way never touches NumPy);
+        the remaining names are preprocessed and scored with one
+        ``predict_proba`` call per mini-batch.
+
         Args:
             names: Single name string or list of names
             top_n: Number of top predictions per name
             use_dict: Whether to use dictionary lookup
-            mini_batch_size: Batch size for processing (compatibility parameter)
+            mini_batch_size: Number of distinct names scored per model call
+            columnar: Return an EncodedPredictions (label-code and confidence
+                arrays, convertible with ``to_pandas``/``to_arrow``) instead
+                of per-name lists
+            n_jobs: Number of worker processes sharing the loaded model
+                (None for in-process scoring, -1 for one per CPU)
+            n_threads: Number of threads scoring mini-batches concurrently
+                (None for one, -1 for one per CPU)
 
         Returns:
             List of (name, predictions) tuples where predictions is
+            a list of (nationality, confidence) tuples, in input order
+            (or EncodedPredictions when columnar is True)
+
+        Raises:
+            ValueError: If top_n or mini_batch_size is not a positive integer
+        """
+        if columnar or (n_jobs is not None and n_jobs != 1):
+            encoded = self.predict_encoded(
+                names,
+                top_n,
+                use_dict,
+                mini_batch_size,
+                n_jobs=n_jobs,
+                n_threads=n_threads,
+            )
+            return encoded if columnar else encoded.decode()
+
+        if top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+        if mini_batch_size < 1:
+            raise ValueError("mini_batch_size must be a positive integer")
+        if isinstance(names, str):
+            names = [names]
+
+        lookup = self._lookup_known(names, top_n, use_dict)
+        _, inverse, listed, misses, _ = lookup
+        if not misses:
+            # Every name was cached or in the dictionary: no arrays to build
+            return [(name, list(listed[row])) for name, row in zip(names, inverse)]
+
+        return self._encode_predictions(
+            names, top_n, use_dict, mini_batch_size, n_threads, lookup
+        ).decode()
+
+    def predict_iter(
+        self,
+        names: Iterable[str],
+        top_n: int = 1,
+        use_dict: bool = True,
+        batch_size: int = 10_000,
+        mini_batch_size: int = 128,
+        n_jobs: Optional[int] = None,
+        n_threads: Optional[int] = None,
+    ) -> Iterator[Tuple[str, List[Tuple[str, float]]]]:
+        """
+        Lazily predict nationalities for a stream of names.
+
+        Names are pulled from the iterable ``batch_size`` at a time and
+        predicted like a call to the predictor, so memory stays bounded by
+        the batch size however long the stream is.
+
+        Args:
+            names: Iterable of names (e.g. a generator over a file)
+            top_n: Number of top predictions per name
+            use_dict: Whether to use dictionary lookup
+            batch_size: Number of names pulled and predicted at once
+            mini_batch_size: Number of distinct names scored per model call
+            n_jobs: Number of worker processes per batch (see ``__call__``)
+            n_threads: Number of scoring threads per batch (see ``__call__``)
+
+        Yields:
+            (name, predictions) tuples in input order, where predictions is
             a list of (nationality, confidence) tuples
+
+        Raises:
+            ValueError: If batch_size or top_n is not a positive integer
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+
+        names = iter(names)
+        while True:
+            batch = list(islice(names, batch_size))
+            if not batch:
+                return
+            yield from self(
+                batch,
+                top_n=top_n,
+                use_dict=use_dict,
+                mini_batch_size=mini_batch_size,
+                n_jobs=n_jobs,
+                n_threads=n_threads,
+            )
+
+    def predict_encoded(
+        self,
+        names: Union[str, List[str]],
+        top_n: int = 1,
+        use_dict: bool = True,
+        mini_batch_size: int = 128,
+        n_jobs: Optional[int] = None,
+        n_threads: Optional[int] = None,
+    ) -> EncodedPredictions:
+        """
+        Predict nationalities for a batch and return them as label codes.
+
+        Works like ``__call__`` but keeps the results as integer arrays, so
+        callers that count or aggregate predictions never build per-name
+        lists.
+
+        Args:
+            names: Single name string or list of names
+            top_n: Number of top predictions per name
+            use_dict: Whether to use dictionary lookup
+            mini_batch_size: Number of distinct names scored per model call
+            n_jobs: Number of worker processes sharing the loaded model
+                (None for in-process scoring, -1 for one per CPU)
+            n_threads: Number of threads scoring mini-batches concurrently
+                in each process (None for one, -1 for one per CPU)
+
+        Returns:
+            EncodedPredictions with one row per input name
+
+        Raises:
+            ValueError: If top_n or mini_batch_size is not a positive integer
         """
+        if top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+        if mini_batch_size < 1:
+            raise ValueError("mini_batch_size must be a positive integer")
+
+        if n_jobs is not None and n_jobs != 1:
+            from .parallel import predict_encoded_parallel
+
+            return predict_encoded_parallel(
+                self, names, top_n, use_dict, mini_batch_size, n_jobs, n_threads
+            )
+
         # Ensure names is a list
         if isinstance(names, str):
             names = [names]
 
-        results = []
+        lookup = self._lookup_known(names, top_n, use_dict)
+        return self._encode_predictions(
+            names, top_n, use_dict, mini_batch_size, n_threads, lookup
+        )
 
-        # Process names (batch processing could be added here for large datasets)
-        for name in names:
-            predictions = self.predict_single(name, top_n, use_dict)
-            results.append((name, predictions))
+    def _lookup_known(
+        self, names: List[str], top_n: int, use_dict: bool
+    ) -> Tuple[
+        Dict[str, int], List[int], Dict[int, List[Tuple[str, float]]], List[int], int
+    ]:
+        """
+        Answer the cached and dictionary names of a batch.
 
-        return results
+        Args:
+            names: Input names
+            top_n: Number of top predictions per name
+            use_dict: Whether to use dictionary lookup
+
+        Returns:
+            Tuple of (row of each distinct normalized name, row of each input
+            name, predictions of the answered rows, rows left for the model,
+            cache generation the lookups started at)
+        """
+        # Map every input position to its distinct normalized name
+        unique: Dict[str, int] = {}
+        inverse = [
+            unique.setdefault(name.lower().strip(), len(unique)) for name in names
+        ]
+
+        listed: Dict[int, List[Tuple[str, float]]] = {}
+        misses: List[int] = []
+        generation = self.cache.generation
+        name_dict = self.nationality_dictionary if use_dict else None
+
+        # Answer cache and dictionary hits first and collect the names left
+        # for the model
+        for row, normalized in enumerate(unique):
+            if self.cache.enabled:
+                cached = self.cache.get((normalized, top_n, use_dict))
+                if cached is not None:
+                    listed[row] = cached
+                    continue
+            if use_dict:
+                nationalities = name_dict.get(normalized)
+                if nationalities is not None:
+                    listed[row] = [(nat, 1.0) for nat in nationalities[:top_n]]
+                    self.cache.put(
+                        (normalized, top_n, use_dict), listed[row], generation
+                    )
+                    continue
+            misses.append(row)
+
+        return unique, inverse, listed, misses, generation
+
+    def _encode_predictions(
+        self,
+        names: List[str],
+        top_n: int,
+        use_dict: bool,
+        mini_batch_size: int,
+        n_threads: Optional[int],
+        lookup: Tuple[Any, ...],
+    ) -> EncodedPredictions:
+        """
+        Score the names left by ``_lookup_known`` and encode the whole batch.
+
+        Args:
+            names: Input names
+            top_n: Number of top predictions per name
+            use_dict: Whether dictionary lookup was used
+            mini_batch_size: Number of distinct names scored per model call
+            n_threads: Number of threads scoring mini-batches concurrently
+            lookup: Result of ``_lookup_known`` for these names
+
+        Returns:
+            EncodedPredictions with one row per input name
+        """
+        import numpy as np
+
+        unique, inverse, listed, misses, generation = lookup
+        model = class_names = None
+        if misses:
+            # One snapshot for the whole batch, even if the model is replaced
+            state = self._model_snapshot()
+            model = state[0]
+            class_names = self._get_class_names(state) if model is not None else None
+            if class_names is None:
+                for row in misses:
+                    listed[row] = [("unknown", 0.0)]
+                misses = []
+
+        n_classes = 0 if class_names is None else len(class_names)
+        model_width = min(max(top_n, 0), n_classes)
+        scored_rows: List[int] = []
+        scored_indices = []
+        scored_confidences = []
+        normalized_names = list(unique)
+
+        def score(batch: List[int]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+            """Top-N indices and confidences of a mini-batch (None on failure)."""
+            processed_names = self.preprocessor.preprocess_many(
+                normalized_names[row] for row in batch
+            )
+            try:
+                probabilities = model.predict_proba(processed_names)
+            except Exception:
+                return None
+            top_indices = self._top_n_indices(probabilities, top_n)
+            return top_indices, np.take_along_axis(probabilities, top_indices, axis=1)
+
+        batches = [
+            misses[start : start + mini_batch_size]
+            for start in range(0, len(misses), mini_batch_size)
+        ]
+        if n_threads is not None and n_threads != 1 and len(batches) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            from .parallel import effective_n_jobs
+
+            # NumPy/SciPy kernels release the GIL, and free-threaded builds
+            # also run the preprocessing of different mini-batches in parallel
+            n_workers = min(effective_n_jobs(n_threads), len(batches))
+            with ThreadPoolExecutor(n_workers) as executor:
+                results = list(executor.map(score, batches))
+        else:
+            results = map(score, batches)
+
+        for batch, result in zip(batches, results):
+            if result is None:
+                # Score the batch name by name so a failure only affects its own row
+                for row in batch:
+                    listed[row] = self.predict_single(
+                        normalized_names[row], top_n, use_dict=False
+                    )
+                continue
+
+            top_indices, confidences = result
+            scored_rows.extend(batch)
+            scored_indices.append(top_indices)
+            scored_confidences.append(confidences)
+
+            if self.cache.enabled:
+                for row, nationalities, confidences in zip(
+                    batch,
+                    class_names[top_indices].tolist(),
+                    scored_confidences[-1].tolist(),
+                ):
+                    self.cache.put(
+                        (normalized_names[row], top_n, use_dict),
+                        list(zip(nationalities, confidences)),
+                        generation,
+                    )
+
+        # Label table: model classes first, then labels only seen in lists
+        labels = [] if class_names is None else class_names.tolist()
+        label_codes = {label: code for code, label in enumerate(labels)}
+        width = max(
+            [model_width if scored_rows else 0]
+            + [len(predictions) for predictions in listed.values()]
+        )
+
+        unique_indices = np.full((len(unique), width), -1, dtype=np.intp)
+        unique_confidences = np.zeros((len(unique), width), dtype=np.float64)
+
+        if scored_rows:
+            unique_indices[scored_rows, :model_width] = np.concatenate(scored_indices)
+            unique_confidences[scored_rows, :model_width] = np.concatenate(
+                scored_confidences
+            )
+
+        for row, predictions in listed.items():
+            for column, (nationality, confidence) in enumerate(predictions):
+                code = label_codes.get(nationality)
+                if code is None:
+                    code = label_codes[nationality] = len(labels)
+                    labels.append(nationality)
+                unique_indices[row, column] = code
+                unique_confidences[row, column] = confidence
+
+        # Scatter the distinct rows back to input order
+        inverse = np.asarray(inverse, dtype=np.intp)
+        return EncodedPredictions(
+            names=list(names),
+            labels=labels,
+            indices=unique_indices[inverse],
+            confidences=unique_confidences[inverse],
+            n_classes=n_classes,
+        )
+
+    def predict_proba(
+        self, names: Union[str, List[str]], mini_batch_size: int = 128
+    ) -> np.ndarray:
+        """
+        Get the model's full probability matrix for a batch of names.
+
+        The dictionary is not consulted. Each distinct normalized name is
+        scored once and its row is repeated for every occurrence.
+
+        Args:
+            names: Single name string or list of names
+            mini_batch_size: Number of distinct names scored per model call
+
+        Returns:
+            Array of shape (n_names, n_classes) whose columns follow the
+            model's class order
+
+        Raises:
+            ValueError: If there is no trained model to score with
+        """
+        import numpy as np
+
+        if mini_batch_size < 1:
+            raise ValueError("mini_batch_size must be a positive integer")
+
+        # Ensure names is a list
+        if isinstance(names, str):
+            names = [names]
+
+        state = self._model_snapshot()
+        model = state[0]
+        class_names = self._get_class_names(state) if model is not None else None
+        if class_names is None:
+            raise ValueError("No trained model available to compute probabilities")
+
+        unique: Dict[str, int] = {}
+        inverse = [
+            unique.setdefault(name.lower().strip(), len(unique)) for name in names
+        ]
+        normalized_names = list(unique)
+
+        batches = [
+            model.predict_proba(
+                self.preprocessor.preprocess_many(
+                    normalized_names[start : start + mini_batch_size]
+                )
+            )
+            for start in range(0, len(normalized_names), mini_batch_size)
+        ]
+        if not batches:
+            return np.zeros((0, len(class_names)))
+
+        return np.concatenate(batches)[np.asarray(inverse, dtype=np.intp)]
 
     def train(
-        self, names: List[str], nationalities: List[str], save_model: bool = True
+        self,
+        names: List[str],
+        nationalities: List[str],
+        save_model: bool = True,
+        deduplicate: bool = True,
+        feature_cache: Optional[FeatureCache] = None,
     ) -> None:
         """
         Train the model on name-nationality pairs.
 
+        Identical (preprocessed name, nationality) pairs are collapsed into
+        one row weighted by its count, so fitting time and memory grow with
+        the number of distinct pairs rather than rows. The classifier loss
+        and TF-IDF document frequencies are weighted, giving the same model
+        as training on every row.
+
+        With a feature cache, the deduplicated corpus and the fitted
+        vectorizer with its feature matrix are stored on disk, keyed by the
+        training data and vectorizer settings. A later run on the same data
+        loads them instead of preprocessing and vectorizing again, so only
+        the classifier is fitted.
+
         Args:
             names: List of names for training
             nationalities: List of corresponding nationalities
             save_model: Whether to save the trained model
+            deduplicate: Whether to collapse identical pairs into weighted rows
+            feature_cache: Cache of preprocessed corpora and feature matrices
+                (used when deduplicating; features are cached for vectorizer +
+                classifier pipelines)
         """
         if len(names) != len(nationalities):
             raise ValueError("Names and nationalities lists must have the same length")
 
-        # Preprocess names
-        processed_names = [self.preprocessor.preprocess_name(name) for name in names]
+        from sklearn.base import clone
+        from sklearn.preprocessing import LabelEncoder
+
+        # Fit a copy and swap it in when done, so predictions running in other
+        # threads keep using the previous model until then. Compiled engines
+        # are inference-only, so they are replaced by a fresh pipeline
+        model = self.model
+        if hasattr(model, "fit"):
+            model, label_encoder = clone(model), LabelEncoder()
+        else:
+            model, label_encoder = self._create_default_model()
+
+        if deduplicate and names:
+            processed_names, nationalities, weights, corpus_key = (
+                self._deduplicated_corpus(names, nationalities, feature_cache)
+            )
+            print(
+                f"Training on {len(processed_names)} distinct pairs from "
+                f"{len(names)} rows "
+                f"({len(names) / len(processed_names):.1f}x compression)"
+            )
+        else:
+            # Preprocess names
+            processed_names = self.preprocessor.preprocess_many(names)
+            weights = None
 
         # Encode labels
-        encoded_labels = self.label_encoder.fit_transform(nationalities)
+        encoded_labels = label_encoder.fit_transform(nationalities)
 
         # Train the model
-        self.model.fit(processed_names, encoded_labels)
+        steps = getattr(model, "steps", None)
+        if weights is None:
+            model.fit(processed_names, encoded_labels)
+        elif feature_cache is not None and steps and len(steps) == 2:
+            model = self._fit_cached(
+                model,
+                processed_names,
+                encoded_labels,
+                weights,
+                feature_cache,
+                corpus_key,
+            )
+        else:
+            self._fit_weighted(model, processed_names, encoded_labels, weights)
+        self._set_model_state(model, label_encoder)
 
         if save_model:
             self.save_model()
 
+    def _deduplicated_corpus(
+        self,
+        names: List[str],
+        nationalities: List[str],
+        feature_cache: Optional[FeatureCache] = None,
+    ) -> Tuple[List[str], List[str], Any, Optional[str]]:
+        """
+        Preprocess names and collapse identical pairs into weighted rows.
+
+        Args:
+            names: Training names
+            nationalities: Corresponding nationalities
+            feature_cache: Cache to load the result from or store it in
+
+        Returns:
+            Tuple of (distinct preprocessed names, nationalities, pair
+            counts, cache key of the corpus or None without a cache)
+        """
+        corpus_key = None
+        if feature_cache is not None:
+            corpus_key = feature_cache.corpus_key(
+                names, nationalities, self._preprocessing_settings()
+            )
+            corpus = feature_cache.load_corpus(corpus_key)
+            if corpus is not None:
+                return (*corpus, corpus_key)
+
+        processed_names = self.preprocessor.preprocess_many(names)
+        pair_counts = Counter(zip(processed_names, nationalities))
+        documents = [name for name, _ in pair_counts]
+        labels = [nationality for _, nationality in pair_counts]
+        weights = list(pair_counts.values())
+
+        if feature_cache is not None:
+            feature_cache.save_corpus(corpus_key, documents, labels, weights)
+        return documents, labels, weights, corpus_key
+
+    def _preprocessing_settings(self) -> Dict[str, Any]:
+        """Settings that determine the output of name preprocessing."""
+        return {
+            "preprocessor": type(self.preprocessor).__qualname__,
+            "char_patterns": self.preprocessor.char_patterns,
+            "dropped_characters": _DROPPED_CHARACTERS.pattern,
+        }
+
+    @classmethod
+    def _fit_cached(
+        cls,
+        model: Pipeline,
+        documents: List[str],
+        labels: np.ndarray,
+        weights: Any,
+        feature_cache: FeatureCache,
+        corpus_key: str,
+    ) -> Pipeline:
+        """
+        Fit a two-step pipeline, reusing a cached vectorizer and features.
+
+        Args:
+            model: Unfitted vectorizer + classifier pipeline
+            documents: Distinct preprocessed names
+            labels: Encoded label of each row
+            weights: Number of occurrences of each row
+            feature_cache: Cache holding the fitted vectorizers and features
+            corpus_key: Cache key of the corpus
+
+        Returns:
+            Fitted pipeline
+        """
+        import numpy as np
+        from sklearn.pipeline import Pipeline
+
+        (vectorizer_name, vectorizer), (classifier_name, classifier) = model.steps
+        features_key = feature_cache.features_key(corpus_key, vectorizer)
+        cached = feature_cache.load_features(features_key)
+
+        if cached is not None:
+            print("Loaded cached features")
+            vectorizer, features = cached
+        else:
+            features = cls._fit_vectorizer_weighted(vectorizer, documents, weights)
+            feature_cache.save_features(features_key, vectorizer, features)
+
+        classifier.fit(
+            features, labels, sample_weight=np.asarray(weights, dtype=np.float64)
+        )
+        return Pipeline(
+            [(vectorizer_name, vectorizer), (classifier_name, classifier)],
+            memory=model.memory,
+            verbose=model.verbose,
+        )
+
+    @classmethod
+    def _fit_vectorizer_weighted(
+        cls, vectorizer: Any, documents: List[str], weights: Any
+    ) -> Any:
+        """
+        Fit a vectorizer on distinct rows with per-row counts.
+
+        For a count or TF-IDF vectorizer, the vocabulary kept by
+        max_features, min_df and max_df is chosen from count-weighted term
+        and document frequencies, and the IDF weights are computed from
+        count-weighted document frequencies, as if every row had been passed
+        on its own.
+
+        Args:
+            vectorizer: Unfitted vectorizer
+            documents: Distinct preprocessed names
+            weights: Number of occurrences of each row
+
+        Returns:
+            Sparse feature matrix of the documents
+        """
+        import numpy as np
+
+        weights = np.asarray(weights, dtype=np.float64)
+        vocabulary = cls._weighted_vocabulary(vectorizer, documents, weights)
+        if vocabulary is None:
+            features = vectorizer.fit_transform(documents)
+        else:
+            # Fit on the chosen terms, then restore the vectorizer's settings
+            # so the fitted model looks like one fitted on every row
+            vectorizer.set_params(vocabulary=vocabulary)
+            try:
+                features = vectorizer.fit_transform(documents)
+            finally:
+                vectorizer.set_params(vocabulary=None)
+            vectorizer.fixed_vocabulary_ = False
+
+        if getattr(vectorizer, "use_idf", False):
+            counts_per_entry = np.repeat(weights, np.diff(features.indptr))
+            document_frequency = np.bincount(
+                features.indices,
+                weights=counts_per_entry,
+                minlength=features.shape[1],
+            )
+            n_documents = weights.sum()
+            if vectorizer.smooth_idf:
+                document_frequency += 1
+                n_documents += 1
+            vectorizer.idf_ = np.log(n_documents / document_frequency) + 1
+            features = vectorizer.transform(documents)
+
+        return features
+
+    @staticmethod
+    def _weighted_vocabulary(
+        vectorizer: Any, documents: List[str], weights: np.ndarray
+    ) -> Optional[Dict[str, int]]:
+        """
+        Vocabulary a count vectorizer would keep if every row were repeated.
+
+        Mirrors the max_df/min_df/max_features pruning of scikit-learn's
+        CountVectorizer, with term and document frequencies weighted by the
+        row counts.
+
+        Args:
+            vectorizer: Unfitted vectorizer
+            documents: Distinct preprocessed names
+            weights: Number of occurrences of each row
+
+        Returns:
+            Term-to-column mapping, or None if the vectorizer does not prune
+            its vocabulary (or is not a count vectorizer)
+
+        Raises:
+            ValueError: If the document frequency limits are inconsistent or
+                leave no terms
+        """
+        from numbers import Integral
+
+        import numpy as np
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        if not isinstance(vectorizer, CountVectorizer) or vectorizer.vocabulary:
+            return None
+        max_df, min_df = vectorizer.max_df, vectorizer.min_df
+        max_features = vectorizer.max_features
+        if max_features is None and max_df == 1.0 and min_df == 1:
+            return None
+
+        count_params = CountVectorizer().get_params()
+        counter = CountVectorizer(
+            **{
+                name: value
+                for name, value in vectorizer.get_params().items()
+                if name in count_params
+            }
+        )
+        counter.set_params(max_df=1.0, min_df=1, max_features=None)
+        counts = counter.fit_transform(documents)
+
+        n_documents = weights.sum()
+        max_count = max_df if isinstance(max_df, Integral) else max_df * n_documents
+        min_count = min_df if isinstance(min_df, Integral) else min_df * n_documents
+        if max_count < min_count:
+            raise ValueError("max_df corresponds to < documents than min_df")
+
+        counts_per_entry = np.repeat(weights, np.diff(counts.indptr))
+        document_frequency = np.bincount(
+            counts.indices, weights=counts_per_entry, minlength=counts.shape[1]
+        )
+        mask = (document_frequency <= max_count) & (document_frequency >= min_count)
+
+        if max_features is not None and mask.sum() > max_features:
+            # Same dtype and ranking call as CountVectorizer, so ties between
+            # equally frequent terms are broken the same way
+            term_frequency = np.bincount(
+                counts.indices,
+                weights=counts_per_entry * counts.data,
+                minlength=counts.shape[1],
+            )
+            term_frequency = np.rint(term_frequency).astype(counts.dtype)
+            ranked = (-term_frequency[mask]).argsort()[:max_features]
+            limited = np.zeros(len(mask), dtype=bool)
+            limited[np.where(mask)[0][ranked]] = True
+            mask = limited
+
+        terms = counter.get_feature_names_out()[mask]
+        if len(terms) == 0:
+            raise ValueError(
+                "After pruning, no terms remain. Try a lower min_df or a higher max_df."
+            )
+        return {term: index for index, term in enumerate(terms)}
+
+    @classmethod
+    def _fit_weighted(
+        cls, model: Any, documents: List[str], labels: np.ndarray, weights: List[int]
+    ) -> None:
+        """
+        Fit a model on distinct rows with per-row counts as sample weights.
+
+        For a vectorizer + classifier pipeline with a TF-IDF vectorizer, the
+        IDF weights are recomputed from count-weighted document frequencies,
+        as if every row had been passed on its own.
+
+        Args:
+            model: Unfitted model or pipeline
+            documents: Distinct preprocessed names
+            labels: Encoded label of each row
+            weights: Number of occurrences of each row
+        """
+        import numpy as np
+
+        weights = np.asarray(weights, dtype=np.float64)
+        steps = getattr(model, "steps", None)
+        if not steps or len(steps) != 2:
+            model.fit(documents, labels, sample_weight=weights)
+            return
+
+        vectorizer, classifier = steps[0][1], steps[-1][1]
+        features = cls._fit_vectorizer_weighted(vectorizer, documents, weights)
+        classifier.fit(features, labels, sample_weight=weights)
+
+    def update(
+        self,
+        names: List[str],
+        nationalities: List[str],
+        save_model: bool = True,
+        prior_strength: float = 10.0,
+    ) -> None:
+        """
+        Update the trained model from new samples without retraining.
+
+        The classifier is adjusted from the new samples only, starting from
+        its current coefficients; nationalities the model has never seen are
+        added as new classes. The vectorizer is kept as is, so n-grams that
+        were not in its vocabulary do not contribute. Predictions running in
+        other threads keep using the previous model until the update is
+        swapped in.
+
+        Args:
+            names: List of new names
+            nationalities: List of corresponding nationalities
+            save_model: Whether to save the updated model (written to a
+                temporary file and renamed into place)
+            prior_strength: How strongly LogisticRegression coefficients are
+                held at their current values; raise it to protect the
+                existing classes when a batch covers only a few
+                nationalities, lower it to adapt faster
+
+        Raises:
+            ValueError: If the lists are empty or differ in length, the
+                model is not a trained linear pipeline or prior_strength is
+                not positive
+        """
+        if len(names) != len(nationalities):
+            raise ValueError("Names and nationalities lists must have the same length")
+        if not names:
+            raise ValueError("No training examples to update the model with")
+
+        from .incremental import update_pipeline
+
+        # Updates are serialized, so concurrent updates never drop each other
+        with self._lock:
+            model, label_encoder = self._model_snapshot()
+            model, label_encoder = update_pipeline(
+                model,
+                label_encoder,
+                self.preprocessor.preprocess_many(names),
+                list(nationalities),
+                prior_strength,
+            )
+            self._set_model_state(model, label_encoder)
+
+            if save_model:
+                self.save_model()
+
+    def train_streaming(
+        self,
+        chunks: Callable[[], Iterable[Tuple[List[str], List[str]]]],
+        classes: Optional[Iterable[str]] = None,
+        epochs: int = 1,
+        n_features: int = 2**20,
+        shuffle_buffer: int = 100_000,
+        save_model: bool = True,
+    ) -> int:
+        """
+        Train a hashed-feature linear model out of core.
+
+        Chunks of name-nationality pairs are featurized with a stateless
+        hashing vectorizer and fed to ``SGDClassifier.partial_fit``, so
+        memory stays bounded by the chunk and shuffle buffer sizes instead of
+        the data set. The resulting model predicts and saves like one trained
+        with ``train``.
+
+        Args:
+            chunks: Callable returning a fresh iterable of (names,
+                nationalities) chunks; it is called once per epoch, plus
+                once to collect the labels when classes is not given
+            classes: Every nationality that can occur in the data
+            epochs: Number of passes over the data
+            n_features: Number of hashed feature columns
+            shuffle_buffer: Number of examples collected from consecutive
+                chunks and shuffled together before each classifier update
+            save_model: Whether to save the trained model
+
+        Returns:
+            Number of training examples in one pass over the data
+
+        Raises:
+            ValueError: If there are no labels, epochs is not positive, a
+                chunk's lists differ in length or a chunk contains a
+                nationality missing from classes
+        """
+        if epochs < 1:
+            raise ValueError("epochs must be a positive integer")
+
+        import numpy as np
+        from sklearn.preprocessing import LabelEncoder
+
+        if classes is None:
+            classes = set()
+            for _, nationalities in chunks():
+                classes.update(nationalities)
+
+        label_encoder = LabelEncoder().fit(sorted(set(classes)))
+        if len(label_encoder.classes_) == 0:
+            raise ValueError("No training examples to train on")
+
+        model = self._create_streaming_model(n_features)
+        vectorizer, classifier = model.steps[0][1], model.steps[-1][1]
+        codes = np.arange(len(label_encoder.classes_))
+        rng = np.random.default_rng(42)
+
+        def fit(names: List[str], nationalities: List[str]) -> None:
+            # Shuffle the buffered examples, so files sorted by nationality
+            # do not feed the classifier one nationality at a time
+            order = rng.permutation(len(names))
+            features = vectorizer.transform(self.preprocessor.preprocess_many(names))
+            labels = label_encoder.transform(nationalities)
+            classifier.partial_fit(features[order], labels[order], classes=codes)
+
+        for _ in range(epochs):
+            n_samples = 0
+            buffered_names: List[str] = []
+            buffered_nationalities: List[str] = []
+            for names, nationalities in chunks():
+                if len(names) != len(nationalities):
+                    raise ValueError(
+                        "Names and nationalities lists must have the same length"
+                    )
+                buffered_names.extend(names)
+                buffered_nationalities.extend(nationalities)
+                n_samples += len(names)
+
+                if len(buffered_names) >= shuffle_buffer:
+                    fit(buffered_names, buffered_nationalities)
+                    buffered_names, buffered_nationalities = [], []
+
+            if buffered_names:
+                fit(buffered_names, buffered_nationalities)
+
+        self._set_model_state(model, label_encoder)
+
+        if save_model:
+            self.save_model()
+
+        return n_samples
+
+    def export_compiled(self) -> CompiledModel:
+        """
+        Export the trained pipeline to a NumPy-only inference engine.
+
+        The returned engine can replace ``self.model`` for scoring and
+        produces the same probabilities without going through scikit-learn.
+
+        Returns:
+            Compiled model with the vocabulary, IDF weights, coefficients,
+            intercepts and class names of the current model
+        """
+        from .compiled_model import CompiledModel
+
+        model, label_encoder = self._model_snapshot()
+        if isinstance(model, CompiledModel):
+            return model
+
+        return CompiledModel.from_pipeline(model, label_encoder)
+
+    def save_compiled(self, path: Optional[str] = None) -> Path:
+        """
+        Save the model in the memory-mappable compiled format.
+
+        Predictors created with ``model_path`` pointing at this file map the
+        arrays read-only, so every process on a host shares one copy.
+
+        Args:
+            path: Destination path (defaults to the model path with a
+                ``.f2n`` suffix)
+
+        Returns:
+            Path of the written file
+        """
+        compiled_path = Path(path) if path else self.model_file_path.with_suffix(".f2n")
+        self.export_compiled().save(compiled_path)
+        print(f"Compiled model saved to {compiled_path}")
+
+        return compiled_path
+
     def save_model(self) -> None:
-        """Save the trained model and label encoder."""
-        model_data = {"model": self.model, "label_encoder": self.label_encoder}
+        """
+        Save the trained model and label encoder.
+
+        The checkpoint is written next to its destination and renamed into
+        place, so concurrent readers never load a half-written file. A
+        compiled model mapped from the same file is read into memory first
+        where the mapped file cannot be replaced (Windows).
+        """
+        import joblib
+
+        from .compiled_model import CompiledModel
+
+        model, label_encoder = self._model_snapshot()
+        model_data = {"model": model, "label_encoder": label_encoder}
 
         # Create directory if it doesn't exist
         self.model_file_path.parent.mkdir(parents=True, exist_ok=True)
 
+        def release() -> None:
+            # Worker processes may map the file too
+            self.close()
+            if isinstance(model, CompiledModel):
+                model._release_mapping()
+
         # Save using joblib for better compatibility
-        joblib.dump(model_data, self.model_file_path)
+        write_atomically(
+            self.model_file_path, lambda f: joblib.dump(model_data, f), release
+        )
         print(f"Model saved to {self.model_file_path}")
 
     def save_dictionary(self, name_dict: Dict[str, List[str]]) -> None:
         """
-        Save a name-to-nationality dictionary.
+        Save a name-to-nationality dictionary in the compact format.
+
+        Where a mapped file cannot be replaced (Windows), the loaded
+        dictionary mapped from the same file is closed before the rename.
 
         Args:
             name_dict: Dictionary mapping names to lists of nationalities
         """
-        self.dictionary_file_path.parent.mkdir(parents=True, exist_ok=True)
+        path = self.dictionary_file_path
+        closed = []
+
+        def release() -> None:
+            for mapping in (self._nationality_dictionary, name_dict):
+                if isinstance(mapping, NameDictionary) and mapping.path == path:
+                    mapping.close()
+                    closed.append(mapping)
 
-        with open(self.dictionary_file_path, "wb") as f:
-            pickle.dump(name_dict, f)
+        write_name_dictionary(path, name_dict, release)
 
-        # Update internal dictionary
+        # Update internal dictionary; a closed mapping is reopened on the new file
+        if any(mapping is name_dict for mapping in closed):
+            name_dict = NameDictionary(path)
         self.nationality_dictionary = name_dict
         print(f"Dictionary saved to {self.dictionary_file_path}")
 
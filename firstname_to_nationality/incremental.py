@@ -0,0 +1,211 @@
+"""
+Incremental updates of trained nationality pipelines.
+
+A fitted vectorizer + linear classifier pipeline is adjusted from a batch of
+new samples only, starting from its current coefficients. Labels the model
+has never seen get new classes whose weights start at zero.
+
+LogisticRegression models are updated by minimizing the usual logistic
+loss on the new samples plus an L2 penalty that pulls the coefficients
+towards their current values (instead of towards zero), so the update moves
+the model only as far as the new evidence requires. Updates see only the new
+samples: a batch of a single nationality pulls every name towards it unless
+the penalty is raised, so batches should be a mix of nationalities. Classifiers that
+support ``partial_fit`` (the hashed models of out-of-core training) take a
+few passes of ``partial_fit`` over the new samples instead.
+"""
+
+import copy
+from typing import Any, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import minimize
+
+from .compiled_model import _linear_parameters
+
+# partial_fit passes over the new samples for incremental classifiers
+PARTIAL_FIT_EPOCHS = 5
+
+
+def update_pipeline(
+    pipeline: Any,
+    label_encoder: Any,
+    documents: Sequence[str],
+    labels: Sequence[str],
+    prior_strength: float = 10.0,
+) -> Tuple[Any, Any]:
+    """
+    Update a fitted pipeline from new samples.
+
+    The given pipeline and label encoder are left unchanged.
+
+    Args:
+        pipeline: Fitted two-step vectorizer + linear classifier pipeline
+        label_encoder: Fitted LabelEncoder of the pipeline's classes
+        documents: Preprocessed names of the new samples
+        labels: Nationalities of the new samples
+        prior_strength: Weight of the penalty that keeps LogisticRegression
+            coefficients close to their current values, relative to the
+            model's own L2 regularization
+
+    Returns:
+        Tuple of (updated pipeline, label encoder including new labels)
+
+    Raises:
+        ValueError: If the pipeline is not a fitted linear pipeline that can
+            be updated, or prior_strength is not positive
+    """
+    if prior_strength <= 0:
+        raise ValueError("prior_strength must be positive")
+
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import LabelEncoder
+
+    steps = getattr(pipeline, "steps", None)
+    if not steps or len(steps) != 2:
+        raise ValueError("Expected a two-step vectorizer + classifier pipeline")
+    vectorizer = steps[0][1]
+    classifier = steps[-1][1]
+    if (
+        not hasattr(classifier, "coef_")
+        or getattr(label_encoder, "classes_", None) is None
+    ):
+        raise ValueError("Model must be trained before it can be updated")
+
+    # LabelEncoder needs sorted classes, so new labels are merged in order
+    # and the existing classes move to their new positions
+    old_classes = np.asarray(label_encoder.classes_)[classifier.classes_]
+    classes = np.union1d(label_encoder.classes_, np.asarray(labels))
+    updated_encoder = LabelEncoder()
+    updated_encoder.classes_ = classes
+    positions = np.searchsorted(classes, old_classes)
+
+    features = vectorizer.transform(documents)
+    codes = updated_encoder.transform(labels)
+
+    if hasattr(classifier, "partial_fit"):
+        updated = _update_incremental(classifier, features, codes, positions, classes)
+    elif isinstance(classifier, LogisticRegression):
+        updated = _update_logistic(
+            classifier, features, codes, positions, classes, prior_strength
+        )
+    else:
+        raise ValueError(
+            f"Cannot update a {type(classifier).__name__} classifier incrementally"
+        )
+
+    updated_pipeline = Pipeline(steps[:-1] + [(steps[-1][0], updated)])
+    return updated_pipeline, updated_encoder
+
+
+def _expanded_parameters(
+    coef: np.ndarray,
+    intercept: np.ndarray,
+    positions: np.ndarray,
+    n_classes: int,
+    new_intercept: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Place per-class parameters at their new positions, zeros for new classes."""
+    expanded_coef = np.zeros((n_classes, coef.shape[1]), dtype=np.float64)
+    expanded_coef[positions] = coef
+    expanded_intercept = np.full(n_classes, new_intercept, dtype=np.float64)
+    expanded_intercept[positions] = intercept
+    return expanded_coef, expanded_intercept
+
+
+def _update_logistic(
+    classifier: Any,
+    features: sparse.csr_matrix,
+    codes: np.ndarray,
+    positions: np.ndarray,
+    classes: np.ndarray,
+    prior_strength: float,
+) -> Any:
+    """Proximal softmax update of a LogisticRegression classifier."""
+    weights, intercept, link = _linear_parameters(classifier)
+    if link != "softmax":
+        raise ValueError("Only multinomial logistic models can be updated")
+
+    n_classes = len(classes)
+    n_features = weights.shape[1]
+    # New classes start below every known class until the data says otherwise
+    anchor_coef, anchor_intercept = _expanded_parameters(
+        weights, intercept, positions, n_classes, float(intercept.min())
+    )
+    anchor = np.concatenate([anchor_coef.ravel(), anchor_intercept])
+    strength = float(getattr(classifier, "C", 1.0))
+    rows = np.arange(len(codes))
+    features = sparse.csr_matrix(features, dtype=np.float64)
+
+    def loss_and_gradient(theta: np.ndarray) -> Tuple[float, np.ndarray]:
+        coef = theta[: n_classes * n_features].reshape(n_classes, n_features)
+        scores = np.asarray(features @ coef.T) + theta[n_classes * n_features :]
+        scores -= scores.max(axis=1, keepdims=True)
+        log_proba = scores - np.log(np.exp(scores).sum(axis=1, keepdims=True))
+
+        difference = theta - anchor
+        loss = -strength * log_proba[rows, codes].sum()
+        loss += 0.5 * prior_strength * difference @ difference
+
+        residual = np.exp(log_proba)
+        residual[rows, codes] -= 1.0
+        residual *= strength
+        gradient = np.concatenate(
+            [np.asarray(features.T @ residual).T.ravel(), residual.sum(axis=0)]
+        )
+        return loss, gradient + prior_strength * difference
+
+    result = minimize(
+        loss_and_gradient,
+        anchor,
+        jac=True,
+        method="L-BFGS-B",
+        options={"maxiter": getattr(classifier, "max_iter", 100)},
+    )
+    coef = result.x[: n_classes * n_features].reshape(n_classes, n_features)
+    intercept = result.x[n_classes * n_features :]
+
+    updated = copy.deepcopy(classifier)
+    if n_classes == 2:
+        # Binary LogisticRegression scores expit(d) == softmax([0, d])[1]
+        coef = coef[1:] - coef[:1]
+        intercept = intercept[1:] - intercept[:1]
+    updated.coef_ = coef
+    updated.intercept_ = intercept
+    updated.classes_ = np.arange(n_classes)
+    updated.n_iter_ = np.array([result.nit], dtype=np.int32)
+    return updated
+
+
+def _update_incremental(
+    classifier: Any,
+    features: sparse.csr_matrix,
+    codes: np.ndarray,
+    positions: np.ndarray,
+    classes: np.ndarray,
+) -> Any:
+    """A few partial_fit passes, after adding rows for new classes."""
+    updated = copy.deepcopy(classifier)
+    n_classes = len(classes)
+
+    if n_classes != len(updated.classes_):
+        coef = np.asarray(updated.coef_, dtype=np.float64)
+        intercept = np.asarray(updated.intercept_, dtype=np.float64)
+        if coef.shape[0] == 1:
+            # Binary models hold one decision function; one-vs-rest needs one
+            # per class, and expit(-d) == 1 - expit(d) for the first class
+            coef = np.vstack([-coef, coef])
+            intercept = np.hstack([-intercept, intercept])
+        updated.coef_, updated.intercept_ = _expanded_parameters(
+            coef, intercept, positions, n_classes, float(intercept.min())
+        )
+        updated.classes_ = np.arange(n_classes)
+
+    all_codes = np.arange(n_classes)
+    rng = np.random.default_rng(42)
+    for _ in range(PARTIAL_FIT_EPOCHS):
+        order = rng.permutation(len(codes))
+        updated.partial_fit(features[order], codes[order], classes=all_codes)
+    return updated
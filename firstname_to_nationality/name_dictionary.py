@@ -0,0 +1,260 @@
+"""
+Compact name-to-nationality dictionary store.
+
+Names are kept as one UTF-8 blob with an offsets table, and each name's
+nationalities as integer codes into a shared label table. The file is
+memory-mapped and searched with a binary search over a sorted index, so
+processes share the pages instead of each unpickling a large Python dict.
+"""
+
+import json
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from .atomic_file import write_atomically
+
+NAME_DICTIONARY_MAGIC = b"F2NDICT1"
+
+# magic, n_names, n_codes, labels_size, keys_size, code_itemsize
+_HEADER = struct.Struct("<8sQQQQQ")
+_CODE_TYPECODES = {2: "H", 4: "I"}
+
+
+def _padding(size: int) -> int:
+    """Bytes needed to pad a section to 8-byte alignment."""
+    return -size % 8
+
+
+def _to_bytes(values: array) -> bytes:
+    """Serialize an array in little-endian byte order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class NameDictionary(Mapping):
+    """
+    Read-only, memory-mapped mapping from names to nationality lists.
+
+    Behaves like the ``Dict[str, List[str]]`` it was built from, including
+    its iteration order.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open a compact dictionary file.
+
+        Args:
+            path: Path to a file written by :func:`write_name_dictionary`
+
+        Raises:
+            ValueError: If the file is not a compact name dictionary
+        """
+        self.path = Path(path)
+
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, n_names, n_codes, labels_size, keys_size, code_itemsize = (
+            _HEADER.unpack_from(self._mmap, 0)
+        )
+        if magic != NAME_DICTIONARY_MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a compact name dictionary")
+
+        offset = _HEADER.size
+        self.labels: List[str] = json.loads(
+            self._mmap[offset : offset + labels_size].decode("utf-8")
+        )
+        offset += labels_size + _padding(labels_size)
+
+        self._key_offsets = self._view(offset, n_names + 1, "q")
+        offset += 8 * (n_names + 1)
+        self._code_offsets = self._view(offset, n_names + 1, "q")
+        offset += 8 * (n_names + 1)
+        self._sorted_index = self._view(offset, n_names, "I")
+        offset += 4 * n_names + _padding(4 * n_names)
+
+        self._keys_start = offset
+        offset += keys_size + _padding(keys_size)
+        self._codes = self._view(offset, n_codes, _CODE_TYPECODES[code_itemsize])
+
+        self._size = n_names
+
+    def _view(self, offset: int, count: int, typecode: str):
+        """Zero-copy typed view of a section of the mapped file."""
+        itemsize = array(typecode).itemsize
+        view = memoryview(self._mmap)[offset : offset + count * itemsize]
+        if sys.byteorder == "big":
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return values
+        return view.cast(typecode)
+
+    def _key(self, index: int) -> bytes:
+        """UTF-8 bytes of the name stored at a position."""
+        start = self._keys_start + self._key_offsets[index]
+        end = self._keys_start + self._key_offsets[index + 1]
+        return self._mmap[start:end]
+
+    def _find(self, name: str) -> int:
+        """Binary search for a name; returns its position or -1."""
+        try:
+            key = name.encode("utf-8")
+        except (AttributeError, UnicodeEncodeError):
+            return -1
+
+        sorted_index = self._sorted_index
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(sorted_index[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self._size and self._key(sorted_index[low]) == key:
+            return sorted_index[low]
+        return -1
+
+    def __getitem__(self, name: str) -> List[str]:
+        index = self._find(name)
+        if index < 0:
+            raise KeyError(name)
+
+        labels = self.labels
+        codes = self._codes
+        return [
+            labels[codes[i]]
+            for i in range(self._code_offsets[index], self._code_offsets[index + 1])
+        ]
+
+    def __contains__(self, name: object) -> bool:
+        return self._find(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._size):
+            yield self._key(index).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __reduce__(self):
+        # Re-open the mapping instead of copying its contents when pickled
+        return (NameDictionary, (str(self.path),))
+
+    def close(self) -> None:
+        """Release the memory mapping."""
+        for view in (self._key_offsets, self._code_offsets, self._sorted_index):
+            if isinstance(view, memoryview):
+                view.release()
+        if isinstance(self._codes, memoryview):
+            self._codes.release()
+        self._mmap.close()
+
+
+def is_name_dictionary_file(path: Union[str, Path]) -> bool:
+    """
+    Check whether a file is in the compact name dictionary format.
+
+    Args:
+        path: File path to check
+
+    Returns:
+        True if the file starts with the compact dictionary magic bytes
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(NAME_DICTIONARY_MAGIC)) == NAME_DICTIONARY_MAGIC
+    except OSError:
+        return False
+
+
+def write_name_dictionary(
+    path: Union[str, Path],
+    name_dict: Mapping,
+    release: Optional[Callable[[], None]] = None,
+) -> Path:
+    """
+    Write a name-to-nationality mapping in the compact dictionary format.
+
+    The file is written next to its destination and renamed into place.
+
+    Args:
+        path: Destination file path
+        name_dict: Mapping from names to lists of nationalities
+        release: Closes this process's NameDictionary mappings of path;
+            called only if replacing the file is refused (Windows)
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    label_codes: Dict[str, int] = {}
+    key_offsets = array("q", [0])
+    code_offsets = array("q", [0])
+    codes: List[int] = []
+    keys = bytearray()
+    encoded_names: List[bytes] = []
+
+    for name, nationalities in name_dict.items():
+        encoded = name.encode("utf-8")
+        encoded_names.append(encoded)
+        keys += encoded
+        key_offsets.append(len(keys))
+
+        for nationality in nationalities:
+            codes.append(label_codes.setdefault(nationality, len(label_codes)))
+        code_offsets.append(len(codes))
+
+    code_itemsize = 2 if len(label_codes) <= 0xFFFF else 4
+    sorted_index = array(
+        "I", sorted(range(len(encoded_names)), key=encoded_names.__getitem__)
+    )
+    labels = json.dumps(list(label_codes)).encode("utf-8")
+
+    sections = [
+        _HEADER.pack(
+            NAME_DICTIONARY_MAGIC,
+            len(encoded_names),
+            len(codes),
+            len(labels),
+            len(keys),
+            code_itemsize,
+        ),
+        labels + b"\0" * _padding(len(labels)),
+        _to_bytes(key_offsets),
+        _to_bytes(code_offsets),
+        _to_bytes(sorted_index) + b"\0" * _padding(4 * len(sorted_index)),
+        bytes(keys) + b"\0" * _padding(len(keys)),
+        _to_bytes(array(_CODE_TYPECODES[code_itemsize], codes)),
+    ]
+
+    write_atomically(path, lambda f: f.writelines(sections), release)
+    return path
+
+
+def load_name_dictionary(path: Union[str, Path]) -> Mapping:
+    """
+    Load a name dictionary in either the compact or the legacy pickle format.
+
+    Args:
+        path: Dictionary file path
+
+    Returns:
+        A memory-mapped NameDictionary, or the unpickled dict for legacy files
+    """
+    if is_name_dictionary_file(path):
+        return NameDictionary(path)
+
+    with open(path, "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,269 @@
+"""
+Process-pool batch prediction.
+
+The parent process loads the model and dictionary once, deduplicates the
+batch and splits the distinct names into chunks that worker processes score
+with ``predict_encoded``. Each predictor keeps one long-lived pool, started
+on its first parallel batch and reused until the worker count changes, the
+model or dictionary is replaced, or the predictor is closed. Workers receive
+the predictor through the pool initializer when the pool starts: on Linux
+they are forked and inherit the loaded predictor copy-on-write, elsewhere
+the platform's default start method pickles it to each worker once (compiled
+models are memory-mapped, so their arrays are shared pages in any case).
+Workers return compact label-code arrays, which are merged and scattered
+back to input order.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import os
+import sys
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .firstname_to_nationality import EncodedPredictions
+
+if TYPE_CHECKING:
+    from .firstname_to_nationality import FirstnameToNationality
+
+# Chunks per worker, so that uneven chunks still keep every worker busy
+CHUNKS_PER_WORKER = 4
+
+# Predictor of a worker process, set by _init_worker when the pool starts.
+# Only ever assigned inside workers, never in the parent process
+_worker_predictor: Optional[FirstnameToNationality] = None
+
+
+def effective_n_jobs(n_jobs: Optional[int]) -> int:
+    """
+    Resolve an ``n_jobs`` value to a number of worker processes.
+
+    Follows the scikit-learn convention: None means 1 and negative values
+    count back from the number of CPUs (-1 uses all of them).
+
+    Args:
+        n_jobs: Requested number of jobs
+
+    Returns:
+        Number of worker processes (at least 1)
+
+    Raises:
+        ValueError: If n_jobs is 0
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a non-zero integer")
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for worker pools.
+
+    Forking shares the loaded model copy-on-write, but forking a process
+    that runs threads is unsafe on macOS, so fork is only used on Linux.
+    """
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _init_worker(predictor: FirstnameToNationality) -> None:
+    """Keep the predictor of a newly started worker process."""
+    global _worker_predictor
+    # A forked copy may hold locks that other parent threads had taken, so
+    # it gets fresh ones, as a pickled copy does
+    predictor.__setstate__(predictor.__getstate__())
+    _worker_predictor = predictor
+
+
+class WorkerPool:
+    """
+    Long-lived process pool that scores chunks with a predictor's model.
+
+    The pool is started on first use and restarted when the requested number
+    of workers changes or the predictor's model or dictionary is replaced
+    (tracked through its prediction cache generation). Batches submitted
+    from several threads run one after another, each using every worker.
+    """
+
+    def __init__(self, predictor: FirstnameToNationality):
+        """
+        Initialize the pool without starting any worker.
+
+        Args:
+            predictor: Predictor whose model and dictionary the workers use
+        """
+        self.predictor = predictor
+        self._pool: Optional[multiprocessing.pool.Pool] = None
+        self._n_workers = 0
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def map(
+        self,
+        n_workers: int,
+        tasks: List[Tuple[List[str], int, bool, int, Optional[int]]],
+    ) -> List[EncodedPredictions]:
+        """
+        Score chunks of distinct names in the worker processes.
+
+        Args:
+            n_workers: Number of worker processes
+            tasks: Chunk arguments for _predict_chunk
+
+        Returns:
+            One EncodedPredictions per task, in task order
+        """
+        with self._lock:
+            # Load once in the parent so every worker starts with the model
+            self.predictor.warmup()
+            generation = self.predictor.cache.generation
+            if (
+                self._pool is None
+                or self._n_workers != n_workers
+                or self._generation != generation
+            ):
+                self._terminate()
+                self._pool = _pool_context().Pool(
+                    n_workers, initializer=_init_worker, initargs=(self.predictor,)
+                )
+                self._n_workers = n_workers
+                self._generation = generation
+            return self._pool.map(_predict_chunk, tasks)
+
+    def close(self) -> None:
+        """Stop the worker processes; the next batch starts a new pool."""
+        with self._lock:
+            self._terminate()
+
+    def _terminate(self) -> None:
+        """Stop the current pool, if any (caller holds the lock)."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+def _predict_chunk(
+    task: Tuple[List[str], int, bool, int, Optional[int]],
+) -> EncodedPredictions:
+    """Score one chunk of distinct names in a worker."""
+    names, top_n, use_dict, mini_batch_size, n_threads = task
+    return _worker_predictor.predict_encoded(
+        names, top_n, use_dict, mini_batch_size, n_threads=n_threads
+    )
+
+
+def _merge_parts(parts: Sequence[EncodedPredictions]) -> EncodedPredictions:
+    """
+    Concatenate chunk predictions under one label table.
+
+    Chunks answered entirely from the dictionary never load the class list,
+    so the model classes are taken from the chunk that has the most of them
+    and every chunk's codes are remapped onto the merged table.
+    """
+    base = max(parts, key=lambda part: part.n_classes)
+    labels = base.labels[: base.n_classes]
+    label_codes = {label: code for code, label in enumerate(labels)}
+    width = max(part.indices.shape[1] for part in parts)
+
+    indices = []
+    confidences = []
+    for part in parts:
+        remap = np.empty(len(part.labels) + 1, dtype=np.intp)
+        for code, label in enumerate(part.labels):
+            if label not in label_codes:
+                label_codes[label] = len(labels)
+                labels.append(label)
+            remap[code] = label_codes[label]
+        # Padding code -1 picks the trailing -1 entry
+        remap[-1] = -1
+
+        padding = ((0, 0), (0, width - part.indices.shape[1]))
+        indices.append(np.pad(remap[part.indices], padding, constant_values=-1))
+        confidences.append(np.pad(part.confidences, padding))
+
+    return EncodedPredictions(
+        names=[name for part in parts for name in part.names],
+        labels=labels,
+        indices=np.concatenate(indices),
+        confidences=np.concatenate(confidences),
+        n_classes=base.n_classes,
+    )
+
+
+def predict_encoded_parallel(
+    predictor: FirstnameToNationality,
+    names: Union[str, List[str]],
+    top_n: int = 1,
+    use_dict: bool = True,
+    mini_batch_size: int = 128,
+    n_jobs: Optional[int] = -1,
+    n_threads: Optional[int] = None,
+) -> EncodedPredictions:
+    """
+    Predict a batch with a pool of worker processes.
+
+    Gives the same predictions as ``predictor.predict_encoded``. Batches too
+    small to give every worker a full mini-batch are scored in-process.
+    Predictions made by workers are not added to the parent's cache.
+
+    Args:
+        predictor: Predictor whose model and dictionary the workers use
+        names: Single name string or list of names
+        top_n: Number of top predictions per name
+        use_dict: Whether to use dictionary lookup
+        mini_batch_size: Number of distinct names scored per model call
+        n_jobs: Number of worker processes (-1 for one per CPU)
+        n_threads: Number of scoring threads in each worker
+
+    Returns:
+        EncodedPredictions with one row per input name, in input order
+    """
+    if isinstance(names, str):
+        names = [names]
+
+    unique: Dict[str, int] = {}
+    inverse = [unique.setdefault(name.lower().strip(), len(unique)) for name in names]
+    distinct = list(unique)
+
+    pool_size = effective_n_jobs(n_jobs)
+    n_workers = min(pool_size, math.ceil(len(distinct) / mini_batch_size))
+    if n_workers <= 1:
+        return predictor.predict_encoded(
+            names, top_n, use_dict, mini_batch_size, n_threads=n_threads
+        )
+
+    chunk_size = max(
+        mini_batch_size, math.ceil(len(distinct) / (n_workers * CHUNKS_PER_WORKER))
+    )
+    tasks = [
+        (
+            distinct[start : start + chunk_size],
+            top_n,
+            use_dict,
+            mini_batch_size,
+            n_threads,
+        )
+        for start in range(0, len(distinct), chunk_size)
+    ]
+
+    parts = predictor._worker_pool().map(pool_size, tasks)
+
+    merged = _merge_parts(parts)
+    inverse = np.asarray(inverse, dtype=np.intp)
+    return EncodedPredictions(
+        names=list(names),
+        labels=merged.labels,
+        indices=merged.indices[inverse],
+        confidences=merged.confidences[inverse],
+        n_classes=merged.n_classes,
+    )
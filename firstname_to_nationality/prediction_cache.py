@@ -0,0 +1,153 @@
+"""
+Bounded LRU cache for nationality predictions.
+
+Name traffic is heavily skewed, so a small cache in front of the model
+answers most repeated names without preprocessing or scoring them again.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    """Data class for prediction cache statistics."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class PredictionCache:
+    """
+    Least-recently-used cache of prediction lists.
+
+    Entries are stored as tuples and handed out as fresh lists, so callers
+    can modify the results they receive without corrupting the cache. All
+    methods are safe to call from several threads.
+    """
+
+    def __init__(self, max_size: int = 0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries (0 disables caching)
+        """
+        if max_size < 0:
+            raise ValueError("max_size must be a non-negative integer")
+
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple[str, float], ...]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Incremented by clear(), so results computed before it can be refused
+        self.generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[List[Tuple[str, float]]]:
+        """
+        Look up a prediction and mark it as most recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            List of (nationality, confidence) tuples, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry)
+
+    def put(
+        self,
+        key: Hashable,
+        predictions: List[Tuple[str, float]],
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Store a prediction, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            predictions: List of (nationality, confidence) tuples
+            generation: Value of ``generation`` when the prediction started;
+                the prediction is dropped if the cache was cleared since
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self._entries[key] = tuple(predictions)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry, keeping the hit/miss/eviction counters."""
+        with self._lock:
+            self._entries.clear()
+            self.generation += 1
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss/eviction counters."""
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Get a snapshot of the cache counters.
+
+        Returns:
+            CacheStats with hits, misses, evictions and current size
+        """
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                size=len(self._entries),
+                max_size=self.max_size,
+            )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self):
+        # Locks cannot be pickled; a copy gets its own
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,292 @@
+"""
+Cross-validated hyperparameter search for the nationality pipeline.
+
+Candidates are settings of the default vectorizer + classifier pipeline,
+given as ``Pipeline.set_params`` keywords. Each candidate is scored by
+k-fold cross-validation over the distinct (name, nationality) pairs, with
+accuracy weighted by pair counts. The model fitted on the first fold is
+then timed and measured, so configurations can be compared on accuracy,
+inference throughput and size together.
+
+Featurization is shared: the vectorizer of each distinct vectorizer setting
+is fitted once per fold and its feature matrix written to a FeatureCache.
+Classifier fits run in parallel worker processes that memory-map those
+matrices, so candidates that differ only in classifier settings never
+featurize again, and all workers read one copy of the features.
+
+Usage:
+    candidates = candidate_settings(n_candidates=10)
+    results = tune(names, nationalities, candidates, folds=3, n_jobs=-1)
+"""
+
+import io
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .feature_cache import FeatureCache
+from .firstname_to_nationality import FirstnameToNationality
+
+# Search space of the default pipeline, as Pipeline.set_params keywords
+DEFAULT_PARAM_GRID: Dict[str, List[Any]] = {
+    "vectorizer__ngram_range": [(1, 2), (1, 3), (1, 4)],
+    "vectorizer__max_features": [5_000, 10_000, 50_000],
+    "classifier__C": [0.3, 1.0, 3.0],
+    "classifier__max_iter": [200, 1000],
+}
+
+# Held-out names scored when timing inference
+THROUGHPUT_SAMPLE_SIZE = 10_000
+
+
+@dataclass
+class TuningResult:
+    """Cross-validation scores and costs of one candidate setting."""
+
+    params: Dict[str, Any]
+    accuracy: float
+    accuracy_std: float
+    fit_seconds: float
+    names_per_second: float
+    model_bytes: int
+    on_frontier: bool = False
+
+
+def candidate_settings(
+    param_grid: Optional[Dict[str, List[Any]]] = None,
+    n_candidates: Optional[int] = None,
+    random_state: int = 42,
+) -> List[Dict[str, Any]]:
+    """
+    List the settings to evaluate.
+
+    Args:
+        param_grid: Values to try per Pipeline.set_params keyword
+            (DEFAULT_PARAM_GRID if None)
+        n_candidates: Number of settings sampled at random from the grid
+            (None for the full grid)
+        random_state: Seed of the random sample
+
+    Returns:
+        List of Pipeline.set_params keyword dictionaries
+    """
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    param_grid = param_grid or DEFAULT_PARAM_GRID
+    grid = ParameterGrid(param_grid)
+    if n_candidates is None or n_candidates >= len(grid):
+        return list(grid)
+    return list(ParameterSampler(param_grid, n_candidates, random_state=random_state))
+
+
+def tune(
+    names: List[str],
+    nationalities: List[str],
+    candidates: Sequence[Dict[str, Any]],
+    folds: int = 3,
+    n_jobs: int = -1,
+    feature_cache: Optional[FeatureCache] = None,
+) -> List[TuningResult]:
+    """
+    Cross-validate candidate settings of the default pipeline.
+
+    Args:
+        names: Training names
+        nationalities: Corresponding nationalities
+        candidates: Pipeline.set_params keyword dictionaries to evaluate
+        folds: Number of cross-validation folds
+        n_jobs: Number of worker processes (-1 for all cores)
+        feature_cache: Cache for the corpus and fold features (a temporary
+            one is used if None)
+
+    Returns:
+        One result per candidate, best accuracy first
+
+    Raises:
+        ValueError: If there are no candidates, fewer than two folds, or
+            fewer distinct pairs than folds
+    """
+    if len(names) != len(nationalities):
+        raise ValueError("Names and nationalities lists must have the same length")
+    if not candidates:
+        raise ValueError("No candidate settings to evaluate")
+    if folds < 2:
+        raise ValueError("folds must be at least 2")
+
+    if feature_cache is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            return tune(
+                names, nationalities, candidates, folds, n_jobs, FeatureCache(temp_dir)
+            )
+
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+    from sklearn.model_selection import KFold
+    from sklearn.preprocessing import LabelEncoder
+
+    predictor = FirstnameToNationality(lazy=True)
+    documents, labels, weights, corpus_key = predictor._deduplicated_corpus(
+        names, nationalities, feature_cache
+    )
+    if len(documents) < folds:
+        raise ValueError(
+            f"Need at least {folds} distinct name/nationality pairs for {folds} folds"
+        )
+
+    label_encoder = LabelEncoder()
+    codes = label_encoder.fit_transform(labels)
+    weights = np.asarray(weights, dtype=np.float64)
+    splits = list(KFold(folds, shuffle=True, random_state=42).split(documents))
+
+    models = [_candidate_model(predictor, params) for params in candidates]
+
+    def fold_key(model: Any, fold: int) -> str:
+        return feature_cache.features_key(
+            f"{corpus_key}-fold{fold}of{folds}", model.named_steps["vectorizer"]
+        )
+
+    # Every fold matrix must stay cached until the last classifier is fitted;
+    # the shared cache's byte limit applies again on its next write
+    fold_models = {fold_key(model, 0): model for model in models}
+    cache = FeatureCache(
+        feature_cache.directory, feature_cache.max_entries, max_bytes=None
+    )
+
+    parallel = Parallel(n_jobs=n_jobs)
+    parallel(
+        delayed(_featurize_fold)(
+            cache,
+            corpus_key,
+            clone(model.named_steps["vectorizer"]),
+            train_index,
+            fold_key(model, fold),
+        )
+        for model in fold_models.values()
+        for fold, (train_index, _) in enumerate(splits)
+        if cache.load_features(fold_key(model, fold)) is None
+    )
+
+    # Only the first fold's classifiers come back, for timing and sizing
+    scores = parallel(
+        delayed(_evaluate_fold)(
+            cache,
+            fold_key(model, fold),
+            clone(model.named_steps["classifier"]),
+            codes,
+            weights,
+            train_index,
+            test_index,
+            fold == 0,
+        )
+        for model in models
+        for fold, (train_index, test_index) in enumerate(splits)
+    )
+
+    # Timing runs one candidate at a time, so workers do not compete for cores
+    sample = [documents[i] for i in splits[0][1][:THROUGHPUT_SAMPLE_SIZE]]
+    results = []
+    for index, (params, model) in enumerate(zip(candidates, models)):
+        fold_scores = scores[index * folds : (index + 1) * folds]
+        accuracies = [accuracy for accuracy, _, _ in fold_scores]
+        vectorizer, _ = cache.load_features(fold_key(model, 0))
+        model.steps[0] = (model.steps[0][0], vectorizer)
+        model.steps[-1] = (model.steps[-1][0], fold_scores[0][2])
+
+        results.append(
+            TuningResult(
+                params=dict(params),
+                accuracy=float(np.mean(accuracies)),
+                accuracy_std=float(np.std(accuracies)),
+                fit_seconds=float(np.mean([seconds for _, seconds, _ in fold_scores])),
+                names_per_second=_throughput(model, sample),
+                model_bytes=_model_bytes(model, label_encoder),
+            )
+        )
+
+    _mark_frontier(results)
+    results.sort(key=lambda result: result.accuracy, reverse=True)
+    return results
+
+
+def _candidate_model(predictor: FirstnameToNationality, params: Dict[str, Any]):
+    """Unfitted default pipeline with a candidate's settings."""
+    model, _ = predictor._create_default_model()
+    model.set_params(**params)
+    return model
+
+
+def _featurize_fold(
+    cache: FeatureCache,
+    corpus_key: str,
+    vectorizer: Any,
+    train_index: np.ndarray,
+    key: str,
+) -> None:
+    """Fit a vectorizer on a training fold and cache features of every row."""
+    documents, _, weights = cache.load_corpus(corpus_key)
+    FirstnameToNationality._fit_vectorizer_weighted(
+        vectorizer, [documents[i] for i in train_index], weights[train_index]
+    )
+    cache.save_features(key, vectorizer, vectorizer.transform(documents))
+
+
+def _evaluate_fold(
+    cache: FeatureCache,
+    key: str,
+    classifier: Any,
+    codes: np.ndarray,
+    weights: np.ndarray,
+    train_index: np.ndarray,
+    test_index: np.ndarray,
+    return_classifier: bool,
+) -> Tuple[float, float, Any]:
+    """Fit a classifier on cached fold features; count-weighted accuracy."""
+    _, features = cache.load_features(key)
+
+    start = time.perf_counter()
+    classifier.fit(
+        features[train_index], codes[train_index], sample_weight=weights[train_index]
+    )
+    fit_seconds = time.perf_counter() - start
+
+    correct = classifier.predict(features[test_index]) == codes[test_index]
+    accuracy = np.average(correct, weights=weights[test_index])
+    return float(accuracy), fit_seconds, classifier if return_classifier else None
+
+
+def _throughput(model: Any, documents: List[str], runs: int = 3) -> float:
+    """Preprocessed names scored per second by predict_proba, best of runs."""
+    if not documents:
+        return 0.0
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        model.predict_proba(documents)
+        best = min(best, time.perf_counter() - start)
+    return len(documents) / max(best, 1e-9)
+
+
+def _model_bytes(model: Any, label_encoder: Any) -> int:
+    """Size of the model as written by FirstnameToNationality.save_model."""
+    import joblib
+
+    buffer = io.BytesIO()
+    joblib.dump({"model": model, "label_encoder": label_encoder}, buffer)
+    return buffer.tell()
+
+
+def _mark_frontier(results: List[TuningResult]) -> None:
+    """Flag results that no other result beats on both accuracy and speed."""
+    for result in results:
+        result.on_frontier = not any(
+            other.accuracy >= result.accuracy
+            and other.names_per_second >= result.names_per_second
+            and (
+                other.accuracy > result.accuracy
+                or other.names_per_second > result.names_per_second
+            )
+            for other in results
+        )
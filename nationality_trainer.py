@@ -6,11 +6,21 @@ This script provides utilities for training the FirstnameToNationality model wit
 """
 
 import sys
-import pickle
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Iterator, List, Tuple, Dict
 import pandas as pd
 from firstname_to_nationality import FirstnameToNationality
+from firstname_to_nationality.feature_cache import FeatureCache
+from firstname_to_nationality.tuning import candidate_settings, tune
+from firstname_to_nationality.name_dictionary import (
+    is_name_dictionary_file,
+    load_name_dictionary,
+    write_name_dictionary,
+)
+
+# Preprocessed corpora and feature matrices of earlier runs, reused while the
+# training data and vectorizer settings are unchanged
+FEATURE_CACHE_DIR = Path(__file__).parent / ".feature_cache"
 
 
 def load_training_data(file_path: str) -> Tuple[List[str], List[str]]:
@@ -49,15 +59,14 @@ def load_dictionary_data(
     Load training data from the firstname_nationalities.pkl dictionary.
 
     Args:
-        dict_path: Path to the pickle dictionary file
+        dict_path: Path to the dictionary file (compact or legacy pickle)
         max_samples: Maximum number of samples to load (None for all)
 
     Returns:
         Tuple of (names, nationalities) lists
     """
     try:
-        with open(dict_path, "rb") as f:
-            name_dict = pickle.load(f)
+        name_dict = load_name_dictionary(dict_path)
 
         names = []
         nationalities = []
@@ -80,6 +89,71 @@ def load_dictionary_data(
         sys.exit(1)
 
 
+def iter_training_chunks(
+    file_path: str, chunk_size: int = 100_000
+) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    Read training data from a CSV file in chunks.
+
+    Expected format: CSV with columns 'name' and 'nationality'
+
+    Args:
+        file_path: Path to the CSV file
+        chunk_size: Number of rows per chunk
+
+    Yields:
+        Tuples of (names, nationalities) lists with at most chunk_size rows
+    """
+    reader = pd.read_csv(
+        file_path,
+        usecols=["name", "nationality"],
+        dtype=str,
+        keep_default_na=False,
+        chunksize=chunk_size,
+    )
+    for chunk in reader:
+        yield chunk["name"].tolist(), chunk["nationality"].tolist()
+
+
+def iter_dictionary_chunks(
+    dict_path: str, chunk_size: int = 100_000, max_samples: int = None
+) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    Read training data from the name dictionary in chunks.
+
+    Compact dictionaries are memory-mapped, so only the current chunk is
+    held in Python lists.
+
+    Args:
+        dict_path: Path to the dictionary file (compact or legacy pickle)
+        chunk_size: Number of examples per chunk
+        max_samples: Maximum number of samples to read (None for all)
+
+    Yields:
+        Tuples of (names, nationalities) lists with at most chunk_size rows
+    """
+    name_dict = load_name_dictionary(dict_path)
+
+    names = []
+    nationalities = []
+    total = 0
+    for name, nat_list in name_dict.items():
+        if max_samples and total >= max_samples:
+            break
+        # Use the first nationality for each name
+        if nat_list:
+            names.append(name)
+            nationalities.append(nat_list[0])
+            total += 1
+
+        if len(names) >= chunk_size:
+            yield names, nationalities
+            names, nationalities = [], []
+
+    if names:
+        yield names, nationalities
+
+
 def create_sample_data() -> Tuple[List[str], List[str]]:
     """
     Create sample training data for demonstration.
@@ -170,18 +244,20 @@ def create_sample_data() -> Tuple[List[str], List[str]]:
     return names, nationalities
 
 
-def train_model(training_file: str = None, use_dictionary: bool = False) -> None:
+def load_training_set(
+    training_file: str = None, use_dictionary: bool = False
+) -> Tuple[List[str], List[str]]:
     """
-    Train the FirstnameToNationality model.
+    Load the training data chosen on the command line.
 
     Args:
         training_file: Optional path to CSV training file
         use_dictionary: Whether to use the pickle dictionary for training
-    """
-    print("🚀 Firstname to Nationality Training Script")
-    print("=" * 50)
 
-    # Load training data
+    Returns:
+        Tuple of (names, nationalities) lists; the sample data if neither a
+        dictionary nor an existing training file is given
+    """
     if use_dictionary:
         dict_path = (
             Path(__file__).parent
@@ -200,6 +276,26 @@ def train_model(training_file: str = None, use_dictionary: bool = False) -> None
         print("📝 Using sample training data (no training file provided)")
         names, nationalities = create_sample_data()
 
+    return names, nationalities
+
+
+def train_model(
+    training_file: str = None, use_dictionary: bool = False, use_cache: bool = True
+) -> None:
+    """
+    Train the FirstnameToNationality model.
+
+    Args:
+        training_file: Optional path to CSV training file
+        use_dictionary: Whether to use the pickle dictionary for training
+        use_cache: Whether to reuse preprocessed names and features cached
+            in FEATURE_CACHE_DIR by earlier runs
+    """
+    print("🚀 Firstname to Nationality Training Script")
+    print("=" * 50)
+
+    names, nationalities = load_training_set(training_file, use_dictionary)
+
     # Initialize the predictor
     print("📦 Initializing FirstnameToNationality predictor...")
     predictor = FirstnameToNationality()
@@ -222,7 +318,10 @@ def train_model(training_file: str = None, use_dictionary: bool = False) -> None
     # Train the model
     print(f"\n🔥 Training model...")
     try:
-        predictor.train(names, nationalities, save_model=True)
+        feature_cache = FeatureCache(FEATURE_CACHE_DIR) if use_cache else None
+        predictor.train(
+            names, nationalities, save_model=True, feature_cache=feature_cache
+        )
         print("✅ Model trained and saved successfully!")
 
         # Test the trained model
@@ -250,6 +349,129 @@ def train_model(training_file: str = None, use_dictionary: bool = False) -> None
     print(f"📁 Model saved to: {predictor.model_file_path}")
 
 
+def train_model_streaming(
+    training_file: str = None,
+    use_dictionary: bool = False,
+    chunk_size: int = 100_000,
+    epochs: int = 3,
+) -> None:
+    """
+    Train the model out of core, reading the training data in chunks.
+
+    Uses a hashed char n-gram featurizer and an incrementally updated
+    linear classifier, so memory stays bounded by the chunk size.
+
+    Args:
+        training_file: Path to CSV training file
+        use_dictionary: Whether to use the pickle dictionary for training
+        chunk_size: Number of examples read at a time
+        epochs: Number of passes over the training data
+    """
+    print("🚀 Firstname to Nationality Streaming Training")
+    print("=" * 50)
+
+    if use_dictionary:
+        dict_path = (
+            Path(__file__).parent
+            / "firstname_to_nationality"
+            / "firstname_nationalities.pkl"
+        )
+        if not dict_path.exists():
+            print(f"❌ Dictionary not found at {dict_path}")
+            sys.exit(1)
+        print(f"📚 Streaming training data from {dict_path}")
+
+        def chunks():
+            return iter_dictionary_chunks(str(dict_path), chunk_size)
+
+    elif training_file and Path(training_file).exists():
+        print(f"📚 Streaming training data from {training_file}")
+
+        def chunks():
+            return iter_training_chunks(training_file, chunk_size)
+
+    else:
+        print(f"❌ Training file not found: {training_file}")
+        sys.exit(1)
+
+    predictor = FirstnameToNationality(lazy=True)
+
+    print(f"\n🔥 Training model ({epochs} epochs, {chunk_size:,} rows per chunk)...")
+    try:
+        n_samples = predictor.train_streaming(chunks, epochs=epochs, save_model=True)
+    except (ValueError, KeyError) as e:
+        print(f"❌ Training failed: {e}")
+        sys.exit(1)
+
+    print(f"✅ Trained on {n_samples:,} examples per epoch")
+    print(f"📁 Model saved to: {predictor.model_file_path}")
+
+
+def tune_model(
+    training_file: str = None,
+    use_dictionary: bool = False,
+    n_candidates: int = None,
+    folds: int = 3,
+    n_jobs: int = -1,
+) -> None:
+    """
+    Cross-validate model settings and report accuracy, speed and size.
+
+    Searches the vectorizer and classifier settings in DEFAULT_PARAM_GRID
+    of firstname_to_nationality.tuning, on all cores by default. Fold
+    features are kept in FEATURE_CACHE_DIR, so candidates and later runs
+    that share vectorizer settings reuse them.
+
+    Args:
+        training_file: Optional path to CSV training file
+        use_dictionary: Whether to use the pickle dictionary for training
+        n_candidates: Number of settings sampled at random (None for the
+            full grid)
+        folds: Number of cross-validation folds
+        n_jobs: Number of worker processes (-1 for all cores)
+    """
+    print("🚀 Firstname to Nationality Hyperparameter Search")
+    print("=" * 50)
+
+    names, nationalities = load_training_set(training_file, use_dictionary)
+    candidates = candidate_settings(n_candidates=n_candidates)
+    print(
+        f"\n🔍 Evaluating {len(candidates)} settings with {folds}-fold "
+        f"cross-validation..."
+    )
+
+    try:
+        results = tune(
+            names,
+            nationalities,
+            candidates,
+            folds=folds,
+            n_jobs=n_jobs,
+            feature_cache=FeatureCache(FEATURE_CACHE_DIR),
+        )
+    except ValueError as e:
+        print(f"❌ Tuning failed: {e}")
+        sys.exit(1)
+
+    print(f"\n📊 Results (* = on the accuracy/throughput frontier):")
+    print(f"   {'accuracy':>15}  {'names/s':>10}  {'size':>9}  {'fit':>7}  settings")
+    for result in results:
+        settings = ", ".join(
+            f"{key.split('__')[-1]}={value}" for key, value in result.params.items()
+        )
+        print(
+            f" {'*' if result.on_frontier else ' '} "
+            f"{result.accuracy:7.2%} ± {result.accuracy_std:5.2%}  "
+            f"{result.names_per_second:10,.0f}  "
+            f"{result.model_bytes / 1e6:7.2f}MB  "
+            f"{result.fit_seconds:6.2f}s  {settings}"
+        )
+
+    best = results[0]
+    print(f"\n✅ Most accurate settings: {best.params}")
+    print("   Apply them with predictor.model.set_params(**settings) before train().")
+
+
 def create_sample_dictionary() -> None:
     """Create a sample name-to-nationality dictionary."""
     print("📚 Creating sample dictionary...")
@@ -273,6 +495,40 @@ def create_sample_dictionary() -> None:
     print("✅ Sample dictionary created and saved!")
 
 
+def compile_model() -> None:
+    """Export the trained model to the memory-mappable compiled format."""
+    print("⚙️  Compiling trained model...")
+
+    predictor = FirstnameToNationality()
+    try:
+        compiled_path = predictor.save_compiled()
+    except ValueError as e:
+        print(f"❌ Could not compile model: {e}")
+        sys.exit(1)
+
+    print(f"✅ Compiled model written to {compiled_path}")
+    print("   Pass it as model_path to share one mapped copy across processes.")
+
+
+def convert_dictionary() -> None:
+    """Convert a legacy pickle dictionary to the compact memory-mapped format."""
+    predictor = FirstnameToNationality(lazy=True)
+    dict_path = predictor.dictionary_file_path
+
+    if not dict_path.exists():
+        print(f"❌ Dictionary not found at {dict_path}")
+        sys.exit(1)
+    if is_name_dictionary_file(dict_path):
+        print(f"✅ {dict_path} is already in the compact format")
+        return
+
+    print("📚 Converting dictionary to the compact format...")
+    name_dict = load_name_dictionary(dict_path)
+    write_name_dictionary(dict_path, name_dict)
+
+    print(f"✅ Converted {len(name_dict)} names in {dict_path}")
+
+
 def main():
     """Main function to handle command line arguments."""
     if len(sys.argv) > 1:
@@ -280,9 +536,38 @@ def main():
             if len(sys.argv) > 2 and sys.argv[2] == "train":
                 # Train using dictionary data
                 train_model(use_dictionary=True)
+            elif len(sys.argv) > 2 and sys.argv[2] == "convert":
+                convert_dictionary()
             else:
                 # Create sample dictionary
                 create_sample_dictionary()
+        elif sys.argv[1] == "--compile":
+            compile_model()
+        elif sys.argv[1] == "tune":
+            import argparse
+
+            parser = argparse.ArgumentParser(prog="nationality_trainer.py tune")
+            parser.add_argument("training_file", nargs="?", help="CSV training file")
+            parser.add_argument(
+                "--dict", action="store_true", help="tune on the dictionary"
+            )
+            parser.add_argument(
+                "--random", type=int, help="number of randomly sampled settings"
+            )
+            parser.add_argument("--folds", type=int, default=3)
+            parser.add_argument("--jobs", type=int, default=-1)
+            args = parser.parse_args(sys.argv[2:])
+            tune_model(
+                args.training_file, args.dict, args.random, args.folds, args.jobs
+            )
+        elif sys.argv[1] == "--clear-cache":
+            FeatureCache(FEATURE_CACHE_DIR).clear()
+            print(f"✅ Cleared feature cache at {FEATURE_CACHE_DIR}")
+        elif sys.argv[1] == "--stream":
+            if len(sys.argv) > 2 and sys.argv[2] == "--dict":
+                train_model_streaming(use_dictionary=True)
+            else:
+                train_model_streaming(sys.argv[2] if len(sys.argv) > 2 else None)
         else:
             train_model(sys.argv[1])
     else:
@@ -294,11 +579,30 @@ def main():
             "  python nationality_trainer.py data.csv           # Train with CSV file"
         )
         print(
-            "  python nationality_trainer.py --dict train       # Train with pickle dictionary"
+            "  python nationality_trainer.py --dict train       # Train with dictionary"
+        )
+        print(
+            "  python nationality_trainer.py --dict convert     # Convert pickle dictionary"
         )
         print(
             "  python nationality_trainer.py --dict             # Create sample dictionary"
         )
+        print(
+            "  python nationality_trainer.py --compile          # Export memory-mappable model"
+        )
+        print(
+            "  python nationality_trainer.py --stream data.csv  # Out-of-core training on a CSV"
+        )
+        print(
+            "  python nationality_trainer.py --stream --dict    # Out-of-core training on the dictionary"
+        )
+        print(
+            "  python nationality_trainer.py --clear-cache      # Delete cached features"
+        )
+        print(
+            "  python nationality_trainer.py tune [data.csv]    # Cross-validate model settings"
+        )
+        print("      [--dict] [--random N] [--folds K] [--jobs N]")
         print()
         print(
             "Recommended: Use --dict train to train with 1M+ examples from the dictionary"
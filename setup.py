@@ -20,6 +20,7 @@ else:
 # Dependencies for Python 3.13
 REQUIRED_PACKAGES = [
     "numpy>=1.25.0",
+    "scipy>=1.10.0",
     "scikit-learn>=1.3.0",
     "joblib>=1.3.0",
     "pandas>=2.0.0",
@@ -27,6 +28,7 @@ REQUIRED_PACKAGES = [
 
 OPTIONAL_PACKAGES = {
     "viz": ["matplotlib>=3.7.0", "seaborn>=0.12.0"],
+    "arrow": ["pyarrow>=14.0.0"],
     "dev": [
         "pytest>=7.4.0",
         "black>=23.0.0",
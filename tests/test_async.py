@@ -0,0 +1,200 @@
+"""
+Unit tests for the asyncio predictors.
+"""
+
+import asyncio
+import unittest
+import tempfile
+import csv
+from pathlib import Path
+from unittest.mock import patch
+
+from firstname_to_nationality import (
+    AsyncFirstnameToCountry,
+    AsyncFirstnameToNationality,
+    FirstnameToCountry,
+)
+from firstname_to_nationality.async_predictor import _CoalescingPredictor
+
+
+class TestAsyncPredictors(unittest.IsolatedAsyncioTestCase):
+    """Tests for request coalescing in the async predictors."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.country_predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        self.predictor = self.country_predictor.nationality_predictor
+        self.predictor.train(
+            ["John", "William", "Giuseppe", "Marco"] * 5,
+            ["American", "American", "Italian", "Italian"] * 5,
+            save_model=False,
+        )
+        self.predictor.nationality_dictionary = {"maria": ["Spanish", "Italian"]}
+
+        self.names = ["John", "Giuseppe", "Maria", "Zed", "john", "Marco"]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    async def test_concurrent_requests_share_one_batch(self):
+        """Test that concurrent predict calls are answered by one batch."""
+        async_predictor = AsyncFirstnameToNationality(self.predictor, max_wait=0.01)
+
+        with patch.object(
+            async_predictor, "_predict_batch", wraps=async_predictor._predict_batch
+        ) as predict_batch:
+            results = await asyncio.gather(
+                *(async_predictor.predict(name, top_n=2) for name in self.names)
+            )
+
+        predict_batch.assert_called_once_with(self.names, 2, True)
+        self.assertEqual(
+            results, [self.predictor.predict_single(name, 2) for name in self.names]
+        )
+
+    async def test_max_batch_size_splits_batches(self):
+        """Test that a full queue starts a batch without waiting."""
+        async_predictor = AsyncFirstnameToNationality(
+            self.predictor, max_batch_size=4, max_wait=0.01
+        )
+
+        with patch.object(
+            async_predictor, "_predict_batch", wraps=async_predictor._predict_batch
+        ) as predict_batch:
+            names = self.names * 2
+            results = await asyncio.gather(*map(async_predictor.predict, names))
+
+        self.assertEqual(
+            [len(call.args[0]) for call in predict_batch.call_args_list], [4, 4, 4]
+        )
+        self.assertEqual(results, [self.predictor.predict_single(n) for n in names])
+
+    async def test_settings_are_batched_separately(self):
+        """Test that requests with different top_n/use_dict are not mixed."""
+        async_predictor = AsyncFirstnameToNationality(self.predictor, max_wait=0.01)
+
+        top_one, top_two, no_dict = await asyncio.gather(
+            async_predictor.predict("Maria"),
+            async_predictor.predict("Maria", top_n=2),
+            async_predictor.predict("Maria", use_dict=False),
+        )
+
+        self.assertEqual(top_one, [("Spanish", 1.0)])
+        self.assertEqual(top_two, [("Spanish", 1.0), ("Italian", 1.0)])
+        self.assertEqual(
+            no_dict, self.predictor.predict_single("Maria", use_dict=False)
+        )
+
+    async def test_errors_reach_every_request(self):
+        """Test that a failed batch raises in each waiting coroutine."""
+        async_predictor = AsyncFirstnameToNationality(self.predictor, max_wait=0.01)
+
+        with patch.object(
+            async_predictor, "_predict_batch", side_effect=RuntimeError("boom")
+        ):
+            results = await asyncio.gather(
+                *map(async_predictor.predict, self.names), return_exceptions=True
+            )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    async def test_cancelled_request_is_skipped(self):
+        """Test that cancelling one request leaves the others answered."""
+        async_predictor = AsyncFirstnameToNationality(self.predictor, max_wait=0.01)
+
+        cancelled = asyncio.ensure_future(async_predictor.predict("Zed"))
+        kept = asyncio.ensure_future(async_predictor.predict("John"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        self.assertEqual(await kept, self.predictor.predict_single("John"))
+        self.assertTrue(cancelled.cancelled())
+
+    async def test_aclose_answers_waiting_requests(self):
+        """Test that leaving the context flushes requests still waiting."""
+        async with AsyncFirstnameToNationality(
+            self.predictor, max_wait=60
+        ) as async_predictor:
+            pending = asyncio.ensure_future(async_predictor.predict("Marco"))
+            await asyncio.sleep(0)
+
+        self.assertTrue(pending.done())
+        self.assertEqual(pending.result(), self.predictor.predict_single("Marco"))
+
+    async def test_predict_batch(self):
+        """Test scoring a list of names in the executor."""
+        async_predictor = AsyncFirstnameToNationality(self.predictor)
+
+        results = await async_predictor.predict_batch(self.names, top_n=2)
+
+        self.assertEqual(
+            results, [self.predictor.predict_single(name, 2) for name in self.names]
+        )
+
+    async def test_country_predictions(self):
+        """Test that the country counterpart matches predict_single."""
+        async_predictor = AsyncFirstnameToCountry(self.country_predictor, max_wait=0.01)
+        await async_predictor.warmup()
+
+        results = await asyncio.gather(
+            *(async_predictor.predict(name, top_n=2) for name in self.names)
+        )
+
+        self.assertEqual(
+            results,
+            [self.country_predictor.predict_single(name, 2) for name in self.names],
+        )
+
+    async def test_created_predictor_loads_lazily(self):
+        """Test that a predictor built from arguments loads in the executor."""
+        async_predictor = AsyncFirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        nationality_predictor = async_predictor.predictor.nationality_predictor
+        self.assertFalse(nationality_predictor._model_loaded)
+        self.assertFalse(async_predictor.predictor._country_mapping_loaded)
+
+        with patch("builtins.print"):
+            await async_predictor.warmup()
+
+        self.assertTrue(nationality_predictor._model_loaded)
+        self.assertTrue(async_predictor.predictor._country_mapping_loaded)
+
+    def test_invalid_settings(self):
+        """Test that invalid batching settings are rejected."""
+        with self.assertRaises(ValueError):
+            AsyncFirstnameToNationality(self.predictor, max_batch_size=0)
+        with self.assertRaises(ValueError):
+            AsyncFirstnameToNationality(self.predictor, max_wait=-1)
+
+    def test_batch_method_is_abstract(self):
+        """Test that the coalescing base class cannot be used on its own."""
+        with self.assertRaises(TypeError):
+            _CoalescingPredictor(self.predictor, 256, 0.002, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+"""
+Unit tests for the bulk scoring command line interface.
+"""
+
+import unittest
+import tempfile
+import io
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+import pandas as pd
+
+from firstname_to_nationality import FirstnameToCountry, FirstnameToNationality
+from firstname_to_nationality.cli import main
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class TestScoreCommand(unittest.TestCase):
+    """Tests for ``python -m firstname_to_nationality score``."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+        self.input_path = Path(self.temp_dir) / "names.csv"
+
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        predictor.train(
+            ["John", "William", "Giuseppe", "Marco"] * 5,
+            ["American", "American", "Italian", "Italian"] * 5,
+            save_model=True,
+        )
+        predictor.save_dictionary({"maria": ["Spanish"]})
+
+        self.names = ["John", "Giuseppe", "Maria", "", "john", "Zed", "Marco"]
+        pd.DataFrame({"id": range(len(self.names)), "first_name": self.names}).to_csv(
+            self.input_path, index=False
+        )
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def run_score(self, output_path, *extra):
+        """Run the score command quietly and return its exit code."""
+        argv = [
+            "score",
+            str(self.input_path),
+            str(output_path),
+            "--column",
+            "first_name",
+            "--model-path",
+            str(self.model_path),
+            "--dictionary-path",
+            str(self.dict_path),
+            *extra,
+        ]
+        with redirect_stdout(io.StringIO()) as stdout:
+            exit_code = main(argv)
+        self.summary = stdout.getvalue()
+        return exit_code
+
+    def read_csv_output(self, output_path):
+        """Read a scored CSV with empty cells as missing values."""
+        return pd.read_csv(
+            output_path,
+            keep_default_na=False,
+            na_values=[""],
+            float_precision="round_trip",
+        )
+
+    def expected_frame(self, top_n, country=False):
+        """Predictions of the in-memory API, as a DataFrame."""
+        if country:
+            predictor = FirstnameToCountry(str(self.model_path), str(self.dict_path))
+            encoded = predictor.predict_columnar(self.names, top_n=top_n)
+        else:
+            predictor = FirstnameToNationality(
+                str(self.model_path), str(self.dict_path)
+            )
+            encoded = predictor.predict_encoded(self.names, top_n=top_n)
+        return encoded.to_pandas()
+
+    def assert_matches_api(self, frame, top_n, country=False):
+        """Compare scored output with the in-memory predictions."""
+
+        def values(column):
+            return [None if pd.isna(value) else value for value in column]
+
+        expected = self.expected_frame(top_n, country)
+        self.assertEqual(values(frame["name"].fillna("")), self.names)
+        for column in expected.columns.drop("name"):
+            self.assertEqual(values(frame[column]), values(expected[column]))
+
+    def test_score_csv_in_chunks(self):
+        """Test that chunked CSV scoring matches one in-memory batch."""
+        output_path = Path(self.temp_dir) / "scored.csv"
+
+        exit_code = self.run_score(output_path, "--top-n", "2", "--batch-size", "3")
+
+        self.assertEqual(exit_code, 0)
+        self.assertIn("Scored 7 names", self.summary)
+        self.assert_matches_api(self.read_csv_output(output_path), 2)
+
+    def test_score_with_country_codes(self):
+        """Test that --country adds country code columns."""
+        output_path = Path(self.temp_dir) / "scored.csv"
+
+        exit_code = self.run_score(output_path, "--country", "--batch-size", "4")
+
+        self.assertEqual(exit_code, 0)
+        frame = self.read_csv_output(output_path)
+        self.assertEqual(frame["country_code_1"][0], "US")
+        self.assert_matches_api(frame, 1, country=True)
+
+    def test_no_dict(self):
+        """Test that --no-dict scores dictionary names with the model."""
+        output_path = Path(self.temp_dir) / "scored.csv"
+
+        self.run_score(output_path, "--no-dict")
+
+        frame = pd.read_csv(output_path, keep_default_na=False)
+        self.assertIn(frame["nationality_1"][2], ["American", "Italian"])
+
+    def test_workers_preserve_order(self):
+        """Test that multi-process scoring writes chunks in input order."""
+        output_path = Path(self.temp_dir) / "scored.csv"
+
+        exit_code = self.run_score(
+            output_path, "--workers", "2", "--batch-size", "2", "--top-n", "2"
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assert_matches_api(self.read_csv_output(output_path), 2)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_score_parquet(self):
+        """Test Parquet input and output with a fixed schema across chunks."""
+        parquet_input = Path(self.temp_dir) / "names.parquet"
+        pd.read_csv(self.input_path, keep_default_na=False, dtype=str).to_parquet(
+            parquet_input
+        )
+        self.input_path = parquet_input
+        output_path = Path(self.temp_dir) / "scored.parquet"
+
+        exit_code = self.run_score(output_path, "--top-n", "3", "--batch-size", "2")
+
+        self.assertEqual(exit_code, 0)
+        self.assert_matches_api(pd.read_parquet(output_path), 3)
+
+    def test_empty_input_writes_header(self):
+        """Test that an input without rows still produces a header."""
+        pd.DataFrame({"first_name": []}).to_csv(self.input_path, index=False)
+        output_path = Path(self.temp_dir) / "scored.csv"
+
+        exit_code = self.run_score(output_path)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            list(pd.read_csv(output_path).columns),
+            ["name", "nationality_1", "confidence_1"],
+        )
+
+    def test_missing_column(self):
+        """Test that an unknown name column is reported as a failure."""
+        output_path = Path(self.temp_dir) / "scored.csv"
+
+        exit_code = self.run_score(output_path, "--column", "surname")
+
+        self.assertEqual(exit_code, 1)
+        self.assertIn("Scoring failed", self.summary)
+
+    def test_invalid_batch_size(self):
+        """Test that a non-positive batch size is rejected by the parser."""
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as context:
+            main(["score", "in.csv", "out.csv", "--batch-size", "0"])
+
+        self.assertEqual(context.exception.code, 2)
+
+    def test_model_path_without_dictionary_path(self):
+        """Test that --model-path alone is used with the default dictionary."""
+        output_path = Path(self.temp_dir) / "scored.csv"
+        argv = ["score", str(self.input_path), str(output_path), "--column"]
+        argv += ["first_name", "--model-path", str(self.model_path), "--no-dict"]
+
+        with redirect_stdout(io.StringIO()):
+            exit_code = main(argv)
+
+        self.assertEqual(exit_code, 0)
+        frame = self.read_csv_output(output_path)
+        self.assertEqual(set(frame["nationality_1"].dropna()), {"American", "Italian"})
+
+    def test_missing_model_fails(self):
+        """Test that scoring without a trained model exits non-zero."""
+        output_path = Path(self.temp_dir) / "scored.csv"
+        missing_model = Path(self.temp_dir) / "missing.pt"
+
+        for extra in ([], ["--country"]):
+            with self.subTest(extra=extra):
+                argv = ["score", str(self.input_path), str(output_path)]
+                argv += ["--model-path", str(missing_model), *extra]
+                with redirect_stdout(io.StringIO()) as stdout:
+                    exit_code = main(argv)
+
+                self.assertEqual(exit_code, 1)
+                self.assertIn("No trained model", stdout.getvalue())
+                self.assertFalse(output_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,287 @@
+"""
+Unit tests for the CompiledModel inference engine.
+"""
+
+import os
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+from firstname_to_nationality import CompiledModel, FirstnameToNationality
+
+
+class TestCompiledModelExport(unittest.TestCase):
+    """Tests for exporting a trained pipeline to a compiled engine."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        self.predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        self.test_names = [
+            "John",
+            "Giuseppe Rossi",
+            "Hiroshi",
+            "Jean-Paul",
+            "Zoë",
+            "X",
+            "",
+            "Unseen Qwzx",
+        ]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def _processed(self, names):
+        return [self.predictor.preprocessor.preprocess_name(name) for name in names]
+
+    def test_multiclass_probabilities_match_pipeline(self):
+        """Test that a multi-class engine reproduces the pipeline probabilities."""
+        names = ["John", "William"] * 3 + ["Giuseppe", "Marco"] * 3
+        names += ["Hiroshi", "Kenji"] * 3
+        nationalities = ["American"] * 6 + ["Italian"] * 6 + ["Japanese"] * 6
+        self.predictor.train(names, nationalities, save_model=False)
+
+        compiled = self.predictor.export_compiled()
+        processed = self._processed(self.test_names)
+
+        np.testing.assert_allclose(
+            compiled.predict_proba(processed),
+            self.predictor.model.predict_proba(processed),
+            rtol=1e-10,
+            atol=1e-12,
+        )
+        self.assertEqual(
+            list(compiled.class_names), ["American", "Italian", "Japanese"]
+        )
+
+    def test_binary_probabilities_match_pipeline(self):
+        """Test that a binary engine reproduces the pipeline probabilities."""
+        names = ["John", "William"] * 3 + ["Giuseppe", "Marco"] * 3
+        nationalities = ["American"] * 6 + ["Italian"] * 6
+        self.predictor.train(names, nationalities, save_model=False)
+
+        compiled = self.predictor.export_compiled()
+        processed = self._processed(self.test_names)
+
+        np.testing.assert_allclose(
+            compiled.predict_proba(processed),
+            self.predictor.model.predict_proba(processed),
+            rtol=1e-10,
+            atol=1e-12,
+        )
+
+    def test_compiled_model_as_predictor_model(self):
+        """Test that a predictor gives the same results with the compiled engine."""
+        names = ["John", "William"] * 3 + ["Giuseppe", "Marco"] * 3
+        names += ["Hiroshi", "Kenji"] * 3
+        nationalities = ["American"] * 6 + ["Italian"] * 6 + ["Japanese"] * 6
+        self.predictor.train(names, nationalities, save_model=False)
+        expected = self.predictor(self.test_names, top_n=2, use_dict=False)
+
+        self.predictor.model = self.predictor.export_compiled()
+        results = self.predictor(self.test_names, top_n=2, use_dict=False)
+
+        for (name, predictions), (_, expected_predictions) in zip(results, expected):
+            self.assertEqual(
+                [nat for nat, _ in predictions],
+                [nat for nat, _ in expected_predictions],
+            )
+            np.testing.assert_allclose(
+                [conf for _, conf in predictions],
+                [conf for _, conf in expected_predictions],
+            )
+
+    def test_train_replaces_compiled_model(self):
+        """Test that training after switching to a compiled engine still works."""
+        names = ["John", "Giuseppe"] * 5
+        nationalities = ["American", "Italian"] * 5
+        self.predictor.train(names, nationalities, save_model=False)
+        self.predictor.model = self.predictor.export_compiled()
+
+        self.predictor.train(names, nationalities, save_model=False)
+
+        self.assertTrue(hasattr(self.predictor.model, "fit"))
+
+    def test_export_unfitted_model(self):
+        """Test that exporting an untrained model fails."""
+        with self.assertRaises(ValueError):
+            self.predictor.export_compiled()
+
+    def test_export_rejects_word_analyzer(self):
+        """Test that non char-level vectorizers are rejected."""
+        names = ["John", "Giuseppe"] * 5
+        nationalities = ["American", "Italian"] * 5
+        self.predictor.train(names, nationalities, save_model=False)
+        self.predictor.model.steps[0][1].analyzer = "word"
+
+        with self.assertRaises(ValueError):
+            CompiledModel.from_pipeline(
+                self.predictor.model, self.predictor.label_encoder
+            )
+
+
+class TestCompiledModelPersistence(unittest.TestCase):
+    """Tests for the memory-mappable compiled model format."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+        self.compiled_path = Path(self.temp_dir) / "test_model.f2n"
+
+        self.predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        names = ["John", "William"] * 3 + ["Giuseppe", "Marco"] * 3
+        names += ["Hiroshi", "Kenji"] * 3
+        nationalities = ["American"] * 6 + ["Italian"] * 6 + ["Japanese"] * 6
+        self.predictor.train(names, nationalities, save_model=False)
+        self.processed = [
+            self.predictor.preprocessor.preprocess_name(name)
+            for name in ["John", "Giuseppe", "Kenji", "Unseen"]
+        ]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_and_load_roundtrip(self):
+        """Test that a saved engine loads back with identical arrays."""
+        compiled = self.predictor.export_compiled()
+        compiled.save(self.compiled_path)
+
+        for mmap in (True, False):
+            loaded = CompiledModel.load(self.compiled_path, mmap=mmap)
+
+            np.testing.assert_array_equal(loaded.vocabulary, compiled.vocabulary)
+            np.testing.assert_array_equal(loaded.weights, compiled.weights)
+            np.testing.assert_array_equal(loaded.class_names, compiled.class_names)
+            self.assertEqual(loaded.ngram_range, compiled.ngram_range)
+            self.assertEqual(loaded.link, compiled.link)
+            np.testing.assert_array_equal(
+                loaded.predict_proba(self.processed),
+                compiled.predict_proba(self.processed),
+            )
+
+    def test_load_is_memory_mapped(self):
+        """Test that loaded arrays are read-only views of a file mapping."""
+        self.predictor.export_compiled().save(self.compiled_path)
+
+        loaded = CompiledModel.load(self.compiled_path)
+
+        self.assertIsInstance(loaded.weights.base, np.memmap)
+        self.assertFalse(loaded.weights.flags.writeable)
+
+    def test_predictor_loads_compiled_model(self):
+        """Test that a predictor pointed at a compiled file uses it directly."""
+        expected = self.predictor(["John", "Kenji"], top_n=2, use_dict=False)
+        self.predictor.save_compiled(str(self.compiled_path))
+
+        predictor = FirstnameToNationality(
+            model_path=str(self.compiled_path), dictionary_path=str(self.dict_path)
+        )
+
+        self.assertIsInstance(predictor.model, CompiledModel)
+        results = predictor(["John", "Kenji"], top_n=2, use_dict=False)
+        for (_, predictions), (_, expected_predictions) in zip(results, expected):
+            self.assertEqual(
+                [nat for nat, _ in predictions],
+                [nat for nat, _ in expected_predictions],
+            )
+
+    def test_save_compiled_default_path(self):
+        """Test that save_compiled defaults to the model path with a .f2n suffix."""
+        path = self.predictor.save_compiled()
+
+        self.assertEqual(path, self.model_path.with_suffix(".f2n"))
+        self.assertTrue(CompiledModel.is_compiled_model_file(path))
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions only")
+    def test_saved_files_follow_umask(self):
+        """Test that atomically saved files get the usual file permissions."""
+        umask = os.umask(0)
+        os.umask(umask)
+
+        self.predictor.save_model()
+        self.predictor.save_compiled(str(self.compiled_path))
+
+        for path in (self.model_path, self.compiled_path):
+            self.assertEqual(path.stat().st_mode & 0o777, 0o666 & ~umask)
+
+        self.compiled_path.chmod(0o640)
+        self.predictor.save_compiled(str(self.compiled_path))
+        self.assertEqual(self.compiled_path.stat().st_mode & 0o777, 0o640)
+
+    def windows_replace(self, compiled):
+        """os.replace that, like Windows, refuses to replace a mapped file."""
+        real_replace = os.replace
+
+        def replace(source, target):
+            if isinstance(compiled.weights.base, np.memmap):
+                raise PermissionError("file is mapped")
+            real_replace(source, target)
+
+        return patch(
+            "firstname_to_nationality.atomic_file.os.replace", side_effect=replace
+        )
+
+    def test_resave_over_mapped_file(self):
+        """Test saving an engine over the file it is mapped from."""
+        self.predictor.save_compiled(str(self.compiled_path))
+        compiled = CompiledModel.load(self.compiled_path)
+        expected = compiled.predict_proba(self.processed)
+
+        with self.windows_replace(compiled):
+            compiled.save(self.compiled_path)
+
+        self.assertNotIsInstance(compiled.weights.base, np.memmap)
+        np.testing.assert_array_equal(compiled.predict_proba(self.processed), expected)
+        np.testing.assert_array_equal(
+            CompiledModel.load(self.compiled_path).predict_proba(self.processed),
+            expected,
+        )
+        self.assertEqual(list(Path(self.temp_dir).glob("*.tmp")), [])
+
+    def test_save_model_over_mapped_file(self):
+        """Test that save_model releases a compiled model mapped from its path."""
+        self.predictor.save_compiled(str(self.compiled_path))
+        predictor = FirstnameToNationality(
+            model_path=str(self.compiled_path), dictionary_path=str(self.dict_path)
+        )
+        compiled = predictor.model
+        expected = predictor(["John", "Kenji"], top_n=2, use_dict=False)
+
+        with self.windows_replace(compiled):
+            predictor.save_model()
+
+        self.assertNotIsInstance(compiled.weights.base, np.memmap)
+        self.assertFalse(CompiledModel.is_compiled_model_file(self.compiled_path))
+        self.assertEqual(
+            predictor(["John", "Kenji"], top_n=2, use_dict=False), expected
+        )
+
+    def test_load_rejects_other_files(self):
+        """Test that loading a non-compiled file fails."""
+        self.predictor.save_model()
+
+        self.assertFalse(CompiledModel.is_compiled_model_file(self.model_path))
+        with self.assertRaises(ValueError):
+            CompiledModel.load(self.model_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,24 @@ import csv
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from firstname_to_nationality import FirstnameToCountry
+import numpy as np
+
+from firstname_to_nationality import EncodedPredictions, FirstnameToCountry
+
+
+def make_encoded(names, predictions):
+    """Build EncodedPredictions from per-name (nationality, confidence) lists."""
+    labels = []
+    width = max([len(row) for row in predictions] + [0])
+    indices = np.full((len(names), width), -1)
+    confidences = np.zeros((len(names), width))
+    for row, row_predictions in enumerate(predictions):
+        for column, (nationality, confidence) in enumerate(row_predictions):
+            if nationality not in labels:
+                labels.append(nationality)
+            indices[row, column] = labels.index(nationality)
+            confidences[row, column] = confidence
+    return EncodedPredictions(names, labels, indices, confidences)
 
 
 class TestFirstnameToCountryInitialization(unittest.TestCase):
@@ -65,6 +82,26 @@ class TestFirstnameToCountryInitialization(unittest.TestCase):
 
         self.assertIsNotNone(predictor.nationality_predictor)
 
+    def test_lazy_initialization_defers_csv_loading(self):
+        """Test that lazy mode parses the CSV only when the mapping is used."""
+        with patch.object(FirstnameToCountry, "_load_country_mapping") as load_mapping:
+            predictor = FirstnameToCountry(
+                country_csv_path=str(self.csv_path), lazy=True
+            )
+            load_mapping.assert_not_called()
+
+        self.assertEqual(predictor.nationality_to_country["italian"]["alpha2"], "IT")
+
+    def test_warmup_loads_country_mapping(self):
+        """Test that warmup loads the country mapping and nationality predictor."""
+        predictor = FirstnameToCountry(country_csv_path=str(self.csv_path), lazy=True)
+
+        predictor.warmup()
+
+        self.assertTrue(predictor._country_mapping_loaded)
+        self.assertTrue(predictor.nationality_predictor._model_loaded)
+        self.assertTrue(predictor.nationality_predictor._dictionary_loaded)
+
 
 class TestCountryMappingLoading(unittest.TestCase):
     """Tests for loading country mapping from CSV."""
@@ -217,6 +254,107 @@ class TestNationalityToCountryMapping(unittest.TestCase):
         self.assertEqual(result["alpha2"], "IT")
 
 
+class TestNationalityResolutionTable(unittest.TestCase):
+    """Tests for the per-class nationality-to-country resolution table."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+            ["Argentina", "AR", "ARG", "Argentine / Argentinean"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        names = ["John", "Giuseppe", "Diego", "Hans"] * 5
+        nationalities = ["American", "Italian", "Argentinean", "Martian"] * 5
+        self.predictor.nationality_predictor.train(names, nationalities, False)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_table_follows_class_order(self):
+        """Test that every class is resolved with the same rules as a scan."""
+        table = self.predictor._class_country_table()
+        classes = self.predictor.nationality_predictor.label_encoder.classes_
+
+        self.assertEqual(len(table), len(classes))
+        for label, country_info in zip(classes, table):
+            self.assertEqual(
+                country_info,
+                FirstnameToCountry._match_nationality(
+                    self.predictor.nationality_to_country, label
+                ),
+            )
+        self.assertEqual(table[list(classes).index("Argentinean")]["alpha2"], "AR")
+        self.assertIsNone(table[list(classes).index("Martian")])
+
+    def test_partial_matches_unchanged(self):
+        """Test that cached lookups give the same results as the partial rules."""
+        for nationality in ["Argentinean", "argentine", "Italian-American", "Ital", ""]:
+            expected = FirstnameToCountry._match_nationality(
+                self.predictor.nationality_to_country, nationality
+            )
+            self.assertEqual(
+                self.predictor._map_nationality_to_country(nationality), expected
+            )
+            self.assertEqual(
+                self.predictor._map_nationality_to_country(nationality), expected
+            )
+
+    def test_table_rebuilt_on_model_change(self):
+        """Test that retraining with new classes rebuilds the table."""
+        self.predictor._class_country_table()
+
+        self.predictor.nationality_predictor.train(
+            ["John", "Giuseppe"] * 5, ["American", "Italian"] * 5, False
+        )
+        table = self.predictor._class_country_table()
+
+        self.assertEqual([info["alpha2"] for info in table], ["US", "IT"])
+
+    def test_table_rebuilt_on_mapping_change(self):
+        """Test that replacing the country mapping invalidates resolved labels."""
+        self.predictor._class_country_table()
+        self.assertIsNotNone(self.predictor._map_nationality_to_country("American"))
+
+        self.predictor.nationality_to_country = {
+            "martian": {"country_name": "Mars", "alpha2": "MA", "alpha3": "MAR"}
+        }
+
+        self.assertIsNone(self.predictor._map_nationality_to_country("American"))
+        table = self.predictor._class_country_table()
+        self.assertEqual([info and info["alpha2"] for info in table].count("MA"), 1)
+
+    def test_mapping_is_read_only(self):
+        """Test that the mapping can only be changed by replacing it."""
+        self.assertIsNotNone(self.predictor._map_nationality_to_country("American"))
+
+        with self.assertRaises(TypeError):
+            self.predictor.nationality_to_country["american"] = None
+
+        mapping = dict(self.predictor.nationality_to_country)
+        self.predictor.nationality_to_country = mapping
+        del mapping["american"]
+        self.assertIsNotNone(self.predictor._map_nationality_to_country("American"))
+
+
 class TestCountryPredictionSingle(unittest.TestCase):
     """Tests for single name country prediction."""
 
@@ -324,11 +462,10 @@ class TestCountryPredictionBatch(unittest.TestCase):
     def test_predict_batch_aggregated(self, mock_nationality_class):
         """Test batch prediction with aggregation."""
         mock_predictor = MagicMock()
-        mock_predictor.predict_single.side_effect = [
-            [("American", 0.9)],
-            [("American", 0.85)],
-            [("Italian", 0.95)],
-        ]
+        mock_predictor.predict_encoded.return_value = make_encoded(
+            ["John", "William", "Giuseppe"],
+            [[("American", 0.9)], [("American", 0.85)], [("Italian", 0.95)]],
+        )
         mock_nationality_class.return_value = mock_predictor
 
         predictor = FirstnameToCountry(country_csv_path=str(self.csv_path))
@@ -352,9 +489,9 @@ class TestCountryPredictionBatch(unittest.TestCase):
     def test_predict_batch_non_aggregated(self, mock_nationality_class):
         """Test batch prediction without aggregation."""
         mock_predictor = MagicMock()
-        mock_predictor.predict_single.side_effect = [
-            [("American", 0.9)],
-            [("Italian", 0.95)],
+        mock_predictor.return_value = [
+            ("john", [("American", 0.9)]),
+            ("giuseppe", [("Italian", 0.95)]),
         ]
         mock_nationality_class.return_value = mock_predictor
 
@@ -368,6 +505,29 @@ class TestCountryPredictionBatch(unittest.TestCase):
         self.assertEqual(results[0]["name"], "John")
         self.assertEqual(results[1]["name"], "Giuseppe")
 
+    @patch("firstname_to_nationality.firstname_to_country.FirstnameToNationality")
+    def test_predict_batch_maps_distinct_names_once(self, mock_nationality_class):
+        """Test that repeated names are predicted once and copied per row."""
+        mock_predictor = MagicMock()
+        mock_predictor.return_value = [
+            ("john", [("American", 0.9)]),
+            ("giuseppe", [("Italian", 0.95)]),
+        ]
+        mock_nationality_class.return_value = mock_predictor
+
+        predictor = FirstnameToCountry(country_csv_path=str(self.csv_path))
+        predictor.nationality_predictor = mock_predictor
+        names = ["John", "Giuseppe", "john ", "JOHN"]
+
+        individual = predictor.predict_batch(names, aggregate=False)
+
+        mock_predictor.assert_called_with(
+            ["john", "giuseppe"], top_n=1, use_dict=True, n_jobs=None, n_threads=None
+        )
+        self.assertEqual([item["name"] for item in individual], names)
+        self.assertEqual(individual[3]["predictions"][0]["country_code"], "US")
+        self.assertIsNot(individual[0]["predictions"], individual[2]["predictions"])
+
     @patch("firstname_to_nationality.firstname_to_country.FirstnameToNationality")
     def test_predict_batch_empty_list(self, mock_nationality_class):
         """Test batch prediction with empty list."""
@@ -382,6 +542,367 @@ class TestCountryPredictionBatch(unittest.TestCase):
         self.assertEqual(results["total_names"], 0)
 
 
+class TestVectorizedAggregation(unittest.TestCase):
+    """Tests that aggregated batches match counting name by name."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+            ["Japan", "JP", "JPN", "Japanese"],
+            ["Spain", "ES", "ESP", "Spanish"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        nationality_predictor = self.predictor.nationality_predictor
+        nationality_predictor.train(
+            ["John", "William", "Giuseppe", "Marco", "Hiroshi", "Kenji"] * 4,
+            ["American", "American", "Italian", "Italian", "Japanese", "Japanese"] * 4,
+            save_model=False,
+        )
+        nationality_predictor.nationality_dictionary = {
+            "maria": ["Spanish", "Italian", "Portuguese"],
+            "hans": ["German"],
+        }
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def _reference_aggregate(self, names, top_n, use_dict):
+        """Aggregate the way predict_batch did before, one name at a time."""
+        counts = {}
+        countries = {}
+        for name in names:
+            for pred in self.predictor.predict_single(name, top_n, use_dict):
+                nationality = pred["nationality"]
+                counts[nationality] = counts.get(nationality, 0) + 1
+                if nationality not in countries and pred["country_code"]:
+                    countries[nationality] = (
+                        pred["country_code"],
+                        pred["country_name"],
+                        pred["alpha3"],
+                    )
+
+        nationalities = []
+        for nationality, count in sorted(
+            counts.items(), key=lambda item: item[1], reverse=True
+        ):
+            country_code, country_name, alpha3 = countries.get(
+                nationality, (None, None, None)
+            )
+            nationalities.append(
+                {
+                    "nationality": nationality,
+                    "count": count,
+                    "percentage": round(count / len(names) * 100, 2),
+                    "country_code": country_code,
+                    "country_name": country_name,
+                    "alpha3": alpha3,
+                }
+            )
+
+        return {"total_names": len(names), "nationalities": nationalities}
+
+    def test_matches_name_by_name_aggregation(self):
+        """Test counts, percentages, country fields and tie order."""
+        names = ["Maria", "Kenji", "John", "Hans", "maria", "Zed", "Giuseppe"] * 3
+        names += ["Hiroshi", "Unknownname"]
+
+        for top_n in (1, 2, 5):
+            for use_dict in (True, False):
+                self.assertEqual(
+                    self.predictor.predict_batch(names, top_n, use_dict),
+                    self._reference_aggregate(names, top_n, use_dict),
+                )
+
+    def test_does_not_build_per_name_results(self):
+        """Test that the aggregated path skips per-name prediction lists."""
+        names = ["John", "Kenji", "Maria"] * 10
+
+        with patch.object(
+            self.predictor, "_to_country_predictions"
+        ) as to_country_predictions:
+            result = self.predictor.predict_batch(names, aggregate=True)
+
+        to_country_predictions.assert_not_called()
+        self.assertEqual(sum(item["count"] for item in result["nationalities"]), 30)
+
+
+class TestCountryDistribution(unittest.TestCase):
+    """Tests for per-country probability distributions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["Argentina", "AR", "ARG", "Argentine / Argentinean"],
+            ["Italy", "IT", "ITA", "Italian"],
+            ["Japan", "JP", "JPN", "Japanese"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        self.predictor.nationality_predictor.train(
+            ["Diego", "Mateo", "Giuseppe", "Kenji", "Zorg"] * 4,
+            ["Argentine", "Argentinean", "Italian", "Japanese", "Martian"] * 4,
+            save_model=False,
+        )
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_demonyms_of_a_country_are_summed(self):
+        """Test that probabilities of all demonyms of a country are added up."""
+        names = ["Diego", "Kenji", "diego"]
+        probabilities = self.predictor.nationality_predictor.predict_proba(names)
+        classes = list(self.predictor.nationality_predictor.label_encoder.classes_)
+
+        results = self.predictor.predict_country_distribution(names, top_n=3)
+
+        self.assertEqual([item["name"] for item in results], names)
+        for row, item in zip(probabilities, results):
+            by_code = {
+                country["country_code"]: country["probability"]
+                for country in item["countries"]
+            }
+            self.assertAlmostEqual(
+                by_code["AR"],
+                row[classes.index("Argentine")] + row[classes.index("Argentinean")],
+            )
+            self.assertAlmostEqual(by_code["JP"], row[classes.index("Japanese")])
+            probabilities_desc = [c["probability"] for c in item["countries"]]
+            self.assertEqual(probabilities_desc, sorted(probabilities_desc)[::-1])
+        self.assertEqual(results[0]["countries"][0]["country_code"], "AR")
+        self.assertEqual(results[0]["countries"], results[2]["countries"])
+
+    def test_unresolved_classes_have_no_column(self):
+        """Test that classes without a country only lower the row total."""
+        matrix, countries = self.predictor._country_matrix()
+
+        self.assertEqual(matrix.shape, (5, 3))
+        self.assertEqual([c["alpha2"] for c in countries], ["AR", "IT", "JP"])
+
+        results = self.predictor.predict_country_distribution(["Zorg"], top_n=5)
+        self.assertEqual(len(results[0]["countries"]), 3)
+        self.assertLess(sum(c["probability"] for c in results[0]["countries"]), 1.0)
+
+    def test_matrix_rebuilt_on_model_change(self):
+        """Test that retraining rebuilds the class-by-country matrix."""
+        self.predictor._country_matrix()
+
+        self.predictor.nationality_predictor.train(
+            ["Giuseppe", "Kenji"] * 5, ["Italian", "Japanese"] * 5, False
+        )
+        matrix, countries = self.predictor._country_matrix()
+
+        self.assertEqual(matrix.shape, (2, 2))
+        self.assertEqual([c["alpha2"] for c in countries], ["IT", "JP"])
+
+    def test_requires_trained_model(self):
+        """Test that an untrained model is reported instead of guessed."""
+        predictor = FirstnameToCountry(
+            model_path=str(Path(self.temp_dir) / "missing.pt"),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+
+        with self.assertRaises(ValueError):
+            predictor.predict_country_distribution(["Diego"])
+
+    def test_invalid_top_n(self):
+        """Test that the country APIs reject a non-positive top_n."""
+        names = ["Diego", "Kenji"]
+        calls = {
+            "distribution": lambda top_n: self.predictor.predict_country_distribution(
+                names, top_n=top_n
+            ),
+            "aggregate": lambda top_n: self.predictor.predict_batch(names, top_n),
+            "empty_aggregate": lambda top_n: self.predictor.predict_batch([], top_n),
+            "per_name": lambda top_n: self.predictor.predict_batch(
+                names, top_n, aggregate=False
+            ),
+            "columnar": lambda top_n: self.predictor.predict_columnar(
+                names, top_n=top_n
+            ),
+            "single": lambda top_n: self.predictor.predict_single("Diego", top_n),
+            "aggregator": lambda top_n: self.predictor.aggregator(top_n),
+        }
+        for top_n in (0, -1):
+            for api, call in calls.items():
+                with self.subTest(api=api, top_n=top_n):
+                    with self.assertRaisesRegex(ValueError, "top_n"):
+                        call(top_n)
+
+
+class TestCountryColumnarOutput(unittest.TestCase):
+    """Tests for columnar per-name country predictions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        nationality_predictor = self.predictor.nationality_predictor
+        nationality_predictor.train(
+            ["John", "Giuseppe"] * 5, ["American", "Italian"] * 5, save_model=False
+        )
+        nationality_predictor.nationality_dictionary = {"zorg": ["Martian"]}
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_country_codes_match_per_name_results(self):
+        """Test that columnar country codes agree with the dict results."""
+        names = ["John", "Giuseppe", "Zorg", "john"]
+
+        encoded = self.predictor.predict_batch(names, 2, aggregate=False, columnar=True)
+        expected = self.predictor.predict_batch(names, 2, aggregate=False)
+
+        self.assertEqual(encoded.country_codes, ["US", "IT", None])
+        country_indices, countries = encoded.country_code_indices()
+        for row, item in enumerate(expected):
+            self.assertEqual(
+                [
+                    countries[index] if index >= 0 else None
+                    for index, code in zip(country_indices[row], encoded.indices[row])
+                    if code >= 0
+                ],
+                [pred["country_code"] for pred in item["predictions"]],
+            )
+
+    def test_to_pandas_country_columns(self):
+        """Test that the DataFrame carries categorical country code columns."""
+        encoded = self.predictor.predict_batch(
+            ["John", "Zorg"], aggregate=False, columnar=True
+        )
+
+        frame = encoded.to_pandas()
+
+        self.assertEqual(frame["country_code_1"][0], "US")
+        self.assertTrue(frame["country_code_1"].isna()[1])
+        self.assertEqual(frame["nationality_1"][1], "Martian")
+
+    def test_columnar_requires_individual_results(self):
+        """Test that columnar output cannot be combined with aggregation."""
+        with self.assertRaises(ValueError):
+            self.predictor.predict_batch(["John"], columnar=True)
+
+
+class TestCountryPredictIter(unittest.TestCase):
+    """Tests for streaming per-name country predictions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        self.predictor.nationality_predictor.train(
+            ["John", "Giuseppe"] * 5, ["American", "Italian"] * 5, save_model=False
+        )
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_predict_iter_matches_predict_batch(self):
+        """Test that streamed results equal the individual batch results."""
+        names = ["John", "Giuseppe", "john", "Zorg"] * 3
+
+        streamed = list(self.predictor.predict_iter(iter(names), 2, batch_size=5))
+
+        self.assertEqual(
+            streamed, self.predictor.predict_batch(names, 2, aggregate=False)
+        )
+
+    def test_predict_iter_is_lazy(self):
+        """Test that only one batch is pulled before the first result."""
+        pulled = []
+
+        def names():
+            for name in ["John", "Giuseppe"] * 10:
+                pulled.append(name)
+                yield name
+
+        first = next(self.predictor.predict_iter(names(), batch_size=3))
+
+        self.assertEqual(first["name"], "John")
+        self.assertEqual(first["predictions"][0]["country_code"], "US")
+        self.assertEqual(len(pulled), 3)
+
+    def test_predict_iter_invalid_batch_size(self):
+        """Test that a non-positive batch size is rejected."""
+        with self.assertRaises(ValueError):
+            next(self.predictor.predict_iter(["John"], batch_size=0))
+
+
 class TestCountryPredictionCallMethod(unittest.TestCase):
     """Tests for __call__ method."""
 
@@ -426,10 +947,9 @@ class TestCountryPredictionCallMethod(unittest.TestCase):
     def test_call_multiple_names_aggregated(self, mock_nationality_class):
         """Test __call__ with multiple names and aggregation."""
         mock_predictor = MagicMock()
-        mock_predictor.predict_single.side_effect = [
-            [("American", 0.9)],
-            [("Italian", 0.95)],
-        ]
+        mock_predictor.predict_encoded.return_value = make_encoded(
+            ["John", "Giuseppe"], [[("American", 0.9)], [("Italian", 0.95)]]
+        )
         mock_nationality_class.return_value = mock_predictor
 
         predictor = FirstnameToCountry(country_csv_path=str(self.csv_path))
@@ -444,9 +964,9 @@ class TestCountryPredictionCallMethod(unittest.TestCase):
     def test_call_multiple_names_non_aggregated(self, mock_nationality_class):
         """Test __call__ with multiple names without aggregation."""
         mock_predictor = MagicMock()
-        mock_predictor.predict_single.side_effect = [
-            [("American", 0.9)],
-            [("Italian", 0.95)],
+        mock_predictor.return_value = [
+            ("john", [("American", 0.9)]),
+            ("giuseppe", [("Italian", 0.95)]),
         ]
         mock_nationality_class.return_value = mock_predictor
 
@@ -0,0 +1,140 @@
+"""
+Unit tests for the streaming CountryAggregator.
+"""
+
+import unittest
+import tempfile
+import csv
+import pickle
+from pathlib import Path
+from unittest.mock import patch
+
+from firstname_to_nationality import CountryAggregator, FirstnameToCountry
+
+
+class TestCountryAggregator(unittest.TestCase):
+    """Tests for chunked and merged country aggregation."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+            ["Japan", "JP", "JPN", "Japanese"],
+            ["Spain", "ES", "ESP", "Spanish"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        nationality_predictor = self.predictor.nationality_predictor
+        nationality_predictor.train(
+            ["John", "William", "Giuseppe", "Marco", "Hiroshi", "Kenji"] * 4,
+            ["American", "American", "Italian", "Italian", "Japanese", "Japanese"] * 4,
+            save_model=False,
+        )
+        nationality_predictor.nationality_dictionary = {
+            "maria": ["Spanish", "Portuguese"],
+            "hans": ["German"],
+        }
+
+        self.names = ["Hans", "Kenji", "John", "Maria", "Giuseppe", "Zed"] * 5
+        self.names += ["Hiroshi", "hans", "Marco"]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_chunked_updates_match_predict_batch(self):
+        """Test that feeding chunks gives the one-shot aggregate."""
+        for top_n in (1, 2):
+            aggregator = self.predictor.aggregator(top_n=top_n)
+            for start in range(0, len(self.names), 4):
+                aggregator.update(self.names[start : start + 4])
+
+            self.assertEqual(
+                aggregator.report(), self.predictor.predict_batch(self.names, top_n)
+            )
+
+    def test_update_pulls_bounded_batches(self):
+        """Test that a generator is consumed batch_size names at a time."""
+        nationality_predictor = self.predictor.nationality_predictor
+
+        with patch.object(
+            nationality_predictor,
+            "predict_encoded",
+            wraps=nationality_predictor.predict_encoded,
+        ) as predict_encoded:
+            aggregator = self.predictor.aggregator()
+            aggregator.update((name for name in self.names), batch_size=10)
+
+        self.assertEqual(
+            [len(call.args[0]) for call in predict_encoded.call_args_list],
+            [10, 10, 10, 3],
+        )
+        self.assertEqual(aggregator.report(), self.predictor.predict_batch(self.names))
+
+    def test_merge_matches_predict_batch(self):
+        """Test that merged partial aggregates equal the whole-batch aggregate."""
+        first = self.predictor.aggregator(top_n=2).update(self.names[:7])
+        second = self.predictor.aggregator(top_n=2).update(self.names[7:20])
+        third = self.predictor.aggregator(top_n=2).update(self.names[20:])
+
+        merged = first.merge(second).merge(third)
+
+        self.assertEqual(merged.report(), self.predictor.predict_batch(self.names, 2))
+
+    def test_merge_across_processes(self):
+        """Test merging pickled aggregators with differently ordered labels."""
+        worker = self.predictor.aggregator().update(["Maria", "Hans", "Kenji"])
+        payload = pickle.dumps(worker)
+        received = pickle.loads(payload)
+
+        self.assertIsNone(received.predictor)
+        with self.assertRaises(ValueError):
+            received.report()
+
+        local = self.predictor.aggregator().update(["John", "Kenji"])
+        local.merge(received)
+
+        self.assertEqual(
+            local.report(),
+            self.predictor.predict_batch(["John", "Kenji", "Maria", "Hans", "Kenji"]),
+        )
+
+    def test_merge_into_empty_aggregator(self):
+        """Test that an aggregator without a predictor can collect merges."""
+        collector = CountryAggregator()
+        collector.merge(self.predictor.aggregator().update(self.names))
+        collector.predictor = self.predictor
+
+        self.assertEqual(collector.report(), self.predictor.predict_batch(self.names))
+
+    def test_merge_rejects_different_settings(self):
+        """Test that aggregators counting different top_n cannot be merged."""
+        with self.assertRaises(ValueError):
+            self.predictor.aggregator(top_n=1).merge(self.predictor.aggregator(top_n=2))
+
+    def test_empty_report(self):
+        """Test the report of an aggregator that has seen no names."""
+        self.assertEqual(
+            self.predictor.aggregator().update([]).report(),
+            {"total_names": 0, "nationalities": []},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
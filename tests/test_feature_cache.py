@@ -0,0 +1,239 @@
+"""
+Unit tests for the persistent feature cache.
+"""
+
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from firstname_to_nationality import FeatureCache, FirstnameToNationality
+
+
+class TestFeatureCache(unittest.TestCase):
+    """Tests for caching preprocessed corpora and feature matrices."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+        self.cache = FeatureCache(Path(self.temp_dir) / "cache")
+
+        self.predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        self.names = ["John", "William", "Giuseppe", "Marco", "Hiroshi", "Kenji"] * 4
+        self.nationalities = [
+            "American",
+            "American",
+            "Italian",
+            "Italian",
+            "Japanese",
+            "Japanese",
+        ] * 4
+        self.test_names = ["Johnny", "Marcello", "Hiro", "Zoë"]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def _train(self, names=None, nationalities=None):
+        self.predictor.train(
+            names or self.names,
+            nationalities or self.nationalities,
+            save_model=False,
+            feature_cache=self.cache,
+        )
+        return self.predictor.predict_proba(self.test_names)
+
+    def test_cached_training_matches_uncached(self):
+        """Test that training from cached features gives the same model."""
+        self.predictor.train(self.names, self.nationalities, save_model=False)
+        expected = self.predictor.predict_proba(self.test_names)
+
+        np.testing.assert_allclose(self._train(), expected)
+        np.testing.assert_allclose(self._train(), expected)
+
+    def test_cache_hit_skips_featurization(self):
+        """Test that a second run neither preprocesses nor fits the vectorizer."""
+        self._train()
+
+        with (
+            patch.object(
+                self.predictor.preprocessor,
+                "preprocess_many",
+                side_effect=AssertionError("preprocessed again"),
+            ),
+            patch.object(
+                FirstnameToNationality,
+                "_fit_vectorizer_weighted",
+                side_effect=AssertionError("vectorized again"),
+            ),
+        ):
+            self.predictor.train(
+                self.names,
+                self.nationalities,
+                save_model=False,
+                feature_cache=self.cache,
+            )
+
+        self.assertEqual(
+            self.predictor.predict_single("Marco", use_dict=False)[0][0], "Italian"
+        )
+
+    def test_classifier_settings_reuse_features(self):
+        """Test that changing only the classifier keeps the cached features."""
+        self._train()
+        self.predictor.model = Pipeline(
+            [
+                ("vectorizer", clone(self.predictor.model.named_steps["vectorizer"])),
+                ("classifier", LogisticRegression(C=0.5, max_iter=500)),
+            ]
+        )
+
+        with patch.object(
+            FirstnameToNationality,
+            "_fit_vectorizer_weighted",
+            side_effect=AssertionError("vectorized again"),
+        ):
+            self._train()
+
+        self.assertEqual(self.predictor.model.named_steps["classifier"].C, 0.5)
+
+    def test_changed_settings_or_data_miss(self):
+        """Test that new vectorizer settings or new data are featurized again."""
+        self._train()
+        self.predictor.model = Pipeline(
+            [
+                ("vectorizer", TfidfVectorizer(analyzer="char", ngram_range=(1, 2))),
+                ("classifier", LogisticRegression(max_iter=1000)),
+            ]
+        )
+
+        with patch.object(
+            FirstnameToNationality,
+            "_fit_vectorizer_weighted",
+            wraps=FirstnameToNationality._fit_vectorizer_weighted,
+        ) as fit_vectorizer:
+            self._train()
+            self._train(self.names + ["Luca"], self.nationalities + ["Italian"])
+
+        self.assertEqual(fit_vectorizer.call_count, 2)
+        self.assertEqual(
+            self.predictor.model.named_steps["vectorizer"].ngram_range, (1, 2)
+        )
+
+    def test_features_are_memory_mapped(self):
+        """Test that cached feature arrays are mapped rather than read."""
+        vectorizer = TfidfVectorizer(analyzer="char")
+        features = vectorizer.fit_transform(["j o h n", "m a r c o"])
+        self.cache.save_features("key", vectorizer, features)
+
+        loaded_vectorizer, loaded = self.cache.load_features("key")
+
+        for array in (loaded.data, loaded.indices, loaded.indptr):
+            while array.base is not None and not isinstance(array, np.memmap):
+                array = array.base
+            self.assertIsInstance(array, np.memmap)
+        np.testing.assert_array_equal(loaded.toarray(), features.toarray())
+        np.testing.assert_array_equal(loaded_vectorizer.idf_, vectorizer.idf_)
+
+    def test_corpus_round_trip(self):
+        """Test that cached corpora keep non-ASCII names, labels and counts."""
+        documents = ["z o ë", "j o s é ▁ l u i s", "", "h a n s"]
+        nationalities = ["Dutch", "Spanish", "Unknown", "German"]
+        self.cache.save_corpus("key", documents, nationalities, [3, 1, 1, 2])
+
+        loaded_documents, loaded_nationalities, weights = self.cache.load_corpus("key")
+
+        self.assertEqual(loaded_documents, documents)
+        self.assertEqual(loaded_nationalities, nationalities)
+        np.testing.assert_array_equal(weights, [3, 1, 1, 2])
+        self.assertIsNone(self.cache.load_corpus("missing"))
+
+    def test_keys_depend_on_content(self):
+        """Test that keys change with the data and vectorizer settings."""
+        settings = self.predictor._preprocessing_settings()
+        key = FeatureCache.corpus_key(["ab", "c"], ["X", "Y"], settings)
+
+        self.assertEqual(
+            key, FeatureCache.corpus_key(["ab", "c"], ["X", "Y"], settings)
+        )
+        self.assertNotEqual(
+            key, FeatureCache.corpus_key(["a", "bc"], ["X", "Y"], settings)
+        )
+        self.assertNotEqual(
+            key, FeatureCache.corpus_key(["ab", "c"], ["X", "Z"], settings)
+        )
+        self.assertNotEqual(
+            FeatureCache.features_key(key, TfidfVectorizer(max_features=10)),
+            FeatureCache.features_key(key, TfidfVectorizer(max_features=20)),
+        )
+
+    def test_old_entries_are_pruned(self):
+        """Test that only the most recently used entries are kept."""
+        cache = FeatureCache(Path(self.temp_dir) / "small", max_entries=2)
+        for index in range(4):
+            cache.save_corpus(f"key{index}", ["a"], ["X"], [1])
+
+        self.assertIsNone(cache.load_corpus("key0"))
+        self.assertIsNone(cache.load_corpus("key1"))
+        self.assertIsNotNone(cache.load_corpus("key3"))
+
+        cache.clear()
+        self.assertIsNone(cache.load_corpus("key3"))
+
+    def test_feature_entries_pruned_by_size(self):
+        """Test that feature entries are pruned by size, not by the corpus limit."""
+        cache = FeatureCache(Path(self.temp_dir) / "small", max_entries=1)
+        vectorizer = TfidfVectorizer().fit(["ab", "cd"])
+        features = vectorizer.transform(["ab", "cd"])
+        for index in range(4):
+            cache.save_features(f"key{index}", vectorizer, features)
+        cache.save_corpus("corpus", ["a"], ["X"], [1])
+
+        for index in range(4):
+            self.assertIsNotNone(cache.load_features(f"key{index}"))
+        self.assertIsNotNone(cache.load_corpus("corpus"))
+
+        entry_bytes = cache._entry_bytes(cache.directory / "features-key3")
+        cache.max_bytes = 2 * entry_bytes
+        cache.save_features("key4", vectorizer, features)
+
+        self.assertIsNotNone(cache.load_features("key4"))
+        self.assertIsNotNone(cache.load_features("key3"))
+        self.assertIsNone(cache.load_features("key0"))
+        self.assertIsNotNone(cache.load_corpus("corpus"))
+
+    def test_clear_keeps_other_files(self):
+        """Test that clear deletes cache entries only."""
+        directory = Path(self.temp_dir) / "shared"
+        cache = FeatureCache(directory)
+        cache.save_corpus("key", ["a"], ["X"], [1])
+        (directory / ".tmp-partial").mkdir()
+        (directory / "notes.txt").write_text("keep me")
+
+        cache.clear()
+
+        self.assertIsNone(cache.load_corpus("key"))
+        self.assertEqual([path.name for path in directory.iterdir()], ["notes.txt"])
+
+    def test_invalid_max_entries(self):
+        """Test that a cache without room for entries is rejected."""
+        with self.assertRaises(ValueError):
+            FeatureCache(self.temp_dir, max_entries=0)
+        with self.assertRaises(ValueError):
+            FeatureCache(self.temp_dir, max_bytes=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
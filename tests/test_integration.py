@@ -5,6 +5,9 @@ Integration tests for the complete workflow.
 import unittest
 import tempfile
 import csv
+import pickle
+import subprocess
+import sys
 from pathlib import Path
 
 from firstname_to_nationality import FirstnameToNationality, FirstnameToCountry
@@ -217,5 +220,66 @@ class TestDataConsistency(unittest.TestCase):
         )
 
 
+class TestImportFootprint(unittest.TestCase):
+    """Tests that heavy libraries are only imported on the paths that need them."""
+
+    HEAVY_MODULES = ("numpy", "scipy", "sklearn", "joblib", "asyncio")
+
+    def _loaded_heavy_modules(self, snippet):
+        code = (
+            f"{snippet}\n"
+            "import sys\n"
+            f"loaded = [m for m in {self.HEAVY_MODULES!r} if m in sys.modules]\n"
+            "print('LOADED:' + ','.join(loaded))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parent.parent,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        marker = result.stdout.rsplit("LOADED:", 1)[-1].strip()
+        return [module for module in marker.split(",") if module]
+
+    def test_package_import_is_light(self):
+        """Test that importing the package does not import heavy libraries."""
+        loaded = self._loaded_heavy_modules("import firstname_to_nationality")
+
+        self.assertEqual(loaded, [])
+
+    def test_lazy_dictionary_lookup_is_light(self):
+        """Test that a lazy dictionary-only lookup does not import heavy libraries."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dict_path = Path(temp_dir) / "dict.pkl"
+            with open(dict_path, "wb") as f:
+                pickle.dump({"john": ["American"]}, f)
+
+            loaded = self._loaded_heavy_modules(
+                "from firstname_to_nationality import FirstnameToNationality\n"
+                f"predictor = FirstnameToNationality(dictionary_path={str(dict_path)!r}, lazy=True)\n"
+                "assert predictor.predict_single('John') == [('American', 1.0)]"
+            )
+
+        self.assertEqual(loaded, [])
+
+    def test_dictionary_only_batch_is_light(self):
+        """Test that a batch answered by the dictionary does not import NumPy."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dict_path = Path(temp_dir) / "dict.pkl"
+            with open(dict_path, "wb") as f:
+                pickle.dump({"john": ["American"], "maria": ["Spanish"]}, f)
+
+            loaded = self._loaded_heavy_modules(
+                "from firstname_to_nationality import FirstnameToNationality\n"
+                f"predictor = FirstnameToNationality(dictionary_path={str(dict_path)!r}, lazy=True)\n"
+                "results = predictor(['John', 'maria', 'JOHN'], top_n=2)\n"
+                "assert results == [('John', [('American', 1.0)]), "
+                "('maria', [('Spanish', 1.0)]), ('JOHN', [('American', 1.0)])]"
+            )
+
+        self.assertEqual(loaded, [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,180 @@
+"""
+Unit tests for the compact name dictionary format.
+"""
+
+import os
+import unittest
+import tempfile
+import pickle
+from pathlib import Path
+from unittest.mock import patch
+
+from firstname_to_nationality import FirstnameToNationality
+from firstname_to_nationality.name_dictionary import (
+    NameDictionary,
+    is_name_dictionary_file,
+    load_name_dictionary,
+    write_name_dictionary,
+)
+
+
+class TestNameDictionary(unittest.TestCase):
+    """Tests for writing and reading compact name dictionaries."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+        self.name_dict = {
+            "maria": ["Spanish", "Italian", "Portuguese"],
+            "john": ["American", "British"],
+            "zoë": ["French"],
+            "李": ["Chinese"],
+            "anna": [],
+            "giuseppe": ["Italian"],
+        }
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_roundtrip(self):
+        """Test that every entry reads back unchanged."""
+        write_name_dictionary(self.dict_path, self.name_dict)
+
+        loaded = load_name_dictionary(self.dict_path)
+
+        self.assertIsInstance(loaded, NameDictionary)
+        self.assertEqual(len(loaded), len(self.name_dict))
+        self.assertEqual(dict(loaded), self.name_dict)
+        self.assertEqual(loaded, self.name_dict)
+
+    def test_preserves_insertion_order(self):
+        """Test that iteration follows the order the dictionary was built in."""
+        write_name_dictionary(self.dict_path, self.name_dict)
+
+        loaded = load_name_dictionary(self.dict_path)
+
+        self.assertEqual(list(loaded), list(self.name_dict))
+
+    def test_missing_names(self):
+        """Test lookups of names that are not stored."""
+        write_name_dictionary(self.dict_path, self.name_dict)
+        loaded = load_name_dictionary(self.dict_path)
+
+        for name in ["", "johnny", "joh", "zzz", "aaa"]:
+            self.assertNotIn(name, loaded)
+            self.assertIsNone(loaded.get(name))
+        self.assertNotIn(None, loaded)
+        with self.assertRaises(KeyError):
+            loaded["unknown"]
+
+    def test_lookups_return_fresh_lists(self):
+        """Test that mutating a returned list does not affect the store."""
+        write_name_dictionary(self.dict_path, self.name_dict)
+        loaded = load_name_dictionary(self.dict_path)
+
+        loaded["john"].append("Canadian")
+
+        self.assertEqual(loaded["john"], ["American", "British"])
+
+    def test_empty_dictionary(self):
+        """Test writing and reading an empty dictionary."""
+        write_name_dictionary(self.dict_path, {})
+
+        loaded = load_name_dictionary(self.dict_path)
+
+        self.assertEqual(len(loaded), 0)
+        self.assertNotIn("john", loaded)
+
+    def test_legacy_pickle_still_loads(self):
+        """Test that pickle dictionaries from older versions are still read."""
+        with open(self.dict_path, "wb") as f:
+            pickle.dump(self.name_dict, f)
+
+        self.assertFalse(is_name_dictionary_file(self.dict_path))
+        self.assertEqual(load_name_dictionary(self.dict_path), self.name_dict)
+
+    def test_pickling_reopens_mapping(self):
+        """Test that pickling a mapped dictionary only stores its path."""
+        write_name_dictionary(self.dict_path, self.name_dict)
+        loaded = load_name_dictionary(self.dict_path)
+
+        payload = pickle.dumps(loaded)
+        restored = pickle.loads(payload)
+
+        self.assertLess(len(payload), 200)
+        self.assertEqual(dict(restored), self.name_dict)
+
+    def test_predictor_saves_compact_dictionary(self):
+        """Test that save_dictionary writes the compact format used on load."""
+        predictor = FirstnameToNationality(
+            model_path=str(Path(self.temp_dir) / "test_model.pt"),
+            dictionary_path=str(self.dict_path),
+            lazy=True,
+        )
+        predictor.save_dictionary(self.name_dict)
+
+        self.assertTrue(is_name_dictionary_file(self.dict_path))
+
+        reloaded = FirstnameToNationality(
+            model_path=str(Path(self.temp_dir) / "test_model.pt"),
+            dictionary_path=str(self.dict_path),
+            lazy=True,
+        )
+        self.assertEqual(reloaded.predict_single("Maria", top_n=2)[0], ("Spanish", 1.0))
+        self.assertEqual(reloaded(["John", "Zoë"])[1][1], [("French", 1.0)])
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions only")
+    def test_written_file_follows_umask(self):
+        """Test that the dictionary is not left owner-only by the atomic write."""
+        umask = os.umask(0)
+        os.umask(umask)
+
+        write_name_dictionary(self.dict_path, self.name_dict)
+
+        self.assertEqual(self.dict_path.stat().st_mode & 0o777, 0o666 & ~umask)
+
+    def test_predictor_resaves_mapped_dictionary(self):
+        """Test save_dictionary over the file its loaded dictionary maps."""
+        write_name_dictionary(self.dict_path, self.name_dict)
+        predictor = FirstnameToNationality(
+            model_path=str(Path(self.temp_dir) / "test_model.pt"),
+            dictionary_path=str(self.dict_path),
+            lazy=True,
+        )
+        loaded = predictor.nationality_dictionary
+        self.assertIsInstance(loaded, NameDictionary)
+        real_replace = os.replace
+
+        def windows_replace(source, target):
+            # Windows refuses to replace a file that is still mapped
+            if not loaded._mmap.closed:
+                raise PermissionError("file is mapped")
+            real_replace(source, target)
+
+        for name_dict in ({"pierre": ["French"]}, None):
+            with self.subTest(name_dict=name_dict):
+                if name_dict is None:
+                    # Saving the mapped dictionary itself reopens the new file
+                    loaded = name_dict = load_name_dictionary(self.dict_path)
+                    predictor.nationality_dictionary = loaded
+                with patch(
+                    "firstname_to_nationality.atomic_file.os.replace",
+                    side_effect=windows_replace,
+                ):
+                    predictor.save_dictionary(name_dict)
+
+                self.assertTrue(loaded._mmap.closed)
+                self.assertEqual(
+                    dict(predictor.nationality_dictionary), {"pierre": ["French"]}
+                )
+                self.assertEqual(
+                    dict(load_name_dictionary(self.dict_path)), {"pierre": ["French"]}
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
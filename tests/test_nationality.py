@@ -6,8 +6,18 @@ import unittest
 import tempfile
 import pickle
 from pathlib import Path
+from unittest.mock import patch
 
-from firstname_to_nationality import FirstnameToNationality
+import numpy as np
+
+from firstname_to_nationality import EncodedPredictions, FirstnameToNationality
+
+try:
+    import pyarrow  # noqa: F401
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
 
 class TestFirstnameToNationalityInitialization(unittest.TestCase):
@@ -66,6 +76,51 @@ class TestFirstnameToNationalityInitialization(unittest.TestCase):
         # Should fall back to default model
         self.assertIsNotNone(predictor.model)
 
+    def test_lazy_initialization_defers_loading(self):
+        """Test that lazy mode loads nothing until a component is used."""
+        test_dict = {"john": ["American"]}
+        with open(self.dict_path, "wb") as f:
+            pickle.dump(test_dict, f)
+
+        with patch.object(
+            FirstnameToNationality,
+            "_load_model",
+            autospec=True,
+            side_effect=FirstnameToNationality._load_model,
+        ) as load_model:
+            predictor = FirstnameToNationality(
+                model_path=str(self.model_path),
+                dictionary_path=str(self.dict_path),
+                lazy=True,
+            )
+            results = predictor.predict_single("John")
+
+            self.assertEqual(results, [("American", 1.0)])
+            load_model.assert_not_called()
+
+            self.assertIsNotNone(predictor.model)
+            load_model.assert_called_once()
+
+    def test_warmup_loads_everything(self):
+        """Test that warmup loads the model and dictionary exactly once."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            lazy=True,
+        )
+
+        with patch.object(
+            predictor, "_load_model", wraps=predictor._load_model
+        ) as load_model, patch.object(
+            predictor, "_load_dictionary", wraps=predictor._load_dictionary
+        ) as load_dictionary:
+            predictor.warmup()
+            predictor.warmup()
+
+        load_model.assert_called_once()
+        load_dictionary.assert_called_once()
+        self.assertIsNotNone(predictor.label_encoder)
+
 
 class TestFirstnameToNationalityTraining(unittest.TestCase):
     """Tests for FirstnameToNationality training functionality."""
@@ -153,6 +208,288 @@ class TestFirstnameToNationalityTraining(unittest.TestCase):
         with self.assertRaises(ValueError):
             predictor.train(names, nationalities, save_model=False)
 
+    def test_train_deduplicates_pairs(self):
+        """Test that repeated pairs are fitted once with their count as weight."""
+        from sklearn.linear_model import LogisticRegression
+
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        names = ["John", "john ", "Giuseppe", "John", "Hiroshi"] * 4
+        nationalities = ["American", "American", "Italian", "British", "Japanese"] * 4
+
+        original_fit = LogisticRegression.fit
+        with patch.object(
+            LogisticRegression, "fit", autospec=True, side_effect=original_fit
+        ) as fit:
+            predictor.train(names, nationalities, save_model=False)
+
+        _, features, labels = fit.call_args.args
+        weights = fit.call_args.kwargs["sample_weight"]
+        self.assertEqual(features.shape[0], 4)
+        self.assertEqual(sorted(weights), [4, 4, 4, 8])
+        self.assertEqual(weights.sum(), len(names))
+
+    def test_deduplicated_training_matches_full_data(self):
+        """Test that weighted training gives the model of training on every row."""
+        names = ["John", "William", "Giuseppe", "Marco", "Hiroshi"] * 3
+        names += ["John"] * 10 + ["Marco"] * 5
+        nationalities = ["American", "American", "Italian", "Italian", "Japanese"] * 3
+        nationalities += ["American"] * 10 + ["Italian"] * 5
+
+        models = []
+        for deduplicate in (True, False):
+            predictor = FirstnameToNationality(
+                model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+            )
+            predictor.train(
+                names, nationalities, save_model=False, deduplicate=deduplicate
+            )
+            models.append(predictor)
+
+        deduplicated, full = models
+        np.testing.assert_allclose(
+            deduplicated.model.steps[0][1].idf_, full.model.steps[0][1].idf_
+        )
+        np.testing.assert_allclose(
+            deduplicated.predict_proba(names), full.predict_proba(names), atol=1e-3
+        )
+
+    def test_deduplicated_vocabulary_matches_full_data(self):
+        """Test that vocabulary pruning counts every row of a repeated pair."""
+        names = ["Ana"] * 20 + ["Carla"] * 15 + ["Bob", "Cab", "Abc"] * 5 + ["Ba"] * 5
+        nationalities = ["Spanish"] * 35 + ["American"] * 15 + ["Italian"] * 5
+        settings = [
+            {"vectorizer__max_features": 3},
+            {"vectorizer__max_features": None, "vectorizer__min_df": 10},
+            {"vectorizer__max_features": None, "vectorizer__max_df": 0.5},
+        ]
+
+        for params in settings:
+            vectorizers = []
+            for deduplicate in (True, False):
+                predictor = FirstnameToNationality(
+                    model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+                )
+                predictor.model.set_params(**params)
+                predictor.train(
+                    names, nationalities, save_model=False, deduplicate=deduplicate
+                )
+                vectorizers.append(predictor.model.named_steps["vectorizer"])
+
+            deduplicated, full = vectorizers
+            with self.subTest(params=params):
+                self.assertEqual(deduplicated.vocabulary_, full.vocabulary_)
+                np.testing.assert_allclose(deduplicated.idf_, full.idf_)
+                self.assertEqual(deduplicated.get_params(), full.get_params())
+
+    def test_train_streaming(self):
+        """Test out-of-core training from chunks and saving the result."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        names = ["John", "William", "Giuseppe", "Marco", "Hiroshi", "Takeshi"] * 4
+        nationalities = [
+            "American",
+            "American",
+            "Italian",
+            "Italian",
+            "Japanese",
+            "Japanese",
+        ] * 4
+        calls = []
+
+        def chunks():
+            calls.append(1)
+            return (
+                (names[i : i + 5], nationalities[i : i + 5]) for i in range(0, 24, 5)
+            )
+
+        n_samples = predictor.train_streaming(chunks, epochs=10, shuffle_buffer=8)
+
+        self.assertEqual(n_samples, 24)
+        # One pass to collect the labels plus one per epoch
+        self.assertEqual(len(calls), 11)
+        self.assertEqual(
+            list(predictor.label_encoder.classes_), ["American", "Italian", "Japanese"]
+        )
+        for name, nationality in zip(names[:6], nationalities[:6]):
+            self.assertEqual(
+                predictor.predict_single(name, use_dict=False)[0][0], nationality
+            )
+
+        reloaded = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        self.assertEqual(
+            reloaded(names, use_dict=False), predictor(names, use_dict=False)
+        )
+
+    def test_train_streaming_with_known_classes(self):
+        """Test that given classes skip the label pass and reject unknown labels."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        calls = []
+
+        def chunks():
+            calls.append(1)
+            yield ["John", "Giuseppe"], ["American", "Italian"]
+
+        predictor.train_streaming(
+            chunks, classes=["American", "Italian", "Spanish"], save_model=False
+        )
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(predictor.label_encoder.classes_), 3)
+
+        with self.assertRaises(ValueError):
+            predictor.train_streaming(chunks, classes=["American"], save_model=False)
+        with self.assertRaises(ValueError):
+            predictor.train_streaming(chunks, epochs=0, save_model=False)
+        with self.assertRaises(ValueError):
+            predictor.train_streaming(lambda: iter([]), save_model=False)
+
+
+class TestFirstnameToNationalityUpdate(unittest.TestCase):
+    """Tests for incremental model updates."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        self.predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        self.names = [
+            "John Smith",
+            "Michael Johnson",
+            "William Brown",
+            "Giuseppe Rossi",
+            "Marco Ferrari",
+            "Luigi Romano",
+            "Hiroshi Tanaka",
+            "Takeshi Yamamoto",
+            "Kenji Watanabe",
+        ] * 2
+        self.nationalities = ["American"] * 3 + ["Italian"] * 3 + ["Japanese"] * 3
+        self.nationalities *= 2
+        self.predictor.train(self.names, self.nationalities, save_model=True)
+
+        # A new nationality plus more examples of the known ones
+        self.new_names = [
+            "Pierre Dubois",
+            "Jean Martin",
+            "Francois Bernard",
+            "Steven Clark",
+            "Paolo Greco",
+            "Haruki Mori",
+        ] * 2
+        self.new_nationalities = ["French"] * 3 + ["American", "Italian", "Japanese"]
+        self.new_nationalities *= 2
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_update_adds_unseen_nationality(self):
+        """Test that new labels become classes and are predicted."""
+        previous_model = self.predictor.model
+
+        self.predictor.update(self.new_names, self.new_nationalities)
+
+        self.assertEqual(
+            list(self.predictor.label_encoder.classes_),
+            ["American", "French", "Italian", "Japanese"],
+        )
+        self.assertEqual(
+            self.predictor.predict_single("Pierre Dubois", use_dict=False)[0][0],
+            "French",
+        )
+        for name, nationality in zip(self.names, self.nationalities):
+            self.assertEqual(
+                self.predictor.predict_single(name, use_dict=False)[0][0], nationality
+            )
+        # The previous model is replaced, not modified
+        self.assertEqual(len(previous_model.classes_), 3)
+
+    def test_update_is_saved(self):
+        """Test that the updated model is written to the model path."""
+        self.predictor.update(self.new_names, self.new_nationalities)
+
+        reloaded = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        names = self.names + self.new_names
+        self.assertEqual(
+            reloaded(names, top_n=3, use_dict=False),
+            self.predictor(names, top_n=3, use_dict=False),
+        )
+        self.assertEqual(list(Path(self.temp_dir).glob("*.tmp")), [])
+
+    def test_update_starts_from_current_model(self):
+        """Test that a strong prior keeps the current predictions."""
+        before = self.predictor.predict_proba("Marco")
+
+        self.predictor.update(
+            self.new_names, self.new_nationalities, save_model=False, prior_strength=1e6
+        )
+
+        after = self.predictor.predict_proba("Marco")
+        # Old classes keep their relative probabilities next to the new class
+        old_columns = after[0, [0, 2, 3]]
+        np.testing.assert_allclose(
+            old_columns / old_columns.sum(), before[0], atol=1e-3
+        )
+
+    def test_update_compiles(self):
+        """Test that an updated model can still be compiled."""
+        self.predictor.update(self.new_names, self.new_nationalities, save_model=False)
+
+        compiled = self.predictor.export_compiled()
+
+        np.testing.assert_allclose(
+            compiled.predict_proba(["pierre"]),
+            self.predictor.model.predict_proba(["pierre"]),
+        )
+
+    def test_update_streaming_model(self):
+        """Test updating a model trained out of core."""
+        self.predictor.train_streaming(
+            lambda: iter([(self.names, self.nationalities)]),
+            epochs=10,
+            save_model=False,
+        )
+
+        self.predictor.update(self.new_names, self.new_nationalities, save_model=False)
+
+        self.assertEqual(len(self.predictor.label_encoder.classes_), 4)
+        self.assertEqual(
+            self.predictor.predict_single("Pierre Dubois", use_dict=False)[0][0],
+            "French",
+        )
+
+    def test_update_invalid_input(self):
+        """Test that invalid updates are rejected."""
+        with self.assertRaises(ValueError):
+            self.predictor.update(["John"], [], save_model=False)
+        with self.assertRaises(ValueError):
+            self.predictor.update([], [], save_model=False)
+        with self.assertRaises(ValueError):
+            self.predictor.update(
+                ["John"], ["American"], save_model=False, prior_strength=0
+            )
+
+        untrained = FirstnameToNationality(
+            model_path=str(Path(self.temp_dir) / "missing.pt"),
+            dictionary_path=str(self.dict_path),
+        )
+        with self.assertRaises(ValueError):
+            untrained.update(["John"], ["American"], save_model=False)
+
 
 class TestFirstnameToNationalityPrediction(unittest.TestCase):
     """Tests for FirstnameToNationality prediction functionality."""
@@ -220,6 +557,59 @@ class TestFirstnameToNationalityPrediction(unittest.TestCase):
         self.assertIsInstance(results, list)
         self.assertGreater(len(results), 0)
 
+    def test_top_predictions_batch_matches_argsort(self):
+        """Test batched top-N extraction against a full argsort per row."""
+        rng = np.random.default_rng(0)
+        probabilities = rng.random((50, 7))
+        class_names = np.array([f"Nat{i}" for i in range(7)])
+        self.predictor.label_encoder.classes_ = class_names
+
+        batch = self.predictor._get_top_predictions_batch(probabilities, top_n=3)
+
+        for row, predictions in zip(probabilities, batch):
+            expected = np.argsort(row)[-3:][::-1]
+            self.assertEqual(
+                predictions, [(class_names[i], float(row[i])) for i in expected]
+            )
+
+    def test_top_predictions_batch_top_n_exceeds_classes(self):
+        """Test that top_n larger than the class count returns every class."""
+        probabilities = np.array([[0.2, 0.8]])
+
+        batch = self.predictor._get_top_predictions_batch(probabilities, top_n=5)
+
+        self.assertEqual([nat for nat, _ in batch[0]], ["Italian", "American"])
+
+    def test_top_n_indices_without_columns(self):
+        """Test that asking for no columns gives an empty index matrix."""
+        probabilities = np.array([[0.2, 0.8], [0.6, 0.4]])
+
+        indices = FirstnameToNationality._top_n_indices(probabilities, 0)
+
+        self.assertEqual(indices.shape, (2, 0))
+
+    def test_invalid_top_n(self):
+        """Test that every prediction API rejects a non-positive top_n."""
+        names = ["John", "Giuseppe"]
+        calls = {
+            "predict_single": lambda top_n: self.predictor.predict_single(
+                "John", top_n
+            ),
+            "call": lambda top_n: self.predictor(names, top_n=top_n),
+            "columnar": lambda top_n: self.predictor(names, top_n=top_n, columnar=True),
+            "predict_encoded": lambda top_n: self.predictor.predict_encoded(
+                names, top_n=top_n, use_dict=False
+            ),
+            "predict_iter": lambda top_n: list(
+                self.predictor.predict_iter(names, top_n=top_n)
+            ),
+        }
+        for top_n in (0, -1):
+            for api, call in calls.items():
+                with self.subTest(api=api, top_n=top_n):
+                    with self.assertRaisesRegex(ValueError, "top_n"):
+                        call(top_n)
+
     def test_predict_unknown_name(self):
         """Test prediction of completely unknown name."""
         results = self.predictor.predict_single("XYZ123ABC", use_dict=False)
@@ -274,6 +664,356 @@ class TestFirstnameToNationalityBatchPrediction(unittest.TestCase):
         self.assertIsInstance(results, list)
         self.assertEqual(len(results), 0)
 
+    def test_call_matches_predict_single(self):
+        """Test batched __call__ returns the per-name predictions in input order."""
+        self.predictor.nationality_dictionary = {"jon": ["British", "American"]}
+        names = ["Giuseppe", "Jon", "John", "XYZ", "Giuseppe", "jon "]
+
+        results = self.predictor(names, top_n=2, mini_batch_size=2)
+
+        self.assertEqual([name for name, _ in results], names)
+        for name, predictions in results:
+            self.assertEqual(predictions, self.predictor.predict_single(name, top_n=2))
+
+    def test_call_scores_one_batch_per_mini_batch(self):
+        """Test that model misses are scored with one predict_proba per mini-batch."""
+        with patch.object(
+            self.predictor.model,
+            "predict_proba",
+            wraps=self.predictor.model.predict_proba,
+        ) as predict_proba:
+            self.predictor(
+                ["John", "Giuseppe", "Marco", "Hans", "Kenji", "Pierre"],
+                use_dict=False,
+                mini_batch_size=4,
+            )
+
+        self.assertEqual(predict_proba.call_count, 2)
+        self.assertEqual(len(predict_proba.call_args_list[0].args[0]), 4)
+        self.assertEqual(len(predict_proba.call_args_list[1].args[0]), 2)
+
+    def test_call_scores_each_distinct_name_once(self):
+        """Test that repeated names in a batch are scored only once."""
+        names = ["John", "Giuseppe", " john", "JOHN ", "Giuseppe"] * 20
+
+        with patch.object(
+            self.predictor.model,
+            "predict_proba",
+            wraps=self.predictor.model.predict_proba,
+        ) as predict_proba:
+            results = self.predictor(names, top_n=2, use_dict=False)
+
+        self.assertEqual(predict_proba.call_count, 1)
+        self.assertEqual(len(predict_proba.call_args.args[0]), 2)
+        self.assertEqual([name for name, _ in results], names)
+        for name, predictions in results:
+            self.assertEqual(
+                predictions, self.predictor.predict_single(name, 2, use_dict=False)
+            )
+
+    def test_call_repeated_names_get_separate_lists(self):
+        """Test that repeated names do not share one mutable result list."""
+        results = self.predictor(["John", "John"], use_dict=False)
+
+        results[0][1].append(("Bogus", 1.0))
+
+        self.assertNotIn(("Bogus", 1.0), results[1][1])
+
+    def test_call_invalid_mini_batch_size(self):
+        """Test that a non-positive mini-batch size is rejected."""
+        with self.assertRaises(ValueError):
+            self.predictor(["John"], mini_batch_size=0)
+
+    def test_predict_iter_matches_call(self):
+        """Test that streamed predictions equal the materialized batch."""
+        names = ["John", "Giuseppe", "john", "Unknown", "Giuseppe"] * 3
+
+        streamed = list(self.predictor.predict_iter(iter(names), top_n=2, batch_size=4))
+
+        self.assertEqual(streamed, self.predictor(names, top_n=2))
+
+    def test_predict_iter_is_lazy(self):
+        """Test that an unbounded stream is consumed one batch at a time."""
+        pulled = []
+
+        def endless_names():
+            while True:
+                pulled.append("John")
+                yield "John"
+
+        results = self.predictor.predict_iter(endless_names(), batch_size=3)
+        first = [next(results) for _ in range(4)]
+
+        self.assertEqual([name for name, _ in first], ["John"] * 4)
+        self.assertEqual(len(pulled), 6)
+
+    def test_predict_iter_bounded_batches(self):
+        """Test that the predictor is called with at most batch_size names."""
+        names = ["John", "Giuseppe", "Luigi"] * 3
+
+        with patch.object(
+            self.predictor, "_lookup_known", wraps=self.predictor._lookup_known
+        ) as lookup_known:
+            results = list(self.predictor.predict_iter(names, batch_size=4))
+
+        self.assertEqual(len(results), len(names))
+        self.assertEqual(
+            [len(call.args[0]) for call in lookup_known.call_args_list], [4, 4, 1]
+        )
+
+    def test_predict_iter_invalid_batch_size(self):
+        """Test that a non-positive batch size is rejected."""
+        with self.assertRaises(ValueError):
+            next(self.predictor.predict_iter(["John"], batch_size=0))
+
+
+class TestFirstnameToNationalityEncodedPrediction(unittest.TestCase):
+    """Tests for label-coded batch predictions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        self.predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        names = ["John", "Giuseppe", "Kenji"] * 5
+        nationalities = ["American", "Italian", "Japanese"] * 5
+        self.predictor.train(names, nationalities, save_model=False)
+        self.predictor.nationality_dictionary = {
+            "maria": ["Spanish", "Italian", "Portuguese"],
+            "nobody": [],
+        }
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_label_table_and_padding(self):
+        """Test that model classes come first and short rows are padded."""
+        encoded = self.predictor.predict_encoded(
+            ["Kenji", "Maria", "Nobody", "kenji"], top_n=2
+        )
+
+        self.assertEqual(encoded.n_classes, 3)
+        self.assertEqual(encoded.labels, ["American", "Italian", "Japanese", "Spanish"])
+        self.assertEqual(encoded.indices.shape, (4, 2))
+        self.assertEqual(encoded.indices[0, 0], 2)
+        self.assertEqual(encoded.indices[1].tolist(), [3, 1])
+        self.assertEqual(encoded.indices[2].tolist(), [-1, -1])
+        self.assertEqual(encoded.confidences[2].tolist(), [0.0, 0.0])
+        np.testing.assert_array_equal(encoded.indices[0], encoded.indices[3])
+
+    def test_decode_matches_call(self):
+        """Test that decoding gives the same lists as predicting name by name."""
+        names = ["John", "Maria", "Nobody", "Zed", "john", ""]
+
+        for top_n in (1, 2, 4):
+            decoded = self.predictor.predict_encoded(names, top_n=top_n).decode()
+            self.assertEqual(
+                decoded,
+                [(name, self.predictor.predict_single(name, top_n)) for name in names],
+            )
+
+    def test_columnar_call(self):
+        """Test that columnar mode returns the encoded arrays."""
+        encoded = self.predictor(["Kenji", "Maria"], top_n=2, columnar=True)
+
+        self.assertIsInstance(encoded, EncodedPredictions)
+        self.assertEqual(encoded.indices.shape, (2, 2))
+        self.assertEqual(encoded.decode(), self.predictor(["Kenji", "Maria"], top_n=2))
+
+    def test_to_pandas(self):
+        """Test conversion to a DataFrame with categorical label columns."""
+        encoded = self.predictor.predict_encoded(["Kenji", "Nobody", "Maria"], 2)
+
+        frame = encoded.to_pandas()
+
+        self.assertEqual(
+            list(frame.columns),
+            ["name", "nationality_1", "confidence_1", "nationality_2", "confidence_2"],
+        )
+        self.assertEqual(frame["name"].tolist(), ["Kenji", "Nobody", "Maria"])
+        self.assertEqual(frame["nationality_1"].cat.categories.tolist(), encoded.labels)
+        self.assertEqual(frame["nationality_1"][0], "Japanese")
+        self.assertTrue(frame["nationality_1"].isna()[1])
+        self.assertEqual(frame["nationality_2"][2], "Italian")
+        np.testing.assert_array_equal(frame["confidence_1"], encoded.confidences[:, 0])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_to_arrow(self):
+        """Test conversion to an Arrow table with dictionary-encoded labels."""
+        encoded = self.predictor.predict_encoded(["Kenji", "Nobody"], 1)
+
+        table = encoded.to_arrow()
+
+        self.assertEqual(table.column_names, ["name", "nationality_1", "confidence_1"])
+        self.assertEqual(table.column("nationality_1").to_pylist(), ["Japanese", None])
+
+    def test_predict_proba_rows(self):
+        """Test full probability rows for repeated and dictionary names."""
+        probabilities = self.predictor.predict_proba(["Kenji", "Maria", "kenji "])
+        expected = self.predictor.model.predict_proba(
+            self.predictor.preprocessor.preprocess_many(["Kenji", "Maria"])
+        )
+
+        np.testing.assert_allclose(probabilities, expected[[0, 1, 0]])
+        self.assertEqual(self.predictor.predict_proba([]).shape, (0, 3))
+
+    def test_predict_proba_without_model(self):
+        """Test that probabilities need a trained model."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+
+        with self.assertRaises(ValueError):
+            predictor.predict_proba(["John"])
+
+    def test_untrained_model_gives_unknown(self):
+        """Test that an untrained model encodes every miss as unknown."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+
+        encoded = predictor.predict_encoded(["John", "Anna"])
+
+        self.assertEqual(encoded.labels, ["unknown"])
+        self.assertEqual(encoded.indices.tolist(), [[0], [0]])
+
+
+class TestFirstnameToNationalityPredictionCache(unittest.TestCase):
+    """Tests for the LRU prediction cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        self.predictor = FirstnameToNationality(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            cache_size=2,
+        )
+
+        names = ["John", "Giuseppe"] * 5
+        nationalities = ["American", "Italian"] * 5
+        self.predictor.train(names, nationalities, save_model=False)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def test_cache_disabled_by_default(self):
+        """Test that predictors do not cache unless a size is given."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        predictor.predict_single("John")
+        predictor.predict_single("John")
+
+        stats = predictor.cache_stats()
+        self.assertEqual((stats.hits, stats.size), (0, 0))
+
+    def test_repeated_names_hit_cache(self):
+        """Test that repeats of a normalized name skip the model."""
+        expected = self.predictor.predict_single("John", top_n=2, use_dict=False)
+
+        with patch.object(self.predictor.model, "predict_proba") as predict_proba:
+            cached = self.predictor.predict_single(" JOHN ", top_n=2, use_dict=False)
+
+        predict_proba.assert_not_called()
+        self.assertEqual(cached, expected)
+        stats = self.predictor.cache_stats()
+        self.assertEqual((stats.hits, stats.misses), (1, 1))
+        self.assertEqual(stats.hit_rate, 0.5)
+
+    def test_key_includes_top_n_and_use_dict(self):
+        """Test that different top_n/use_dict settings are cached separately."""
+        self.predictor.predict_single("John", top_n=1)
+        self.predictor.predict_single("John", top_n=2)
+        self.predictor.predict_single("John", top_n=1, use_dict=False)
+
+        self.assertEqual(self.predictor.cache_stats().hits, 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        self.predictor.predict_single("John")
+        self.predictor.predict_single("Giuseppe")
+        self.predictor.predict_single("John")
+        self.predictor.predict_single("Marco")
+
+        stats = self.predictor.cache_stats()
+        self.assertEqual((stats.size, stats.evictions), (2, 1))
+
+        self.predictor.predict_single("John")
+        self.predictor.predict_single("Giuseppe")
+        self.assertEqual(self.predictor.cache_stats().hits, 2)
+
+    def test_returned_lists_are_copies(self):
+        """Test that modifying a result does not change later cached results."""
+        first = self.predictor.predict_single("John")
+        first.append(("Bogus", 1.0))
+
+        self.assertNotIn(("Bogus", 1.0), self.predictor.predict_single("John"))
+
+    def test_call_uses_cache(self):
+        """Test that batched calls read from and fill the same cache."""
+        self.predictor.predict_single("John")
+
+        results = self.predictor(["john", "Giuseppe"])
+
+        self.assertEqual(results[0][1], self.predictor.predict_single("John"))
+        self.assertEqual(self.predictor.cache_stats().hits, 2)
+        self.assertEqual(len(self.predictor.cache), 2)
+
+    def test_cache_cleared_on_dictionary_change(self):
+        """Test that replacing the dictionary invalidates cached predictions."""
+        self.predictor.predict_single("John")
+
+        self.predictor.save_dictionary({"john": ["British"]})
+
+        self.assertEqual(len(self.predictor.cache), 0)
+        self.assertEqual(self.predictor.predict_single("John"), [("British", 1.0)])
+
+    def test_cache_cleared_on_model_change(self):
+        """Test that retraining or replacing the model invalidates the cache."""
+        self.predictor.predict_single("John")
+        self.predictor.train(["John", "Hans"] * 5, ["American", "German"] * 5, False)
+        self.assertEqual(len(self.predictor.cache), 0)
+
+        self.predictor.predict_single("John")
+        self.predictor.model = None
+        self.assertEqual(len(self.predictor.cache), 0)
+
+    def test_stale_prediction_not_cached(self):
+        """Test that a prediction started before a clear is not stored after it."""
+        cache = self.predictor.cache
+        generation = cache.generation
+        cache.clear()
+
+        cache.put(("john", 1, True), [("American", 0.9)], generation)
+
+        self.assertEqual(len(cache), 0)
+        cache.put(("john", 1, True), [("American", 0.9)], cache.generation)
+        self.assertEqual(len(cache), 1)
+
+    def test_negative_cache_size(self):
+        """Test that a negative cache size is rejected."""
+        with self.assertRaises(ValueError):
+            FirstnameToNationality(
+                model_path=str(self.model_path),
+                dictionary_path=str(self.dict_path),
+                lazy=True,
+                cache_size=-1,
+            )
+
 
 class TestFirstnameToNationalityPersistence(unittest.TestCase):
     """Tests for FirstnameToNationality save/load functionality."""
@@ -323,6 +1063,21 @@ class TestFirstnameToNationalityPersistence(unittest.TestCase):
         results = predictor2.predict_single("John", use_dict=False)
         self.assertGreater(len(results), 0)
 
+    def test_failed_save_keeps_previous_model(self):
+        """Test that an interrupted save leaves the saved model intact."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        )
+        predictor.train(["John", "Giuseppe"] * 3, ["American", "Italian"] * 3)
+        saved = self.model_path.read_bytes()
+
+        with patch("joblib.dump", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                predictor.save_model()
+
+        self.assertEqual(self.model_path.read_bytes(), saved)
+        self.assertEqual(list(Path(self.temp_dir).glob("*.tmp")), [])
+
     def test_save_dictionary(self):
         """Test saving dictionary."""
         predictor = FirstnameToNationality(
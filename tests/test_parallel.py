@@ -0,0 +1,199 @@
+"""
+Unit tests for multi-process batch prediction.
+"""
+
+import unittest
+import tempfile
+import pickle
+import random
+import csv
+import multiprocessing
+from pathlib import Path
+from unittest.mock import patch
+
+from firstname_to_nationality import FirstnameToCountry, FirstnameToNationality
+from firstname_to_nationality.parallel import (
+    _merge_parts,
+    _pool_context,
+    effective_n_jobs,
+)
+
+
+class TestParallelPrediction(unittest.TestCase):
+    """Tests for n_jobs process-pool prediction."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+            ["Japan", "JP", "JPN", "Japanese"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        self.country_predictor = FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+        )
+        self.predictor = self.country_predictor.nationality_predictor
+        self.predictor.train(
+            ["John", "William", "Giuseppe", "Marco", "Hiroshi", "Kenji"] * 4,
+            ["American", "American", "Italian", "Italian", "Japanese", "Japanese"] * 4,
+            save_model=False,
+        )
+        self.predictor.nationality_dictionary = {
+            "maria": ["Spanish", "Portuguese"],
+            "john": ["American"],
+        }
+
+        rng = random.Random(7)
+        alphabet = "abcdefghijklmnopqrstuvwxyz"
+        generated = [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(3, 9)))
+            for _ in range(300)
+        ]
+        self.names = generated + ["Maria", "John", "JOHN ", "Kenji"] + generated[:50]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        self.country_predictor.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_n_jobs_matches_serial(self):
+        """Test that worker processes give the in-process predictions in order."""
+        serial = self.predictor(self.names, top_n=2)
+
+        parallel = self.predictor(self.names, top_n=2, mini_batch_size=16, n_jobs=3)
+
+        self.assertEqual(parallel, serial)
+
+    def test_workers_are_used(self):
+        """Test that a large batch is split into chunks for the pool."""
+        from multiprocessing import pool
+
+        with patch.object(pool.Pool, "map", autospec=True) as pool_map:
+            pool_map.side_effect = lambda self, function, tasks: [
+                function(task) for task in tasks
+            ]
+            with patch(
+                "firstname_to_nationality.parallel._worker_predictor", self.predictor
+            ):
+                self.predictor.predict_encoded(self.names, mini_batch_size=16, n_jobs=2)
+
+        tasks = pool_map.call_args.args[2]
+        self.assertEqual(len(tasks), 8)
+        self.assertEqual(
+            [name for task in tasks for name in task[0]],
+            list(dict.fromkeys(name.lower().strip() for name in self.names)),
+        )
+
+    def test_pool_is_reused_until_model_changes(self):
+        """Test that one pool serves many batches and restarts on retraining."""
+        self.predictor(self.names, mini_batch_size=16, n_jobs=2)
+        pool = self.predictor._worker_pool()._pool
+
+        self.predictor(self.names, mini_batch_size=16, n_jobs=2)
+        self.assertIs(self.predictor._worker_pool()._pool, pool)
+
+        self.predictor.train(
+            ["Pierre", "Jean", "Hiroshi", "Kenji"] * 4,
+            ["French", "French", "Japanese", "Japanese"] * 4,
+            save_model=False,
+        )
+        parallel = self.predictor(self.names, mini_batch_size=16, n_jobs=2)
+
+        self.assertIsNot(self.predictor._worker_pool()._pool, pool)
+        self.assertEqual(parallel, self.predictor(self.names))
+
+    def test_close_stops_workers(self):
+        """Test that closing, or leaving the context, stops the pool."""
+        with self.country_predictor as country_predictor:
+            country_predictor.predict_batch(self.names, n_jobs=2)
+            pool = self.predictor._worker_pool()._pool
+            self.assertIsNotNone(pool)
+
+        self.assertIsNone(self.predictor._process_pool)
+        with self.assertRaises(ValueError):
+            pool.map(abs, [1])
+
+        # A closed predictor starts a new pool when needed
+        self.assertEqual(
+            self.predictor(self.names, mini_batch_size=16, n_jobs=2),
+            self.predictor(self.names),
+        )
+
+    def test_start_method(self):
+        """Test that fork is only used on Linux."""
+        with patch("sys.platform", "linux"):
+            self.assertEqual(_pool_context().get_start_method(), "fork")
+        with patch("sys.platform", "darwin"):
+            self.assertEqual(
+                _pool_context().get_start_method(),
+                multiprocessing.get_context().get_start_method(),
+            )
+
+    def test_small_batches_stay_in_process(self):
+        """Test that a batch smaller than one mini-batch never starts a pool."""
+        with patch("multiprocessing.pool.Pool") as pool_class:
+            results = self.predictor(["Kenji", "Maria"], n_jobs=4)
+
+        pool_class.assert_not_called()
+        self.assertEqual(results, self.predictor(["Kenji", "Maria"]))
+
+    def test_country_batch_with_n_jobs(self):
+        """Test aggregated and individual country predictions with workers."""
+        for aggregate in (True, False):
+            self.assertEqual(
+                self.country_predictor.predict_batch(
+                    self.names, 2, aggregate=aggregate, n_jobs=2
+                ),
+                self.country_predictor.predict_batch(
+                    self.names, 2, aggregate=aggregate
+                ),
+            )
+
+    def test_merge_parts_with_dictionary_only_chunk(self):
+        """Test merging a chunk that never loaded the model classes."""
+        dictionary_only = self.predictor.predict_encoded(["Maria", "john"], top_n=2)
+        scored = self.predictor.predict_encoded(["Kenji", "Maria"], top_n=2)
+
+        merged = _merge_parts([dictionary_only, scored])
+
+        self.assertEqual(dictionary_only.n_classes, 0)
+        self.assertEqual(merged.n_classes, 3)
+        self.assertEqual(merged.labels[:3], ["American", "Italian", "Japanese"])
+        self.assertEqual(merged.decode(), dictionary_only.decode() + scored.decode())
+
+    def test_predictor_pickles_for_spawned_workers(self):
+        """Test that a predictor survives pickling, as spawned workers need."""
+        restored = pickle.loads(pickle.dumps(self.predictor))
+
+        self.assertEqual(restored(self.names[:20]), self.predictor(self.names[:20]))
+
+    def test_effective_n_jobs(self):
+        """Test the scikit-learn style n_jobs convention."""
+        with patch("os.cpu_count", return_value=8):
+            self.assertEqual(effective_n_jobs(None), 1)
+            self.assertEqual(effective_n_jobs(3), 3)
+            self.assertEqual(effective_n_jobs(-1), 8)
+            self.assertEqual(effective_n_jobs(-2), 7)
+            self.assertEqual(effective_n_jobs(-20), 1)
+        with self.assertRaises(ValueError):
+            effective_n_jobs(0)
+        with self.assertRaises(ValueError):
+            self.predictor(self.names, n_jobs=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@
 Unit tests for the NamePreprocessor class.
 """
 
+import re
 import unittest
 
 from firstname_to_nationality import NamePreprocessor
@@ -75,5 +76,67 @@ class TestNamePreprocessor(unittest.TestCase):
         self.assertGreater(len(result), 0)
 
 
+def reference_preprocess_name(name):
+    """Original per-character implementation of preprocess_name."""
+    name = name.strip().lower()
+    name = re.sub(r"[^\w\s-]", "", name)
+    name = name.replace(" ", "▁")
+    return " ".join(char for char in name if char.strip())
+
+
+class TestPreprocessMany(unittest.TestCase):
+    """Tests for batch preprocessing."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.preprocessor = NamePreprocessor()
+        self.names = [
+            "John",
+            "  Giuseppe  Rossi ",
+            "Jean-Paul",
+            "O'Brien!",
+            "Anne\tMarie\nDupont",
+            "İsmail",
+            "Zoë_Ñ",
+            "José\u00a0María",
+            "名前 テスト",
+            "\u2028x\u3000y\x1c",
+            "",
+            "   ",
+        ]
+
+    def test_matches_original_implementation(self):
+        """Test that output is identical to the original implementation."""
+        expected = [reference_preprocess_name(name) for name in self.names]
+
+        self.assertEqual(self.preprocessor.preprocess_many(self.names), expected)
+        self.assertEqual(
+            [self.preprocessor.preprocess_name(name) for name in self.names], expected
+        )
+
+    def test_matches_original_for_every_character(self):
+        """Test every single character of the Basic Multilingual Plane."""
+        characters = [
+            chr(code) for code in range(0x10000) if not 0xD800 <= code < 0xE000
+        ]
+
+        processed = self.preprocessor.preprocess_many(characters)
+
+        mismatches = [
+            char
+            for char, result in zip(characters, processed)
+            if result != reference_preprocess_name(char)
+        ]
+        self.assertEqual(mismatches, [])
+
+    def test_accepts_iterables(self):
+        """Test that generators are accepted and an empty batch gives []."""
+        self.assertEqual(
+            self.preprocessor.preprocess_many(name for name in ["Ann Lee"]),
+            ["a n n ▁ l e e"],
+        )
+        self.assertEqual(self.preprocessor.preprocess_many([]), [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,275 @@
+"""
+Unit tests for using predictors from several threads at once.
+"""
+
+import unittest
+import tempfile
+import threading
+import time
+import pickle
+import csv
+from pathlib import Path
+from unittest.mock import patch
+
+from firstname_to_nationality import FirstnameToCountry, FirstnameToNationality
+
+
+def run_in_threads(function, n_threads=8):
+    """Call function(index) from several threads and return results or errors."""
+    results = [None] * n_threads
+    errors = []
+    barrier = threading.Barrier(n_threads)
+
+    def worker(index):
+        try:
+            barrier.wait()
+            results[index] = function(index)
+        except Exception as e:  # pragma: no cover - reported by the test
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+class TestFirstnameToNationalityThreadSafety(unittest.TestCase):
+    """Tests for concurrent nationality predictions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        self.predictor = FirstnameToNationality(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            cache_size=16,
+        )
+        self.predictor.train(
+            ["John", "William", "Giuseppe", "Marco"] * 5,
+            ["American", "American", "Italian", "Italian"] * 5,
+            save_model=True,
+        )
+        self.predictor.save_dictionary({"maria": ["Spanish"]})
+
+        self.names = ["John", "Giuseppe", "Maria", "Marco", "Zed", "john"] * 20
+        self.names += [f"name{i}" for i in range(40)]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        self.predictor.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_concurrent_calls_match_serial(self):
+        """Test that many threads sharing a predictor get the serial results."""
+        expected = self.predictor(self.names, top_n=2)
+        expected_single = self.predictor.predict_single("Giuseppe", top_n=2)
+
+        def predict(index):
+            return (
+                self.predictor(self.names, top_n=2, mini_batch_size=8),
+                self.predictor.predict_single("Giuseppe", top_n=2),
+            )
+
+        results, errors = run_in_threads(predict)
+
+        self.assertEqual(errors, [])
+        for batch, single in results:
+            self.assertEqual(batch, expected)
+            self.assertEqual(single, expected_single)
+
+    def test_lazy_loading_happens_once(self):
+        """Test that threads racing to the first prediction load the model once."""
+        predictor = FirstnameToNationality(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            lazy=True,
+        )
+        original_load = FirstnameToNationality._load_model
+        loads = []
+
+        def slow_load(self):
+            loads.append(1)
+            time.sleep(0.05)
+            original_load(self)
+
+        with patch.object(FirstnameToNationality, "_load_model", slow_load):
+            results, errors = run_in_threads(lambda index: predictor(["Marco"]))
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(loads), 1)
+        self.assertEqual({result[0][1][0][0] for result in results}, {"Italian"})
+
+    def test_retrain_while_predicting(self):
+        """Test that predictions never mix the old and the new model."""
+        old_labels = {"American", "Italian"}
+        new_labels = {"Japanese", "German"}
+        stop = threading.Event()
+
+        def predict(index):
+            seen = []
+            while not stop.is_set():
+                for _, predictions in self.predictor(
+                    self.names, top_n=2, use_dict=False
+                ):
+                    seen.append(frozenset(label for label, _ in predictions))
+            return seen
+
+        thread_results = []
+        threads = [
+            threading.Thread(target=lambda: thread_results.append(predict(0)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for labels in (new_labels, old_labels, new_labels):
+            first, second = sorted(labels)
+            self.predictor.train(
+                ["John", "William", "Giuseppe", "Marco"] * 5,
+                [first, first, second, second] * 5,
+                save_model=False,
+            )
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(thread_results), 4)
+        for seen in thread_results:
+            for labels in seen:
+                self.assertIn(labels, (old_labels, new_labels))
+
+    def test_n_threads_matches_serial(self):
+        """Test that thread-pool scoring of mini-batches keeps the results."""
+        expected = self.predictor(self.names, top_n=2, use_dict=False)
+
+        threaded = self.predictor(
+            self.names, top_n=2, use_dict=False, mini_batch_size=4, n_threads=4
+        )
+
+        self.assertEqual(threaded, expected)
+        with self.assertRaises(ValueError):
+            self.predictor(self.names, use_dict=False, mini_batch_size=4, n_threads=0)
+
+    def test_n_threads_inside_worker_processes(self):
+        """Test combining worker processes with scoring threads."""
+        expected = self.predictor(self.names, use_dict=False)
+
+        combined = self.predictor(
+            self.names, use_dict=False, mini_batch_size=8, n_jobs=2, n_threads=2
+        )
+
+        self.assertEqual(combined, expected)
+
+    def test_concurrent_n_jobs_calls(self):
+        """Test that threads sharing the worker pool get their own results."""
+        expected = self.predictor(self.names, top_n=2, use_dict=False)
+
+        results, errors = run_in_threads(
+            lambda index: self.predictor(
+                self.names, top_n=2, use_dict=False, mini_batch_size=8, n_jobs=2
+            ),
+            n_threads=4,
+        )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [expected] * 4)
+
+
+class TestFirstnameToCountryThreadSafety(unittest.TestCase):
+    """Tests for concurrent country predictions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.csv_path = Path(self.temp_dir) / "test_countries.csv"
+        self.model_path = Path(self.temp_dir) / "test_model.pt"
+        self.dict_path = Path(self.temp_dir) / "test_dict.pkl"
+
+        csv_data = [
+            ["Country Name", "Alpha-2 Code", "Alpha-3 Code", "Nationality (Demonym)"],
+            ["United States", "US", "USA", "American"],
+            ["Italy", "IT", "ITA", "Italian"],
+        ]
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(csv_data)
+
+        FirstnameToNationality(
+            model_path=str(self.model_path), dictionary_path=str(self.dict_path)
+        ).train(["John", "Giuseppe"] * 5, ["American", "Italian"] * 5)
+
+        self.names = ["John", "Giuseppe", "Zed", "john"] * 10
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def create_predictor(self, lazy=False):
+        """Create a country predictor for the trained model."""
+        return FirstnameToCountry(
+            model_path=str(self.model_path),
+            dictionary_path=str(self.dict_path),
+            country_csv_path=str(self.csv_path),
+            lazy=lazy,
+        )
+
+    def test_concurrent_batches_match_serial(self):
+        """Test aggregated and individual batches from many threads."""
+        predictor = self.create_predictor()
+        expected = (
+            predictor.predict_batch(self.names, 2),
+            predictor.predict_batch(self.names, 2, aggregate=False),
+        )
+
+        results, errors = run_in_threads(
+            lambda index: (
+                predictor.predict_batch(self.names, 2),
+                predictor.predict_batch(self.names, 2, aggregate=False, n_threads=2),
+            )
+        )
+
+        self.assertEqual(errors, [])
+        for result in results:
+            self.assertEqual(result, expected)
+
+    def test_lazy_mapping_loads_once(self):
+        """Test that threads racing to the country mapping parse the CSV once."""
+        predictor = self.create_predictor(lazy=True)
+        original_load = FirstnameToCountry._load_country_mapping
+        loads = []
+
+        def slow_load(self):
+            loads.append(1)
+            time.sleep(0.05)
+            original_load(self)
+
+        with patch.object(FirstnameToCountry, "_load_country_mapping", slow_load):
+            results, errors = run_in_threads(
+                lambda index: predictor.predict_single("John")
+            )
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(loads), 1)
+        self.assertEqual({result[0]["country_code"] for result in results}, {"US"})
+
+    def test_predictor_pickles(self):
+        """Test that a predictor with its locks can still be pickled."""
+        predictor = self.create_predictor()
+
+        restored = pickle.loads(pickle.dumps(predictor))
+
+        self.assertEqual(
+            restored.predict_batch(self.names), predictor.predict_batch(self.names)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+"""
+Unit tests for the cross-validated hyperparameter search.
+"""
+
+import unittest
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from firstname_to_nationality import FeatureCache, FirstnameToNationality
+from firstname_to_nationality.tuning import (
+    DEFAULT_PARAM_GRID,
+    TuningResult,
+    _mark_frontier,
+    candidate_settings,
+    tune,
+)
+
+
+class TestTuning(unittest.TestCase):
+    """Tests for candidate settings, cross-validation and reporting."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = FeatureCache(Path(self.temp_dir) / "cache")
+
+        self.names = [
+            "John",
+            "William",
+            "James",
+            "Giuseppe",
+            "Marco",
+            "Luca",
+            "Hiroshi",
+            "Kenji",
+            "Takashi",
+        ] * 3
+        self.nationalities = (["American"] * 3 + ["Italian"] * 3 + ["Japanese"] * 3) * 3
+        self.candidates = [
+            {"vectorizer__ngram_range": (1, 2), "classifier__C": 1.0},
+            {"vectorizer__ngram_range": (1, 2), "classifier__C": 3.0},
+            {"vectorizer__ngram_range": (1, 3), "classifier__C": 1.0},
+        ]
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir)
+
+    def _tune(self, folds=3):
+        return tune(
+            self.names,
+            self.nationalities,
+            self.candidates,
+            folds=folds,
+            n_jobs=1,
+            feature_cache=self.cache,
+        )
+
+    def test_candidate_settings(self):
+        """Test the full grid and a reproducible random sample of it."""
+        grid = candidate_settings()
+        expected = 1
+        for values in DEFAULT_PARAM_GRID.values():
+            expected *= len(values)
+        self.assertEqual(len(grid), expected)
+
+        sample = candidate_settings(n_candidates=5)
+        self.assertEqual(len(sample), 5)
+        self.assertEqual(sample, candidate_settings(n_candidates=5))
+        self.assertTrue(all(setting in grid for setting in sample))
+        self.assertEqual(len(candidate_settings(n_candidates=10_000)), expected)
+
+    def test_results_per_candidate(self):
+        """Test that every candidate is scored, timed and sized."""
+        results = self._tune()
+
+        self.assertEqual(
+            sorted(map(str, (result.params for result in results))),
+            sorted(map(str, self.candidates)),
+        )
+        accuracies = [result.accuracy for result in results]
+        self.assertEqual(accuracies, sorted(accuracies, reverse=True))
+        for result in results:
+            self.assertGreaterEqual(result.accuracy, 0.0)
+            self.assertLessEqual(result.accuracy, 1.0)
+            self.assertGreater(result.names_per_second, 0)
+            self.assertGreater(result.model_bytes, 0)
+        self.assertTrue(any(result.on_frontier for result in results))
+
+    def test_features_shared_across_candidates_and_runs(self):
+        """Test that each vectorizer setting is fitted once per fold."""
+        with patch.object(
+            FirstnameToNationality,
+            "_fit_vectorizer_weighted",
+            wraps=FirstnameToNationality._fit_vectorizer_weighted,
+        ) as fit_vectorizer:
+            self._tune(folds=3)
+            # Two distinct vectorizer settings, three folds each
+            self.assertEqual(fit_vectorizer.call_count, 6)
+
+            self._tune(folds=3)
+            self.assertEqual(fit_vectorizer.call_count, 6)
+
+    def test_training_keeps_tuning_features(self):
+        """Test that a later train() does not prune the fold matrices."""
+        self.candidates = [
+            {"vectorizer__ngram_range": (1, n), "classifier__C": 1.0}
+            for n in range(1, 5)
+        ]
+        self._tune(folds=3)
+
+        predictor = FirstnameToNationality(
+            model_path=str(Path(self.temp_dir) / "model.pt"), lazy=True
+        )
+        predictor.train(
+            self.names, self.nationalities, save_model=False, feature_cache=self.cache
+        )
+
+        with patch.object(
+            FirstnameToNationality,
+            "_fit_vectorizer_weighted",
+            wraps=FirstnameToNationality._fit_vectorizer_weighted,
+        ) as fit_vectorizer:
+            self._tune(folds=3)
+            self.assertEqual(fit_vectorizer.call_count, 0)
+
+    def test_frontier(self):
+        """Test that dominated results are not on the frontier."""
+        results = [
+            TuningResult({"name": "accurate"}, 0.9, 0.0, 1.0, 100.0, 10),
+            TuningResult({"name": "fast"}, 0.7, 0.0, 1.0, 500.0, 10),
+            TuningResult({"name": "dominated"}, 0.6, 0.0, 1.0, 90.0, 10),
+        ]
+        _mark_frontier(results)
+
+        self.assertEqual(
+            [result.on_frontier for result in results], [True, True, False]
+        )
+
+    def test_invalid_settings(self):
+        """Test that impossible searches are rejected."""
+        with self.assertRaises(ValueError):
+            tune(self.names, self.nationalities, [], feature_cache=self.cache)
+        with self.assertRaises(ValueError):
+            self._tune(folds=1)
+        with self.assertRaises(ValueError):
+            tune(["John"], ["American"], self.candidates, feature_cache=self.cache)
+
+
+if __name__ == "__main__":
+    unittest.main()